@@ -33,7 +33,7 @@ async def get_users(db: AsyncSession, skip: int = 0, limit: int = 100):
 
 # KiteSpot CRUD operations
 async def create_kitespot(db: AsyncSession, kitespot: schemas.KiteSpotCreate):
-    db_kitespot = models.KiteSpot(**kitespot.dict())
+    db_kitespot = models.KiteSpot(**kitespot.model_dump())
     db.add(db_kitespot)
     await db.commit()
     await db.refresh(db_kitespot)
@@ -43,13 +43,30 @@ async def get_kitespot(db: AsyncSession, kitespot_id: int):
     result = await db.execute(select(models.KiteSpot).filter(models.KiteSpot.id == kitespot_id))
     return result.scalars().first()
 
-async def get_kitespots(db: AsyncSession, skip: int = 0, limit: int = 100):
-    result = await db.execute(select(models.KiteSpot).offset(skip).limit(limit))
+async def get_kitespots(
+    db: AsyncSession,
+    after_id: Optional[int] = None,
+    limit: int = 100,
+    country: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    water_type: Optional[str] = None,
+):
+    # Keyset pagination: resume after the last id of the previous page instead of OFFSET
+    query = select(models.KiteSpot)
+    if after_id is not None:
+        query = query.filter(models.KiteSpot.id > after_id)
+    if country is not None:
+        query = query.filter(models.KiteSpot.country == country)
+    if difficulty is not None:
+        query = query.filter(models.KiteSpot.difficulty == difficulty)
+    if water_type is not None:
+        query = query.filter(models.KiteSpot.water_type == water_type)
+    result = await db.execute(query.order_by(models.KiteSpot.id).limit(limit))
     return result.scalars().all()
 
 # FavoriteSpot CRUD operations
 async def create_favorite_spot(db: AsyncSession, favorite: schemas.FavoriteSpotCreate, user_id: int):
-    db_favorite = models.FavoriteSpot(**favorite.dict(), user_id=user_id)
+    db_favorite = models.FavoriteSpot(**favorite.model_dump(), user_id=user_id)
     db.add(db_favorite)
     await db.commit()
     await db.refresh(db_favorite)
@@ -63,7 +80,7 @@ async def get_user_favorites(db: AsyncSession, user_id: int):
 
 # KiteSession CRUD operations
 async def create_kite_session(db: AsyncSession, session: schemas.KiteSessionCreate, user_id: int):
-    db_session = models.KiteSession(**session.dict(), user_id=user_id)
+    db_session = models.KiteSession(**session.model_dump(), user_id=user_id)
     db.add(db_session)
     await db.commit()
     await db.refresh(db_session)
@@ -38,6 +38,9 @@ async_session_factory = sessionmaker(
     engine, class_=AsyncSession, expire_on_commit=False
 )
 
+# Name used by the weather service and the import/maintenance scripts
+async_session = async_session_factory
+
 # Dependency for FastAPI
 async def get_db():
     """
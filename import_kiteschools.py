@@ -1,25 +1,25 @@
 import asyncio
 import csv
-import aiohttp
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 from database import async_session
 from models import KiteSchool
+from services.http_client import http_client
 
 async def fetch_csv(url):
     """Fetch CSV data from URL"""
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            if response.status != 200:
-                raise Exception(f"Failed to fetch CSV: {response.status}")
-            return await response.text()
+    status, content = await http_client.get_text(url)
+    if status != 200:
+        raise Exception(f"Failed to fetch CSV: {status}")
+    return content
 
 async def import_kiteschools(csv_url=None, csv_path=None):
     """Import kiteschools from CSV file or URL"""
     # Get CSV content either from URL or local file
     if csv_url:
         print(f"Fetching CSV from URL: {csv_url}")
-        csv_content = await fetch_csv(csv_url)
+        async with http_client:
+            csv_content = await fetch_csv(csv_url)
         csv_data = csv_content.splitlines()
     elif csv_path:
         print(f"Reading CSV from file: {csv_path}")
@@ -1,14 +1,52 @@
 import os
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, Depends, HTTPException
+from typing import Optional
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import text
 import logging
+import numpy as np
 
 # Import database and models
-from database import get_db, engine, Base
+from database import get_db, engine, Base, async_session
 import models
+import schemas
+import crud
+from services.read_tracker import read_tracker
+from services.http_client import http_client
+from services.forecast_cache import (
+    FORECAST_FORMATS,
+    INGEST_VERSION_POLL_INTERVAL,
+    CachedForecast,
+    ForecastFormat,
+    cached_response,
+    columnar_columns,
+    current_hour,
+    forecast_cache,
+    forecast_validators,
+    forecast_variant,
+    golden_window_cache,
+    ingest_versions,
+    load_forecast_columns,
+    load_forecast_hours,
+    load_forecast_matrix,
+    render_json,
+)
+from services.single_flight import forecast_reads, golden_window_reads
+from services.spatial_index import SPATIAL_INDEX_REFRESH_INTERVAL, spatial_index
+from services.map_clusters import MAX_CLUSTER_ZOOM, map_clusters
+from services.rankings import RANKING_HORIZON_HOURS, golden_window_ranking
+from services.golden_windows import golden_window_summary, load_golden_window
+from services.scoring_rules import scoring_rules
+from services.kitewindow import (
+    KITE_BAND_CONFIDENCE,
+    KITE_BAND_MESSAGE,
+    KMH_PER_KNOT,
+    calculate_golden_kitewindow,
+    kite_size_matrix,
+)
 
 # Configure logging
 logging.basicConfig(
@@ -17,11 +55,48 @@ logging.basicConfig(
 )
 logger = logging.getLogger("railway-app")
 
+# Seconds between flushes of the per-spot read counters used by the refresh planner
+READ_STATS_FLUSH_INTERVAL = int(os.environ.get("READ_STATS_FLUSH_INTERVAL", 60))
+# Longest forecast window the weather endpoints serve
+FORECAST_MAX_HOURS = 48
+# Most rider weights one /kite-sizes request may ask for
+KITE_SIZE_MAX_WEIGHTS = 10
+# Most kitespots one /weather/batch request may ask for
+WEATHER_BATCH_MAX_IDS = int(os.environ.get("WEATHER_BATCH_MAX_IDS", 100))
+
+async def run_periodically(name: str, interval: float, func):
+    """Run an async maintenance job every interval seconds until cancelled"""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await func()
+        except Exception as e:
+            logger.error(f"Periodic job {name} failed: {e}", exc_info=True)
+
+async def refresh_forecast_versions():
+    """Pick up new forecast versions and re-rank the spots when forecasts changed or the hour moved on"""
+    if await ingest_versions.refresh():
+        await golden_window_ranking.rebuild()
+    else:
+        await golden_window_ranking.refresh_if_stale()
+
+async def refresh_spot_indexes():
+    """Apply added, moved and deleted kitespots to the spatial index and the map clusters"""
+    changed, removed = await spatial_index.refresh()
+    updates = {kitespot_id: None for kitespot_id in removed}
+    for kitespot_id in changed:
+        spot = spatial_index.get(kitespot_id)
+        updates[kitespot_id] = (spot["latitude"], spot["longitude"]) if spot else None
+    map_clusters.apply(updates)
+
 # Lifespan context manager (replaces on_event)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Create tables
     logger.info("Application startup")
+    # Fail fast on a broken SCORING_RULES_FILE
+    scoring_rules()
+    await http_client.start()
     async with engine.begin() as conn:
         try:
             # This will create tables that don't exist yet
@@ -29,11 +104,33 @@ async def lifespan(app: FastAPI):
             logger.info("Database tables created successfully")
         except Exception as e:
             logger.error(f"Error creating database tables: {e}")
+
+    try:
+        await ingest_versions.refresh()
+        await golden_window_ranking.rebuild()
+    except Exception as e:
+        logger.error(f"Error loading forecast versions: {e}")
+    try:
+        await spatial_index.load()
+        map_clusters.build(spatial_index.spots())
+    except Exception as e:
+        logger.error(f"Error loading spatial index: {e}")
+
+    background_tasks = [
+        asyncio.create_task(run_periodically("read-stats-flush", READ_STATS_FLUSH_INTERVAL, read_tracker.flush)),
+        asyncio.create_task(run_periodically("ingest-versions", INGEST_VERSION_POLL_INTERVAL, refresh_forecast_versions)),
+        asyncio.create_task(run_periodically("spot-indexes", SPATIAL_INDEX_REFRESH_INTERVAL, refresh_spot_indexes)),
+    ]
     
     yield  # This is where the application runs
     
     # Shutdown
     logger.info("Application shutdown")
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await read_tracker.flush()
+    await http_client.close()
 
 # Create FastAPI app
 app = FastAPI(
@@ -80,6 +177,244 @@ async def db_health_check(db: AsyncSession = Depends(get_db)):
         logger.error(f"Database health check failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Database connection failed: {str(e)}")
 
+# Kitespots, keyset-paginated by id
+@app.get("/kitespots", response_model=schemas.KiteSpotPage)
+async def list_kitespots(
+    after_id: Optional[int] = Query(None, ge=0, description="Return spots with an id greater than this"),
+    limit: int = Query(100, ge=1, le=500),
+    country: Optional[str] = None,
+    difficulty: Optional[str] = None,
+    water_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+):
+    logger.info(f"Kitespot list called (after_id={after_id}, limit={limit})")
+    # One extra row tells whether there is a next page
+    kitespots = await crud.get_kitespots(
+        db, after_id=after_id, limit=limit + 1,
+        country=country, difficulty=difficulty, water_type=water_type,
+    )
+    next_after_id = kitespots[limit - 1].id if len(kitespots) > limit else None
+    return {"items": kitespots[:limit], "next_after_id": next_after_id}
+
+# Kitespots within a radius of a point, closest first (declared before /kitespots/{kitespot_id})
+@app.get("/kitespots/nearby")
+async def get_nearby_kitespots(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    radius_km: float = Query(50, gt=0, le=1000),
+    limit: int = Query(20, ge=1, le=100),
+):
+    logger.info(f"Nearby kitespots called ({lat}, {lon}, radius {radius_km} km)")
+    return spatial_index.nearby(lat, lon, radius_km, limit)
+
+# Precomputed kitespot clusters inside a map viewport
+@app.get("/kitespots/map")
+async def get_kitespot_map(
+    bbox: str = Query(..., description="min_lon,min_lat,max_lon,max_lat; min_lon > max_lon crosses the antimeridian"),
+    zoom: int = Query(..., ge=0, le=22),
+):
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(value) for value in bbox.split(","))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="bbox must be min_lon,min_lat,max_lon,max_lat")
+    if not (-180 <= min_lon <= 180 and -180 <= max_lon <= 180 and -90 <= min_lat <= max_lat <= 90):
+        raise HTTPException(status_code=400, detail="bbox is out of range")
+    logger.info(f"Kitespot map called (bbox={bbox}, zoom={zoom})")
+    return {
+        "zoom": min(zoom, MAX_CLUSTER_ZOOM),
+        "clusters": map_clusters.query(min_lon, min_lat, max_lon, max_lat, zoom),
+    }
+
+# Single kitespot
+@app.get("/kitespots/{kitespot_id}", response_model=schemas.KiteSpot)
+async def get_kitespot(kitespot_id: int, db: AsyncSession = Depends(get_db)):
+    logger.info(f"Kitespot {kitespot_id} called")
+    kitespot = await crud.get_kitespot(db, kitespot_id)
+    if kitespot is None:
+        raise HTTPException(status_code=404, detail="Kitespot not found")
+    read_tracker.record(kitespot_id)
+    return kitespot
+
+def conditional_response(request: Request, cached: Optional[CachedForecast]) -> Response:
+    """Answer with the cached body, or 304 if the client's copy is still current"""
+    if cached is None:
+        raise HTTPException(status_code=404, detail="Kitespot not found")
+    if cached.not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=cached.headers)
+    return Response(content=cached.body, media_type="application/json", headers=cached.headers)
+
+async def load_forecast_or_none(kitespot_id: int, start, hours: int):
+    """Forecast hours of a kitespot, or None if the kitespot does not exist"""
+    # Own session: the load is shared by coalesced requests and may outlive this one
+    async with async_session() as session:
+        records = await load_forecast_hours(session, kitespot_id, start, hours)
+        if not records and await crud.get_kitespot(session, kitespot_id) is None:
+            return None
+        return records
+
+async def load_columnar_forecast_or_none(kitespot_id: int, start, hours: int):
+    """Forecast of a kitespot as one quantized array per column, or None if the kitespot does not exist"""
+    async with async_session() as session:
+        found, matrices = await load_forecast_matrix(session, [kitespot_id], start, hours)
+        if not found and await crud.get_kitespot(session, kitespot_id) is None:
+            return None
+    return {
+        "start": start.isoformat(),
+        "step_seconds": 3600,
+        "hours": hours,
+        "columns": columnar_columns(matrices, 0 if found else None, hours),
+    }
+
+# Forecast of a kitespot from the current hour, validated against the last ingest
+@app.get("/kitespots/{kitespot_id}/weather")
+async def get_kitespot_weather(
+    kitespot_id: int,
+    request: Request,
+    hours: int = Query(24, ge=1, le=FORECAST_MAX_HOURS),
+    response_format: ForecastFormat = Query(FORECAST_FORMATS[0], alias="format"),
+):
+    logger.info(f"Weather for kitespot {kitespot_id} called (hours={hours}, format={response_format})")
+    read_tracker.record(kitespot_id)
+
+    start = current_hour()
+    columnar = response_format == "columnar"
+    etag, last_modified = forecast_validators(
+        kitespot_id, hours, ingest_versions.get(kitespot_id), start, variant=forecast_variant(response_format)
+    )
+    load = load_columnar_forecast_or_none if columnar else load_forecast_or_none
+    cached = await cached_response(
+        forecast_cache, forecast_reads, (kitespot_id, hours, response_format), etag, last_modified,
+        lambda: load(kitespot_id, start, hours),
+    )
+    return conditional_response(request, cached)
+
+# Golden kite window of a kitespot within the next hours
+@app.get("/kitespots/{kitespot_id}/golden-window")
+async def get_kitespot_golden_window(
+    kitespot_id: int,
+    request: Request,
+    hours: int = Query(24, ge=1, le=FORECAST_MAX_HOURS),
+):
+    logger.info(f"Golden window for kitespot {kitespot_id} called (hours={hours})")
+    read_tracker.record(kitespot_id)
+
+    start = current_hour()
+    etag, last_modified = forecast_validators(kitespot_id, hours, ingest_versions.get(kitespot_id), start)
+
+    async def load():
+        # Primary-key lookup of the scores materialized at ingest time
+        async with async_session() as session:
+            row = await load_golden_window(session, kitespot_id)
+            if row is None:
+                if await crud.get_kitespot(session, kitespot_id) is None:
+                    return None
+                return calculate_golden_kitewindow([])
+        return golden_window_summary(row, start, hours)
+
+    cached = await cached_response(golden_window_cache, golden_window_reads, (kitespot_id, hours), etag, last_modified, load)
+    return conditional_response(request, cached)
+
+# Forecasts of several kitespots in one query, as one array per column and spot
+@app.get("/weather/batch")
+async def get_weather_batch(
+    ids: str = Query(..., description="Comma-separated kitespot ids"),
+    hours: int = Query(24, ge=1, le=FORECAST_MAX_HOURS),
+    response_format: ForecastFormat = Query(FORECAST_FORMATS[0], alias="format"),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        kitespot_ids = list(dict.fromkeys(int(value) for value in ids.split(",") if value.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be a comma-separated list of integers")
+    if not kitespot_ids:
+        raise HTTPException(status_code=400, detail="No kitespot ids given")
+    if len(kitespot_ids) > WEATHER_BATCH_MAX_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {WEATHER_BATCH_MAX_IDS} kitespot ids per request")
+    logger.info(f"Weather batch called for {len(kitespot_ids)} kitespots (hours={hours}, format={response_format})")
+
+    start = current_hour()
+    if response_format == "columnar":
+        found, matrices = await load_forecast_matrix(db, kitespot_ids, start, hours)
+        forecasts = {kitespot_id: columnar_columns(matrices, row, hours) for row, kitespot_id in enumerate(found)}
+    else:
+        forecasts = await load_forecast_columns(db, kitespot_ids, start, hours)
+    payload = {
+        "start": start.isoformat(),
+        "step_seconds": 3600,
+        "hours": hours,
+        "forecasts": forecasts,
+        "missing": [kitespot_id for kitespot_id in kitespot_ids if kitespot_id not in forecasts],
+    }
+    return Response(content=render_json(payload), media_type="application/json")
+
+# Hour-by-hour kite sizes of a kitespot's forecast for several rider weights
+@app.get("/kitespots/{kitespot_id}/kite-sizes")
+async def get_kitespot_kite_sizes(
+    kitespot_id: int,
+    weights: str = Query("75", description="Comma-separated rider weights in kg"),
+    hours: int = Query(24, ge=1, le=FORECAST_MAX_HOURS),
+    db: AsyncSession = Depends(get_db),
+):
+    try:
+        rider_weights = [float(value) for value in weights.split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="weights must be a comma-separated list of numbers")
+    if not rider_weights or len(rider_weights) > KITE_SIZE_MAX_WEIGHTS:
+        raise HTTPException(status_code=400, detail=f"Give between 1 and {KITE_SIZE_MAX_WEIGHTS} rider weights")
+    if any(not 20 <= weight <= 200 for weight in rider_weights):
+        raise HTTPException(status_code=400, detail="Rider weights must be between 20 and 200 kg")
+    logger.info(f"Kite sizes for kitespot {kitespot_id} called (weights={rider_weights}, hours={hours})")
+    read_tracker.record(kitespot_id)
+
+    records = await load_forecast_hours(db, kitespot_id, current_hour(), hours)
+    if not records and await crud.get_kitespot(db, kitespot_id) is None:
+        raise HTTPException(status_code=404, detail="Kitespot not found")
+
+    def knots(column: str) -> np.ndarray:
+        return np.array(
+            [np.nan if record[column] is None else record[column] for record in records], dtype=np.float64
+        ) / KMH_PER_KNOT
+
+    sizes = kite_size_matrix(knots("wind_speed_10m"), np.array(rider_weights), wind_gust=knots("wind_gusts_10m"))
+    return {
+        "timestamps": [record["timestamp"] for record in records],
+        "weights": rider_weights,
+        **{
+            key: [[None if np.isnan(size) else float(size) for size in row] for row in sizes[key]]
+            for key in ("recommended", "range_low", "range_high")
+        },
+        "confidence": [
+            None if unknown else KITE_BAND_CONFIDENCE[band] for band, unknown in zip(sizes["band"], sizes["unknown"])
+        ],
+        "message": [
+            None if unknown else KITE_BAND_MESSAGE[band] for band, unknown in zip(sizes["band"], sizes["unknown"])
+        ],
+    }
+
+# Best spots right now, ranked by their best upcoming golden window
+@app.get("/rankings/golden-window")
+async def get_golden_window_ranking(
+    hours: int = Query(24, ge=1, le=RANKING_HORIZON_HOURS),
+    region: Optional[str] = Query(None, description="Region or country"),
+    difficulty: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=100),
+):
+    logger.info(f"Golden window ranking called (hours={hours}, region={region}, difficulty={difficulty})")
+    return {
+        "built_for": golden_window_ranking.built_for.isoformat() if golden_window_ranking.built_for else None,
+        "hours": hours,
+        "spots": golden_window_ranking.top(hours, region=region, difficulty=difficulty, limit=limit),
+    }
+
+# Counters of the request coalescing in front of the forecast reads
+@app.get("/stats/single-flight")
+async def single_flight_stats():
+    logger.info("Single-flight stats called")
+    return {
+        "forecast": forecast_reads.stats(),
+        "golden_window": golden_window_reads.stats(),
+    }
+
 # Run the application
 if __name__ == "__main__":
     import uvicorn
@@ -1,5 +1,6 @@
 from datetime import datetime, timezone
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Boolean, ForeignKey, Text, TIMESTAMP, UniqueConstraint, Index
+from sqlalchemy.dialects.postgresql import ARRAY, REAL
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -17,10 +18,18 @@ class User(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    favorite_spots = relationship("FavoriteSpot", back_populates="user")
+    sessions = relationship("KiteSession", back_populates="user")
 
 
 class KiteSpot(Base):
     __tablename__ = "kitespots"
+    __table_args__ = (
+        # Keyset pagination filters on one of these columns and walks id in order
+        Index("ix_kitespots_country_id", "country", "id"),
+        Index("ix_kitespots_difficulty_id", "difficulty", "id"),
+        Index("ix_kitespots_water_type_id", "water_type", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -44,15 +53,23 @@ class KiteSpot(Base):
 
 class KiteSpotWeather(Base):
     __tablename__ = "kitespot_weather"
-
-    id = Column(Integer, primary_key=True, index=True)
+    __table_args__ = (
+        # One row per spot and hour; the weather service upserts on this key
+        UniqueConstraint("kitespot_id", "timestamp", name="uq_kitespot_weather_spot_timestamp"),
+        # Daily partitions are created and dropped by services/weather_partitions.py
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+
+    # The partition key has to be part of the primary key
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     kitespot_id = Column(Integer, ForeignKey("kitespots.id"))
-    timestamp = Column(TIMESTAMP(timezone=True), index=True)
+    timestamp = Column(TIMESTAMP(timezone=True), primary_key=True, index=True)
     temperature = Column(Float, nullable=True)
     humidity = Column(Float, nullable=True)
     precipitation = Column(Float, nullable=True)
     wind_speed_10m = Column(Float, nullable=True)
     wind_direction_10m = Column(Float, nullable=True)
+    wind_gusts_10m = Column(Float, nullable=True)
     cloud_cover = Column(Float, nullable=True)
     visibility = Column(Float, nullable=True)
     created_at = Column(TIMESTAMP(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -61,6 +78,103 @@ class KiteSpotWeather(Base):
     kitespot = relationship("KiteSpot", back_populates="weather_data")
 
 
+class KiteSpotWeatherDaily(Base):
+    """Daily per-spot summary of hourly weather, rolled up before old partitions are dropped."""
+    __tablename__ = "kitespot_weather_daily"
+
+    kitespot_id = Column(Integer, ForeignKey("kitespots.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    hours = Column(Integer, nullable=False)
+    temperature_min = Column(Float, nullable=True)
+    temperature_max = Column(Float, nullable=True)
+    temperature_avg = Column(Float, nullable=True)
+    humidity_avg = Column(Float, nullable=True)
+    precipitation_sum = Column(Float, nullable=True)
+    wind_speed_avg = Column(Float, nullable=True)
+    wind_speed_max = Column(Float, nullable=True)
+    wind_gusts_max = Column(Float, nullable=True)
+    wind_direction_avg = Column(Float, nullable=True)  # circular mean in degrees
+    cloud_cover_avg = Column(Float, nullable=True)
+    visibility_avg = Column(Float, nullable=True)
+
+
+class KiteSpotForecastRun(Base):
+    """
+    Packed forecast storage: one row per spot and forecast run, each variable a float32 array.
+
+    Hour i of a run is at start_time + i * step_seconds. Written when
+    WEATHER_STORAGE_MODE is "packed" or "both"; read via services/forecast_store.py.
+    """
+    __tablename__ = "kitespot_forecast_runs"
+
+    kitespot_id = Column(Integer, ForeignKey("kitespots.id"), primary_key=True)
+    issued_at = Column(TIMESTAMP(timezone=True), primary_key=True)
+    start_time = Column(TIMESTAMP(timezone=True), nullable=False)
+    step_seconds = Column(Integer, nullable=False, default=3600)
+    hours = Column(Integer, nullable=False)
+    temperature = Column(ARRAY(REAL), nullable=True)
+    humidity = Column(ARRAY(REAL), nullable=True)
+    precipitation = Column(ARRAY(REAL), nullable=True)
+    wind_speed_10m = Column(ARRAY(REAL), nullable=True)
+    wind_direction_10m = Column(ARRAY(REAL), nullable=True)
+    wind_gusts_10m = Column(ARRAY(REAL), nullable=True)
+    cloud_cover = Column(ARRAY(REAL), nullable=True)
+    visibility = Column(ARRAY(REAL), nullable=True)
+
+
+class KiteSpotGoldenWindow(Base):
+    """
+    Hour scores and best golden window per spot, materialized by the weather
+    service whenever the spot's forecast changes (services/golden_windows.py).
+
+    hour_scores[i] and wind_knots[i] belong to forecast_start + i hours.
+    """
+    __tablename__ = "kitespot_golden_windows"
+
+    kitespot_id = Column(Integer, ForeignKey("kitespots.id"), primary_key=True)
+    forecast_start = Column(TIMESTAMP(timezone=True), nullable=False)
+    hour_scores = Column(ARRAY(REAL), nullable=False)
+    wind_knots = Column(ARRAY(REAL), nullable=False)
+    window_start = Column(TIMESTAMP(timezone=True), nullable=True)
+    window_hours = Column(Integer, nullable=False, default=0)
+    window_score = Column(Float, nullable=True)
+    window_peak = Column(Float, nullable=True)
+    computed_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+
+class KiteSpotDaylight(Base):
+    """
+    Sunrise and sunset per spot and UTC day, computed locally by services/solar.py.
+
+    Under midnight sun the day runs from 12 hours before to 12 hours after
+    solar noon; in polar night sunrise equals sunset.
+    """
+    __tablename__ = "kitespot_daylight"
+
+    kitespot_id = Column(Integer, ForeignKey("kitespots.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    sunrise = Column(TIMESTAMP(timezone=True), nullable=False)
+    sunset = Column(TIMESTAMP(timezone=True), nullable=False)
+
+
+class WeatherIngestState(Base):
+    """Per-spot bookkeeping of the weather ingest, written by the weather service."""
+    __tablename__ = "kitespot_weather_ingest"
+
+    kitespot_id = Column(Integer, ForeignKey("kitespots.id"), primary_key=True)
+    last_ingested_at = Column(TIMESTAMP(timezone=True), nullable=False)  # last successful refresh
+    last_changed_at = Column(TIMESTAMP(timezone=True), nullable=True)  # last refresh that changed a value
+
+
+class KiteSpotReadStat(Base):
+    """How often and how recently a spot was served by the API, flushed in batches."""
+    __tablename__ = "kitespot_read_stats"
+
+    kitespot_id = Column(Integer, ForeignKey("kitespots.id"), primary_key=True)
+    read_count = Column(Integer, nullable=False, default=0)
+    last_read_at = Column(TIMESTAMP(timezone=True), nullable=False)
+
+
 class FavoriteSpot(Base):
     __tablename__ = "favorite_spots"
 
@@ -1,45 +1,145 @@
 import asyncio
-import schedule
-import time
 import logging
-import sys
 import os
+import random
+import signal
+import sys
+from datetime import datetime, timezone
+from typing import Optional
 
 # Add the parent directory to the path so we can import modules from there
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from database import engine, async_session
 # Import the weather service from the services directory
 from services.weather_service import OpenMeteoWeatherService
+from services.refresh_planner import RefreshPlanner
+from services.weather_partitions import apply_retention
+from services.forecast_store import prune_forecast_runs
+from services.solar import refresh_daylight
+from services.scoring_rules import scoring_rules
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("weather-scheduler")
 
-async def update_weather():
-    """Update weather data for all kitespots"""
-    logger.info("Starting scheduled weather update")
-    service = OpenMeteoWeatherService()
-    await service.fetch_and_store_weather_data()
-    logger.info("Completed scheduled weather update")
+# Seconds between runs of the refresh planner (0: the planner's tick interval, the shortest tier interval)
+REFRESH_INTERVAL = int(os.getenv("WEATHER_REFRESH_INTERVAL", 0))
+# Random delay (seconds) added to every start so restarts don't hit the API in lockstep
+START_JITTER = int(os.getenv("WEATHER_START_JITTER", 60))
+# How long a running update may take to finish after SIGTERM before it is cancelled
+SHUTDOWN_TIMEOUT = int(os.getenv("WEATHER_SHUTDOWN_TIMEOUT", 120))
+
+
+class WeatherScheduler:
+    """
+    Long-lived asyncio scheduler for the weather service.
+
+    One event loop, one weather service (HTTP session, rate limiter) and the
+    shared database engine live for the whole process. Every run refreshes the
+    spots the refresh planner reports as due. A run that is still in progress
+    when the next one is due causes that next run to be skipped.
+    """
+
+    def __init__(self, service: OpenMeteoWeatherService, planner: Optional[RefreshPlanner] = None,
+                 interval: float = REFRESH_INTERVAL, jitter: float = START_JITTER):
+        self.service = service
+        self.planner = planner or RefreshPlanner()
+        self.interval = interval or self.planner.tick_interval.total_seconds()
+        self.jitter = jitter
+        self._stop = asyncio.Event()
+        self._current: Optional[asyncio.Task] = None
+        self._retention_day = None
+        self._daylight_day = None
+
+    async def update_weather(self):
+        """Update weather data for the kitespots that are due"""
+        logger.info("Starting scheduled weather update")
+        try:
+            # Extend the sunrise/sunset table before scoring the day's forecasts
+            today = datetime.now(timezone.utc).date()
+            if self._daylight_day != today:
+                await refresh_daylight()
+                self._daylight_day = today
+
+            async with async_session() as session:
+                due = await self.planner.due_spots(session)
+            if due:
+                await self.service.fetch_and_store_weather_data(due)
+            else:
+                logger.info("No kitespots due for a refresh")
+
+            # Roll up and drop expired partitions (and prune old packed runs) once per UTC day
+            today = datetime.now(timezone.utc).date()
+            if self._retention_day != today:
+                if self.service.storage_mode in ("rows", "both"):
+                    await apply_retention()
+                if self.service.storage_mode in ("packed", "both"):
+                    await prune_forecast_runs()
+                self._retention_day = today
+        except Exception as e:
+            logger.error(f"Scheduled weather update failed: {e}", exc_info=True)
+        logger.info("Completed scheduled weather update")
+
+    def start_run(self):
+        """Start an update in the background unless the previous one is still running"""
+        if self._current is not None and not self._current.done():
+            logger.warning("Previous weather update is still running, skipping this run")
+            return
+        self._current = asyncio.create_task(self.update_weather())
+
+    def stop(self):
+        """Request a graceful shutdown (installed as SIGTERM/SIGINT handler)"""
+        if not self._stop.is_set():
+            logger.info("Shutdown requested")
+            self._stop.set()
+
+    async def run(self):
+        """Run updates every interval until stopped, then shut down gracefully"""
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.stop)
+
+        # Run immediately on startup (plus jitter), then on a fixed cadence
+        next_run = loop.time()
+        while not self._stop.is_set():
+            delay = max(0.0, next_run - loop.time()) + random.uniform(0, self.jitter)
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=delay)
+                break
+            except asyncio.TimeoutError:
+                pass
+
+            self.start_run()
+
+            # Skip slots that were missed instead of firing them back to back
+            next_run += self.interval
+            while next_run <= loop.time():
+                next_run += self.interval
+
+        await self.shutdown()
+
+    async def shutdown(self):
+        """Let a running update finish (bounded by SHUTDOWN_TIMEOUT) and release resources"""
+        if self._current is not None and not self._current.done():
+            logger.info(f"Waiting up to {SHUTDOWN_TIMEOUT}s for the running weather update to finish")
+            done, _ = await asyncio.wait({self._current}, timeout=SHUTDOWN_TIMEOUT)
+            if not done:
+                logger.warning("Weather update did not finish in time, cancelling it")
+                self._current.cancel()
+                await asyncio.gather(self._current, return_exceptions=True)
+
+        await engine.dispose()
+        logger.info("Weather scheduler stopped")
 
-def run_weather_update():
-    """Run the weather update asynchronously"""
-    asyncio.run(update_weather())
 
-def main():
+async def main():
     """Main function to run the scheduler"""
-    logger.info("Starting weather scheduler")
-    
-    # Run immediately on startup
-    run_weather_update()
-    
-    # Schedule to run every hour
-    schedule.every().hour.do(run_weather_update)
-    
-    # Keep the script running
-    while True:
-        schedule.run_pending()
-        time.sleep(60)  # Check every minute
+    # Fail fast on a broken SCORING_RULES_FILE, before any forecast is scored
+    scoring_rules()
+    scheduler = WeatherScheduler(OpenMeteoWeatherService())
+    logger.info(f"Starting weather scheduler (interval {scheduler.interval:.0f}s, jitter {START_JITTER}s)")
+    await scheduler.run()
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
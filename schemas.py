@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import List, Optional
 from datetime import datetime
 
@@ -15,16 +15,21 @@ class User(UserBase):
     is_active: bool
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # KiteSpot schemas
 class KiteSpotBase(BaseModel):
     name: str
-    country: str
+    country: Optional[str] = None
     latitude: float
     longitude: float
     description: Optional[str] = None
+    region: Optional[str] = None
+    city: Optional[str] = None
+    difficulty: Optional[str] = None
+    water_type: Optional[str] = None
+    best_wind_direction: Optional[str] = None
+    best_season: Optional[str] = None
 
 class KiteSpotCreate(KiteSpotBase):
     pass
@@ -33,8 +38,12 @@ class KiteSpot(KiteSpotBase):
     id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class KiteSpotPage(BaseModel):
+    items: List[KiteSpot]
+    # Pass as after_id to get the next page; None on the last page
+    next_after_id: Optional[int] = None
 
 # FavoriteSpot schemas
 class FavoriteSpotCreate(BaseModel):
@@ -46,8 +55,7 @@ class FavoriteSpot(BaseModel):
     kitespot_id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 # KiteSession schemas
 class KiteSessionBase(BaseModel):
@@ -66,5 +74,4 @@ class KiteSession(KiteSessionBase):
     user_id: int
     created_at: datetime
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
@@ -0,0 +1,414 @@
+import logging
+import os
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Tuple, get_args
+
+import numpy as np
+import orjson
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_session
+from services.forecast_store import PACKED_COLUMNS, hour_matrices, load_forecast, load_forecasts
+from services.single_flight import SingleFlight
+from services.solar import is_day, load_daylight
+from services.spatial_index import REFRESH_OVERLAP
+
+logger = logging.getLogger("kitespot-api.forecast-cache")
+
+# Which table the API reads forecasts from; mirrors the weather service setting
+STORAGE_MODE = os.getenv("WEATHER_STORAGE_MODE", "rows")
+# Cached forecast responses kept in memory
+FORECAST_CACHE_SIZE = int(os.getenv("FORECAST_CACHE_SIZE", 2048))
+# Seconds between polls of kitespot_weather_ingest for new forecast versions
+INGEST_VERSION_POLL_INTERVAL = int(os.getenv("INGEST_VERSION_POLL_INTERVAL", 30))
+
+FORECAST_COLUMNS = PACKED_COLUMNS
+
+# Response layouts: one dictionary per hour, or one quantized array per column; the first is the default
+ForecastFormat = Literal["records", "columnar"]
+FORECAST_FORMATS = get_args(ForecastFormat)
+# Decimals kept per column in columnar responses (0 gives integers)
+COLUMN_DECIMALS = {
+    "temperature": 1,
+    "humidity": 0,
+    "precipitation": 1,
+    "wind_speed_10m": 1,
+    "wind_direction_10m": 0,
+    "wind_gusts_10m": 1,
+    "cloud_cover": 0,
+    "visibility": 0,
+    "is_day": 0,
+}
+
+FORECAST_ROWS_SQL = f"""
+    SELECT timestamp, {", ".join(FORECAST_COLUMNS)}
+    FROM kitespot_weather
+    WHERE kitespot_id = :kitespot_id
+    AND timestamp >= :start
+    AND timestamp < :end
+    ORDER BY timestamp
+"""
+
+BATCH_FORECAST_ROWS_SQL = f"""
+    SELECT kitespot_id, timestamp, {", ".join(FORECAST_COLUMNS)}
+    FROM kitespot_weather
+    WHERE kitespot_id = ANY(CAST(:kitespot_ids AS integer[]))
+    AND timestamp >= :start
+    AND timestamp < :end
+"""
+
+INGEST_VERSIONS_SQL = """
+    SELECT kitespot_id, last_ingested_at, last_changed_at
+    FROM kitespot_weather_ingest
+    WHERE CAST(:since AS timestamptz) IS NULL OR last_ingested_at >= :since
+"""
+
+
+def current_hour(now: Optional[datetime] = None) -> datetime:
+    """Start of the current UTC hour; forecast reads begin here."""
+    now = now or datetime.now(timezone.utc)
+    return now.replace(minute=0, second=0, microsecond=0)
+
+
+async def load_forecast_hours(
+    session: AsyncSession,
+    kitespot_id: int,
+    start: datetime,
+    hours: int,
+) -> List[Dict[str, Any]]:
+    """
+    Stored forecast of a kitespot from start for the given number of hours.
+
+    Reads kitespot_weather, or the latest packed run when WEATHER_STORAGE_MODE
+    is "packed".
+
+    Returns:
+        One dictionary per hour with timestamp, the weather columns and is_day
+        (1, 0 or None when kitespot_daylight has no data for the hour)
+    """
+    end = start + timedelta(hours=hours)
+    if STORAGE_MODE == "packed":
+        forecast = await load_forecast(session, kitespot_id, since=start)
+        if forecast is None:
+            return []
+        timestamps = forecast["timestamp"]
+        keep = int(np.searchsorted(timestamps, np.datetime64(end.replace(tzinfo=None), "s")))
+        records = []
+        seconds = []
+        for index in range(keep):
+            record = {"timestamp": timestamps[index].item().replace(tzinfo=timezone.utc).isoformat()}
+            for column in FORECAST_COLUMNS:
+                value = float(forecast[column][index])
+                record[column] = None if np.isnan(value) else round(value, 2)
+            records.append(record)
+            seconds.append(int(timestamps[index].astype(np.int64)))
+    else:
+        result = await session.execute(
+            text(FORECAST_ROWS_SQL), {"kitespot_id": kitespot_id, "start": start, "end": end}
+        )
+        rows = result.fetchall()
+        records = [
+            {"timestamp": row.timestamp.isoformat(), **{column: getattr(row, column) for column in FORECAST_COLUMNS}}
+            for row in rows
+        ]
+        seconds = [row.timestamp.timestamp() for row in rows]
+
+    if records:
+        daylight = await load_daylight(session, [kitespot_id], start, end)
+        for record, day in zip(records, is_day(daylight, np.array([kitespot_id]), np.array([seconds]))[0]):
+            record["is_day"] = None if np.isnan(day) else int(day)
+    return records
+
+
+def _column_lists(matrix: np.ndarray) -> List[List[Optional[float]]]:
+    """Rows of a spots x hours matrix as JSON lists, NaN as None."""
+    rounded = np.round(matrix.astype(np.float64), 2).astype(object)
+    rounded[np.isnan(matrix)] = None
+    return rounded.tolist()
+
+
+def quantize(values: np.ndarray, decimals: int) -> Any:
+    """
+    Values rounded to decimals, ready for render_json.
+
+    Returns a NumPy array (NaN renders as null), or a list when whole numbers
+    have gaps, since integer arrays cannot hold NaN.
+    """
+    rounded = np.round(np.asarray(values, dtype=np.float64), decimals)
+    if decimals > 0:
+        return rounded
+    missing = np.isnan(rounded)
+    if not missing.any():
+        return rounded.astype(np.int64)
+    whole = rounded.astype(object)
+    whole[~missing] = rounded[~missing].astype(np.int64).tolist()
+    whole[missing] = None
+    return whole.tolist()
+
+
+def columnar_columns(matrices: Dict[str, np.ndarray], row: Optional[int], hours: int) -> Dict[str, Any]:
+    """
+    One quantized array per column for one row of load_forecast_matrix's matrices.
+
+    A row of None (a spot without stored forecast) gives all-null arrays.
+    """
+    columns = {}
+    for column, matrix in matrices.items():
+        values = matrix[row] if row is not None else np.full(hours, np.nan)
+        columns[column] = quantize(values, COLUMN_DECIMALS.get(column, 2))
+    return columns
+
+
+def render_json(payload: Any) -> bytes:
+    """Serialize a response with orjson; NumPy arrays are written natively and NaN becomes null."""
+    return orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+
+
+async def _is_day_matrix(session: AsyncSession, kitespot_ids: List[int], start: datetime, hours: int) -> np.ndarray:
+    if not kitespot_ids:
+        return np.zeros((0, hours), dtype=np.float64)
+    daylight = await load_daylight(session, kitespot_ids, start, start + timedelta(hours=hours))
+    hour_seconds = start.timestamp() + np.arange(hours, dtype=np.float64) * 3600
+    return is_day(daylight, np.array(kitespot_ids), np.broadcast_to(hour_seconds, (len(kitespot_ids), hours)))
+
+
+async def load_forecast_matrix(
+    session: AsyncSession,
+    kitespot_ids: List[int],
+    start: datetime,
+    hours: int,
+) -> Tuple[List[int], Dict[str, np.ndarray]]:
+    """
+    Forecasts of several kitespots in one query as (spots x hours) matrices.
+
+    Hour i of every row is start + i hours; hours without data are NaN.
+    Besides the weather columns there is an "is_day" matrix (1 by day, 0 at
+    night) read from kitespot_daylight.
+
+    Returns:
+        Tuple of (ids of the kitespots with stored forecast hours in the
+        window, in row order;
+        column -> matrix)
+    """
+    if STORAGE_MODE == "packed":
+        forecasts = await load_forecasts(session, kitespot_ids, since=start)
+        runs = list(forecasts.values())
+        kitespot_column = np.repeat(np.array(list(forecasts), dtype=np.int64), [len(run["timestamp"]) for run in runs])
+        seconds = np.concatenate([np.zeros(0, dtype="datetime64[s]")] + [run["timestamp"] for run in runs])
+        seconds = seconds.astype(np.int64)
+        values = {
+            column: np.concatenate([np.zeros(0, dtype=np.float32)] + [run[column] for run in runs])
+            for column in FORECAST_COLUMNS
+        }
+    else:
+        result = await session.execute(
+            text(BATCH_FORECAST_ROWS_SQL),
+            {"kitespot_ids": kitespot_ids, "start": start, "end": start + timedelta(hours=hours)},
+        )
+        rows = result.fetchall()
+        kitespot_column = [row.kitespot_id for row in rows]
+        seconds = [int(row.timestamp.timestamp()) for row in rows]
+        values = {
+            column: [row[index] for row in rows] for index, column in enumerate(FORECAST_COLUMNS, start=2)
+        }
+
+    aligned = hour_matrices(
+        kitespot_column, seconds, values, FORECAST_COLUMNS, start=int(start.timestamp()), hours=hours
+    )
+    found = [int(kitespot_id) for kitespot_id in aligned.kitespot_ids]
+    matrices = dict(aligned.matrices)
+    matrices["is_day"] = await _is_day_matrix(session, found, start, hours)
+    return found, matrices
+
+
+async def load_forecast_columns(
+    session: AsyncSession,
+    kitespot_ids: List[int],
+    start: datetime,
+    hours: int,
+) -> Dict[int, Dict[str, List[Optional[float]]]]:
+    """
+    Forecasts of several kitespots in one query as JSON-ready lists per column.
+
+    Returns:
+        Mapping of kitespot id to one list per weather column and is_day (None
+        where an hour has no data); kitespots without stored forecast are left out
+    """
+    found, matrices = await load_forecast_matrix(session, kitespot_ids, start, hours)
+    lists = {column: _column_lists(matrix) for column, matrix in matrices.items()}
+    return {
+        kitespot_id: {column: lists[column][row] for column in matrices}
+        for row, kitespot_id in enumerate(found)
+    }
+
+
+class IngestVersions:
+    """
+    In-memory copy of when each kitespot's forecast last changed.
+
+    Polled from kitespot_weather_ingest, so validating a cached forecast never
+    needs a query. Versions may lag an ingest by up to the poll interval.
+    """
+
+    def __init__(self):
+        self._versions: Dict[int, datetime] = {}
+        self._newest: Optional[datetime] = None
+
+    def get(self, kitespot_id: int) -> Optional[datetime]:
+        """When the kitespot's stored forecast last changed, if it was ever ingested."""
+        return self._versions.get(kitespot_id)
+
+    async def refresh(self) -> int:
+        """
+        Pick up ingests since the previous poll.
+
+        Returns:
+            Number of kitespots whose version changed
+        """
+        since = self._newest - REFRESH_OVERLAP if self._newest else None
+        async with async_session() as session:
+            result = await session.execute(text(INGEST_VERSIONS_SQL), {"since": since})
+            rows = result.fetchall()
+
+        changed = 0
+        for row in rows:
+            version = row.last_changed_at or row.last_ingested_at
+            if self._versions.get(row.kitespot_id) != version:
+                self._versions[row.kitespot_id] = version
+                changed += 1
+            if self._newest is None or row.last_ingested_at > self._newest:
+                self._newest = row.last_ingested_at
+
+        if changed:
+            logger.debug(f"Forecast versions changed for {changed} kitespots")
+        return changed
+
+
+class CachedForecast:
+    """A rendered forecast response with its validators."""
+
+    def __init__(self, etag: str, last_modified: datetime, body: bytes):
+        self.etag = etag
+        self.last_modified = last_modified
+        self.body = body
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "ETag": self.etag,
+            "Last-Modified": format_datetime(self.last_modified, usegmt=True),
+            # Clients may keep the response but must revalidate before reuse
+            "Cache-Control": "no-cache",
+        }
+
+    def not_modified(self, if_none_match: Optional[str], if_modified_since: Optional[str]) -> bool:
+        """Evaluate the request's conditional headers (If-None-Match wins, as in RFC 9110)."""
+        if if_none_match:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or any(tag.removeprefix("W/") == self.etag.removeprefix("W/") for tag in tags)
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+            if since.tzinfo is None:
+                since = since.replace(tzinfo=timezone.utc)
+            return self.last_modified <= since
+        return False
+
+
+def forecast_validators(
+    kitespot_id: int,
+    hours: int,
+    version: Optional[datetime],
+    start: datetime,
+    variant: str = "",
+) -> Tuple[str, datetime]:
+    """
+    ETag and Last-Modified of a forecast response.
+
+    The response depends on the stored forecast version and on the hour the
+    forecast window starts, so both are part of the validators. variant tells
+    apart other renderings of the same forecast (e.g. the columnar format).
+    """
+    version_ts = int(version.timestamp()) if version else 0
+    suffix = f"-{variant}" if variant else ""
+    etag = f'W/"{kitespot_id}-{hours}-{version_ts}-{int(start.timestamp())}{suffix}"'
+    last_modified = max(version, start) if version else start
+    return etag, last_modified.replace(microsecond=0)
+
+
+def forecast_variant(response_format: str) -> str:
+    """ETag variant of a response format: empty for the default format, else the format name."""
+    if response_format not in FORECAST_FORMATS:
+        raise ValueError(f"Unknown forecast format {response_format!r}, expected one of {', '.join(FORECAST_FORMATS)}")
+    return "" if response_format == FORECAST_FORMATS[0] else response_format
+
+
+class ForecastCache:
+    """Bounded LRU of rendered JSON responses keyed by (kitespot_id, hours[, format])."""
+
+    def __init__(self, max_entries: int = FORECAST_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple, CachedForecast]" = OrderedDict()
+
+    def get(self, key: Tuple, etag: str) -> Optional[CachedForecast]:
+        """The cached response for key if it was rendered for the same ETag."""
+        entry = self._entries.get(key)
+        if entry is None or entry.etag != etag:
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple, etag: str, last_modified: datetime, payload: Any) -> CachedForecast:
+        """Render and cache a response, evicting the least recently used ones."""
+        entry = CachedForecast(etag, last_modified, render_json(payload))
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+
+async def cached_response(
+    cache: ForecastCache,
+    flight: SingleFlight,
+    key: Tuple,
+    etag: str,
+    last_modified: datetime,
+    load: Callable[[], Awaitable[Optional[Any]]],
+) -> Optional[CachedForecast]:
+    """
+    Cached response for key, loading it at most once across concurrent requests.
+
+    Args:
+        cache: Cache holding the rendered responses
+        flight: Coalesces concurrent loads of the same key and version
+        key: (kitespot_id, hours[, format])
+        etag: Current ETag of the response
+        last_modified: Current Last-Modified of the response
+        load: Produces the payload with its own session; None if the spot does not exist
+
+    Returns:
+        The cached response, or None if load returned None
+    """
+    cached = cache.get(key, etag)
+    if cached is not None:
+        return cached
+
+    async def render() -> Optional[CachedForecast]:
+        payload = await load()
+        if payload is None:
+            return None
+        return cache.put(key, etag, last_modified, payload)
+
+    return await flight.do((key, etag), render)
+
+
+# Ingest versions key both caches; golden windows are cached apart from forecasts
+ingest_versions = IngestVersions()
+forecast_cache = ForecastCache()
+golden_window_cache = ForecastCache()
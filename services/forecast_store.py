@@ -0,0 +1,304 @@
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_session
+
+logger = logging.getLogger("kitespot-weather-service.forecast-store")
+
+RUNS_TABLE = "kitespot_forecast_runs"
+RUNS_STAGING_TABLE = "kitespot_forecast_runs_staging"
+
+# Packed variables, in kitespot_weather column names
+PACKED_COLUMNS = [
+    "temperature",
+    "humidity",
+    "precipitation",
+    "wind_speed_10m",
+    "wind_direction_10m",
+    "wind_gusts_10m",
+    "cloud_cover",
+    "visibility",
+]
+RUN_COLUMNS = ["kitespot_id", "issued_at", "start_time", "step_seconds", "hours"] + PACKED_COLUMNS
+
+# Forecast hours are one hour apart
+STEP_SECONDS = 3600
+
+# Old runs are pruned after this many days (the latest run of a spot is always kept)
+RUN_RETENTION_DAYS = int(os.getenv("WEATHER_RUN_RETENTION_DAYS", 2))
+
+# Staged runs only become a new row when they differ from the spot's latest run
+INSERT_RUNS_SQL = f"""
+    INSERT INTO {RUNS_TABLE} ({", ".join(RUN_COLUMNS)})
+    SELECT {", ".join(f"s.{column}" for column in RUN_COLUMNS)}
+    FROM {RUNS_STAGING_TABLE} s
+    LEFT JOIN LATERAL (
+        SELECT start_time, step_seconds, {", ".join(PACKED_COLUMNS)}
+        FROM {RUNS_TABLE} r
+        WHERE r.kitespot_id = s.kitespot_id
+        ORDER BY r.issued_at DESC
+        LIMIT 1
+    ) latest ON TRUE
+    WHERE (latest.start_time, latest.step_seconds, {", ".join(f"latest.{column}" for column in PACKED_COLUMNS)})
+        IS DISTINCT FROM (s.start_time, s.step_seconds, {", ".join(f"s.{column}" for column in PACKED_COLUMNS)})
+    ON CONFLICT (kitespot_id, issued_at) DO UPDATE SET
+        {", ".join(f"{column} = EXCLUDED.{column}" for column in RUN_COLUMNS[2:])}
+    RETURNING kitespot_id
+"""
+
+LATEST_RUNS_SQL = f"""
+    SELECT DISTINCT ON (kitespot_id) {", ".join(RUN_COLUMNS)}
+    FROM {RUNS_TABLE}
+    WHERE kitespot_id = ANY(CAST(:kitespot_ids AS integer[]))
+    ORDER BY kitespot_id, issued_at DESC
+"""
+
+PRUNE_RUNS_SQL = f"""
+    DELETE FROM {RUNS_TABLE} r
+    WHERE r.issued_at < :cutoff
+    AND EXISTS (
+        SELECT 1 FROM {RUNS_TABLE} newer
+        WHERE newer.kitespot_id = r.kitespot_id
+        AND newer.issued_at > r.issued_at
+    )
+"""
+
+
+class HourMatrices(NamedTuple):
+    """Forecast values of several spots laid out on a regular hour grid."""
+    kitespot_ids: np.ndarray          # (spots,) sorted
+    starts: np.ndarray                # (spots,) Unix seconds of column 0
+    lengths: np.ndarray               # (spots,) columns up to the spot's last value
+    matrices: Dict[str, np.ndarray]   # column -> (spots, hours), NaN where an hour has no value
+
+
+def hour_matrices(
+    kitespot_ids: Any,
+    seconds: Any,
+    values: Mapping[str, Any],
+    columns: Iterable[str],
+    start: Optional[int] = None,
+    hours: Optional[int] = None,
+    per_spot_start: bool = False,
+    step_seconds: int = STEP_SECONDS,
+    dtype: Any = np.float64,
+) -> HourMatrices:
+    """
+    Lays long-format forecast values out as one (spots x hours) matrix per column.
+
+    Column j of a spot's row is its start + j * step_seconds; values off the
+    grid window are dropped and missing hours, missing values and columns
+    absent from values are NaN.
+
+    Args:
+        kitespot_ids: Kitespot id per value, shape (values,)
+        seconds: Unix seconds per value, shape (values,)
+        values: Column -> values (array, list or pandas Series), shape (values,)
+        columns: Columns to lay out
+        start: Unix seconds of column 0 for every spot (default: the first
+            hour in the data, per spot with per_spot_start)
+        hours: Number of columns (default: up to the last value)
+        per_spot_start: Start every spot at its own first hour
+        step_seconds: Spacing of the columns
+        dtype: Float type of the matrices
+
+    Returns:
+        HourMatrices with one row per distinct kitespot id
+    """
+    kitespot_ids, spot_index = np.unique(np.asarray(kitespot_ids, dtype=np.int64), return_inverse=True)
+    spot_index = spot_index.reshape(-1)
+    seconds = np.asarray(seconds, dtype=np.int64)
+
+    if start is not None:
+        starts = np.full(len(kitespot_ids), int(start), dtype=np.int64)
+    elif len(seconds):
+        starts = np.full(len(kitespot_ids), np.iinfo(np.int64).max, dtype=np.int64)
+        np.minimum.at(starts, spot_index, seconds)
+        starts = starts // step_seconds * step_seconds
+        if not per_spot_start:
+            starts[:] = starts.min()
+    else:
+        starts = np.zeros(0, dtype=np.int64)
+
+    positions = (seconds - starts[spot_index]) // step_seconds
+    keep = positions >= 0
+    if hours is not None:
+        keep &= positions < hours
+    lengths = np.zeros(len(kitespot_ids), dtype=np.int64)
+    np.maximum.at(lengths, spot_index[keep], positions[keep] + 1)
+    if hours is None:
+        hours = int(lengths.max()) if len(lengths) else 0
+
+    matrices = {}
+    for column in columns:
+        matrix = np.full((len(kitespot_ids), hours), np.nan, dtype=dtype)
+        if column in values:
+            matrix[spot_index[keep], positions[keep]] = _float_values(values[column], dtype)[keep]
+        matrices[column] = matrix
+    return HourMatrices(kitespot_ids, starts, lengths, matrices)
+
+
+def _float_values(values: Any, dtype: Any) -> np.ndarray:
+    """Values as a float array with NaN for None and pandas NA."""
+    if hasattr(values, "to_numpy"):
+        return values.to_numpy(dtype=dtype, na_value=np.nan)
+    return np.asarray(values, dtype=dtype)
+
+
+def pack_forecasts(rows: pd.DataFrame, issued_at: datetime, step_seconds: int = STEP_SECONDS) -> List[tuple]:
+    """
+    Packs a long-format forecast table into one record per kitespot.
+
+    Every spot's hours are laid out on a regular grid starting at its first
+    hour; hours missing from the input are stored as NaN.
+
+    Args:
+        rows: Long-format table with kitespot_id, timestamp (UTC) and value columns
+        issued_at: When the forecast was ingested
+        step_seconds: Spacing of the forecast hours
+
+    Returns:
+        Records in RUN_COLUMNS order, ready for COPY
+    """
+    if rows.empty:
+        return []
+
+    seconds = rows["timestamp"].dt.tz_convert(None).to_numpy(dtype="datetime64[s]").astype(np.int64)
+    packed = hour_matrices(
+        rows["kitespot_id"], seconds, rows, PACKED_COLUMNS,
+        per_spot_start=True, step_seconds=step_seconds, dtype=np.float32,
+    )
+
+    records = []
+    for index, kitespot_id in enumerate(packed.kitespot_ids):
+        length = int(packed.lengths[index])
+        records.append((
+            int(kitespot_id),
+            issued_at,
+            datetime.fromtimestamp(int(packed.starts[index]), tz=timezone.utc),
+            step_seconds,
+            length,
+            *(packed.matrices[column][index, :length].tolist() for column in PACKED_COLUMNS),
+        ))
+    return records
+
+
+async def copy_to_staging(
+    session: AsyncSession,
+    staging_table: str,
+    table: str,
+    columns: List[str],
+    records: List[tuple],
+):
+    """
+    Streams records with asyncpg's COPY into a temporary copy of table's columns.
+
+    The staging table lives on the session's connection and is dropped when
+    the caller's transaction commits.
+    """
+    await session.execute(text(f"""
+        CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS
+        SELECT {", ".join(columns)} FROM {table} WITH NO DATA
+    """))
+    connection = await session.connection()
+    raw_connection = await connection.get_raw_connection()
+    await raw_connection.driver_connection.copy_records_to_table(staging_table, records=records, columns=columns)
+
+
+async def write_forecast_runs(session: AsyncSession, rows: pd.DataFrame, issued_at: datetime) -> List[int]:
+    """
+    Stores a batch of forecasts as packed runs within the caller's transaction.
+
+    Runs are streamed into a temporary staging table with COPY; a spot only
+    gets a new run when its forecast differs from its latest stored run.
+
+    Returns:
+        Sorted ids of the kitespots that got a new run
+    """
+    records = pack_forecasts(rows, issued_at)
+    if not records:
+        return []
+
+    await copy_to_staging(session, RUNS_STAGING_TABLE, RUNS_TABLE, RUN_COLUMNS, records)
+    result = await session.execute(text(INSERT_RUNS_SQL))
+    return sorted({row.kitespot_id for row in result.fetchall()})
+
+
+def unpack_run(run: Any, since: Optional[datetime] = None) -> Dict[str, np.ndarray]:
+    """
+    Turns a kitespot_forecast_runs row into NumPy arrays.
+
+    Args:
+        run: Row with the RUN_COLUMNS attributes
+        since: Drop the hours before this time
+
+    Returns:
+        Dictionary with "timestamp" (datetime64[s], UTC) and one float32 array per
+        packed column
+    """
+    start = np.datetime64(run.start_time.astimezone(timezone.utc).replace(tzinfo=None), "s")
+    timestamps = start + np.arange(run.hours, dtype=np.int64) * np.timedelta64(run.step_seconds, "s")
+    first = 0
+    if since is not None:
+        since = np.datetime64(since.astimezone(timezone.utc).replace(tzinfo=None), "s")
+        first = int(np.searchsorted(timestamps, since))
+
+    arrays = {"timestamp": timestamps[first:]}
+    for column in PACKED_COLUMNS:
+        values = getattr(run, column)
+        if values is None:
+            arrays[column] = np.full(len(timestamps) - first, np.nan, dtype=np.float32)
+        else:
+            arrays[column] = np.asarray(values, dtype=np.float32)[first:]
+    return arrays
+
+
+async def load_forecasts(
+    session: AsyncSession,
+    kitespot_ids: Iterable[int],
+    since: Optional[datetime] = None,
+) -> Dict[int, Dict[str, np.ndarray]]:
+    """
+    Latest packed forecast of several kitespots, one row fetched per spot.
+
+    Returns:
+        Mapping of kitespot id to the arrays of unpack_run; spots without a
+        stored run are left out
+    """
+    result = await session.execute(
+        text(LATEST_RUNS_SQL), {"kitespot_ids": [int(kitespot_id) for kitespot_id in kitespot_ids]}
+    )
+    return {run.kitespot_id: unpack_run(run, since) for run in result.fetchall()}
+
+
+async def load_forecast(
+    session: AsyncSession,
+    kitespot_id: int,
+    since: Optional[datetime] = None,
+) -> Optional[Dict[str, np.ndarray]]:
+    """Latest packed forecast of one kitespot as NumPy arrays, or None if it has none."""
+    forecasts = await load_forecasts(session, [kitespot_id], since)
+    return forecasts.get(kitespot_id)
+
+
+async def prune_forecast_runs(retention_days: int = RUN_RETENTION_DAYS) -> int:
+    """
+    Delete superseded runs issued before the retention period.
+
+    Returns:
+        Number of runs deleted
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    async with async_session() as session:
+        result = await session.execute(text(PRUNE_RUNS_SQL), {"cutoff": cutoff})
+        await session.commit()
+    if result.rowcount:
+        logger.info(f"Pruned {result.rowcount} forecast runs issued before {cutoff:%Y-%m-%d %H:%M}")
+    return result.rowcount
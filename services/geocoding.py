@@ -1,7 +1,8 @@
-import aiohttp
 import logging
 from typing import Tuple, Dict, Any
 
+from services.http_client import http_client
+
 logger = logging.getLogger("kitespot-api.geocoding")
 
 # LocationIQ API key - you should replace this with your own
@@ -10,6 +11,9 @@ LOCATIONIQ_API_KEY = "pk.7d195946b1d5836bbef50b02dc8a4a41"
 # Cache for geocoding results to reduce API calls
 geocoding_cache = {}
 
+# Seconds a reverse geocoding response is served from the HTTP client cache
+REVERSE_GEOCODING_CACHE_TTL = 24 * 3600
+
 async def geocode_location(location: str) -> Tuple[float, float]:
     """
     Geocodes a location string to latitude and longitude coordinates.
@@ -51,28 +55,26 @@ async def geocode_location(location: str) -> Tuple[float, float]:
     
     try:
         # Use LocationIQ API for geocoding
-        url = f"https://us1.locationiq.com/v1/search.php?key={LOCATIONIQ_API_KEY}&q={location}&format=json"
+        status, data = await http_client.get_json(
+            "https://us1.locationiq.com/v1/search.php",
+            params={"key": LOCATIONIQ_API_KEY, "q": location, "format": "json"},
+        )
+        if status != 200:
+            logger.error(f"Geocoding API error: {status}")
+            raise Exception(f"Geocoding failed with status {status}")
+        
+        if not data or len(data) == 0:
+            logger.error(f"No geocoding results for {location}")
+            raise Exception(f"No geocoding results found for {location}")
+        
+        # Get the first result
+        lat = float(data[0]["lat"])
+        lon = float(data[0]["lon"])
+        
+        # Cache the result
+        geocoding_cache[location] = (lat, lon)
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    logger.error(f"Geocoding API error: {response.status}")
-                    raise Exception(f"Geocoding failed with status {response.status}")
-                
-                data = await response.json()
-                
-                if not data or len(data) == 0:
-                    logger.error(f"No geocoding results for {location}")
-                    raise Exception(f"No geocoding results found for {location}")
-                
-                # Get the first result
-                lat = float(data[0]["lat"])
-                lon = float(data[0]["lon"])
-                
-                # Cache the result
-                geocoding_cache[location] = (lat, lon)
-                
-                return (lat, lon)
+        return (lat, lon)
     
     except Exception as e:
         logger.error(f"Geocoding error for {location}: {str(e)}")
@@ -90,44 +92,43 @@ async def reverse_geocode(lat: float, lon: float) -> Dict[str, Any]:
         A dictionary with location details
     """
     try:
-        url = f"https://us1.locationiq.com/v1/reverse.php?key={LOCATIONIQ_API_KEY}&lat={lat}&lon={lon}&format=json"
+        status, data = await http_client.get_json(
+            "https://us1.locationiq.com/v1/reverse.php",
+            params={"key": LOCATIONIQ_API_KEY, "lat": lat, "lon": lon, "format": "json"},
+            cache_ttl=REVERSE_GEOCODING_CACHE_TTL,
+        )
+        if status != 200:
+            logger.error(f"Reverse geocoding API error: {status}")
+            return {"name": "Unknown Location"}
+        
+        if not data or "address" not in data:
+            return {"name": "Unknown Location"}
+        
+        address = data["address"]
+        
+        # Extract relevant location information
+        city = address.get("city", "")
+        town = address.get("town", "")
+        village = address.get("village", "")
+        county = address.get("county", "")
+        state = address.get("state", "")
+        country = address.get("country", "")
+        
+        # Build location name
+        location_name = city or town or village or "Unknown Location"
+        location_region = county or state or country
+        
+        if location_region:
+            full_name = f"{location_name}, {location_region}"
+        else:
+            full_name = location_name
         
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    logger.error(f"Reverse geocoding API error: {response.status}")
-                    return {"name": "Unknown Location"}
-                
-                data = await response.json()
-                
-                if not data or "address" not in data:
-                    return {"name": "Unknown Location"}
-                
-                address = data["address"]
-                
-                # Extract relevant location information
-                city = address.get("city", "")
-                town = address.get("town", "")
-                village = address.get("village", "")
-                county = address.get("county", "")
-                state = address.get("state", "")
-                country = address.get("country", "")
-                
-                # Build location name
-                location_name = city or town or village or "Unknown Location"
-                location_region = county or state or country
-                
-                if location_region:
-                    full_name = f"{location_name}, {location_region}"
-                else:
-                    full_name = location_name
-                
-                return {
-                    "name": full_name,
-                    "city": city or town or village,
-                    "region": county or state,
-                    "country": country
-                }
+        return {
+            "name": full_name,
+            "city": city or town or village,
+            "region": county or state,
+            "country": country
+        }
     
     except Exception as e:
         logger.error(f"Reverse geocoding error: {str(e)}")
@@ -0,0 +1,192 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.forecast_store import hour_matrices
+from services.kitewindow import KMH_PER_KNOT, best_windows, window_message
+from services.scoring_rules import scoring_evaluator
+from services.solar import DaylightTable, is_day, load_daylight
+from services.wind_sectors import wind_sector_mask
+
+logger = logging.getLogger("kitespot-weather-service.golden-windows")
+
+UPSERT_GOLDEN_WINDOWS_SQL = """
+    INSERT INTO kitespot_golden_windows (
+        kitespot_id, forecast_start, hour_scores, wind_knots,
+        window_start, window_hours, window_score, window_peak, computed_at
+    )
+    VALUES (
+        :kitespot_id, :forecast_start, :hour_scores, :wind_knots,
+        :window_start, :window_hours, :window_score, :window_peak, :computed_at
+    )
+    ON CONFLICT (kitespot_id) DO UPDATE SET
+        forecast_start = EXCLUDED.forecast_start,
+        hour_scores = EXCLUDED.hour_scores,
+        wind_knots = EXCLUDED.wind_knots,
+        window_start = EXCLUDED.window_start,
+        window_hours = EXCLUDED.window_hours,
+        window_score = EXCLUDED.window_score,
+        window_peak = EXCLUDED.window_peak,
+        computed_at = EXCLUDED.computed_at
+"""
+
+SPOT_PROFILES_SQL = """
+    SELECT id, difficulty, water_type, best_wind_direction
+    FROM kitespots
+    WHERE id = ANY(CAST(:kitespot_ids AS integer[]))
+"""
+
+# Spot attributes selecting its scoring rules: (difficulty, water_type, best_wind_direction)
+SpotProfile = Tuple[Optional[str], Optional[str], Optional[str]]
+
+# Forecast columns the scoring reads
+SCORED_COLUMNS = ["wind_speed_10m", "wind_gusts_10m", "precipitation", "wind_direction_10m"]
+
+GOLDEN_WINDOW_SQL = """
+    SELECT kitespot_id, forecast_start, hour_scores, wind_knots
+    FROM kitespot_golden_windows
+    WHERE kitespot_id = :kitespot_id
+"""
+
+
+def compute_golden_windows(
+    rows: pd.DataFrame,
+    now: Optional[datetime] = None,
+    profiles: Optional[Dict[int, SpotProfile]] = None,
+    daylight: Optional[DaylightTable] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Scores every hour of a batch of forecasts and finds each spot's best upcoming window.
+
+    Args:
+        rows: Long-format forecast table (kitespot_id, timestamp, wind_speed_10m,
+            wind_gusts_10m, wind_direction_10m, precipitation; speeds in km/h)
+        now: Windows are searched from the start of this hour (default: now)
+        profiles: Scoring profile per kitespot id (default rules for spots left out)
+        daylight: Sunrise/sunset of the spots (hours without daylight data count as day)
+
+    Returns:
+        One kitespot_golden_windows record per spot
+    """
+    if rows.empty:
+        return []
+    now = now or datetime.now(timezone.utc)
+
+    seconds = rows["timestamp"].dt.tz_convert(None).to_numpy(dtype="datetime64[s]").astype(np.int64)
+    aligned = hour_matrices(rows["kitespot_id"], seconds, rows, SCORED_COLUMNS)
+    kitespot_ids = aligned.kitespot_ids
+    first = int(aligned.starts[0])
+    shape = aligned.matrices["wind_speed_10m"].shape
+
+    wind = aligned.matrices["wind_speed_10m"] / KMH_PER_KNOT
+    gust = aligned.matrices["wind_gusts_10m"] / KMH_PER_KNOT
+    precipitation = aligned.matrices["precipitation"]
+    direction = aligned.matrices["wind_direction_10m"]
+    daytime = None
+    if daylight is not None:
+        hour_seconds = np.broadcast_to(first + np.arange(shape[1], dtype=np.int64) * 3600, shape)
+        daytime = is_day(daylight, kitespot_ids, hour_seconds)
+
+    # One compiled evaluator call per distinct profile
+    groups: Dict[SpotProfile, List[int]] = {}
+    for index, kitespot_id in enumerate(kitespot_ids):
+        groups.setdefault((profiles or {}).get(int(kitespot_id), (None, None, None)), []).append(index)
+    scores = np.zeros(shape, dtype=np.float64)
+    for (difficulty, water_type, best_wind_direction), indexes in groups.items():
+        sector_mask = wind_sector_mask(best_wind_direction)
+        scores[indexes] = scoring_evaluator(difficulty, water_type, sector_mask)(
+            wind[indexes],
+            wind_gust=gust[indexes],
+            is_day=None if daytime is None else daytime[indexes],
+            precipitation=precipitation[indexes],
+            wind_direction=direction[indexes],
+            sector_mask=sector_mask,
+        )
+
+    forecast_start = datetime.fromtimestamp(first, tz=timezone.utc)
+    offset = min(max(0, int((now - forecast_start).total_seconds()) // 3600), shape[1])
+    windows = best_windows(scores[:, offset:])
+
+    records = []
+    for index, kitespot_id in enumerate(kitespot_ids):
+        has_window = windows.start[index] >= 0
+        records.append({
+            "kitespot_id": int(kitespot_id),
+            "forecast_start": forecast_start,
+            "hour_scores": np.round(scores[index], 1).tolist(),
+            "wind_knots": np.round(wind[index], 1).tolist(),
+            "window_start": forecast_start + timedelta(hours=offset + int(windows.start[index])) if has_window else None,
+            "window_hours": int(windows.duration[index]),
+            "window_score": round(float(windows.avg_score[index]), 1) if has_window else None,
+            "window_peak": round(float(windows.peak_score[index]), 1) if has_window else None,
+            "computed_at": now,
+        })
+    return records
+
+
+async def write_golden_windows(session: AsyncSession, rows: pd.DataFrame) -> int:
+    """
+    Materialize the golden windows of a batch of forecasts within the caller's transaction.
+
+    Every spot is scored with the rules of its difficulty, water type and best
+    wind direction, and night hours are weighted down using kitespot_daylight.
+
+    Returns:
+        Number of kitespots written
+    """
+    if rows.empty:
+        return 0
+    kitespot_ids = [int(kitespot_id) for kitespot_id in rows["kitespot_id"].unique()]
+    result = await session.execute(text(SPOT_PROFILES_SQL), {"kitespot_ids": kitespot_ids})
+    profiles = {row.id: (row.difficulty, row.water_type, row.best_wind_direction) for row in result.fetchall()}
+    daylight = await load_daylight(
+        session, kitespot_ids, rows["timestamp"].min().to_pydatetime(), rows["timestamp"].max().to_pydatetime()
+    )
+
+    records = compute_golden_windows(rows, profiles=profiles, daylight=daylight)
+    if records:
+        await session.execute(text(UPSERT_GOLDEN_WINDOWS_SQL), records)
+    return len(records)
+
+
+async def load_golden_window(session: AsyncSession, kitespot_id: int) -> Optional[Any]:
+    """Materialized hour scores of a kitespot (primary key lookup), or None."""
+    result = await session.execute(text(GOLDEN_WINDOW_SQL), {"kitespot_id": kitespot_id})
+    return result.first()
+
+
+def golden_window_summary(row: Any, start: datetime, hours: int) -> Dict[str, Any]:
+    """
+    Best golden window of a materialized row within hours from start.
+
+    Same shape as calculate_golden_kitewindow's result. Only the stored score
+    array is sliced and searched, so no forecast rows are read or re-scored.
+    """
+    offset = int((start - row.forecast_start).total_seconds()) // 3600
+    scores = np.asarray(row.hour_scores, dtype=np.float64)[max(offset, 0):max(offset + hours, 0)]
+    wind = np.asarray(row.wind_knots, dtype=np.float64)[max(offset, 0):max(offset + hours, 0)]
+    if len(scores) == 0:
+        return {"start_time": None, "end_time": None, "score": 0, "duration": 0, "message": "No forecast data available"}
+
+    windows = best_windows(scores)
+    if windows.start[0] < 0:
+        return {"start_time": None, "end_time": None, "score": 0, "duration": 0, "message": "No suitable conditions found"}
+
+    first = int(windows.start[0])
+    duration = int(windows.duration[0])
+    start_dt = row.forecast_start + timedelta(hours=max(offset, 0) + first)
+    end_dt = start_dt + timedelta(hours=duration - 1)
+    return {
+        "start_time": start_dt.isoformat(),
+        "end_time": end_dt.isoformat(),
+        "start_display": start_dt.strftime("%a %H:%M"),
+        "end_display": end_dt.strftime("%a %H:%M"),
+        "score": round(float(windows.avg_score[0]), 1),
+        "duration": duration,
+        "message": window_message(float(np.nanmean(wind[first:first + duration])), duration),
+    }
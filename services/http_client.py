@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger("kitespot-api.http")
+
+
+class HttpClient:
+    """
+    App-scoped HTTP client shared by all outbound calls.
+
+    Wraps one aiohttp.ClientSession so connections (TCP+TLS) and DNS lookups are
+    reused across calls. The API's session is owned by the FastAPI lifespan,
+    which opens it at startup and closes it at shutdown; standalone scripts
+    open and close it themselves as an async context manager. GET responses
+    can optionally be cached in a small in-process TTL cache.
+    """
+
+    def __init__(
+        self,
+        limit: int = 100,
+        limit_per_host: int = 10,
+        timeout: float = 15.0,
+        keepalive_timeout: float = 30.0,
+        dns_cache_ttl: int = 300,
+        cache_size: int = 1024,
+    ):
+        """
+        Initialize the client (the session itself is created by start()).
+
+        Args:
+            limit: Maximum number of open connections overall
+            limit_per_host: Maximum number of open connections per upstream host
+            timeout: Total timeout per request in seconds
+            keepalive_timeout: Seconds an idle connection is kept open for reuse
+            dns_cache_ttl: Seconds DNS lookups are cached
+            cache_size: Maximum number of cached responses
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.cache_size = cache_size
+
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._cache: "OrderedDict[Tuple, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Open the pooled session (idempotent)."""
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.limit,
+                    limit_per_host=self.limit_per_host,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=self.dns_cache_ttl,
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(total=self.timeout),
+                )
+                logger.info("HTTP client session opened")
+
+    async def close(self):
+        """Close the session and its pooled connections."""
+        async with self._lock:
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+                logger.info("HTTP client session closed")
+            self._session = None
+            self._cache.clear()
+
+    async def __aenter__(self) -> "HttpClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def session(self) -> aiohttp.ClientSession:
+        """The pooled session, opened on first use if the owner has not started it."""
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
+    def _cache_get(self, key: Tuple) -> Optional[Tuple[int, Any]]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        expires_at, status, data = entry
+        if expires_at < time.monotonic():
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return status, data
+
+    def _cache_put(self, key: Tuple, ttl: float, status: int, data: Any):
+        self._cache[key] = (time.monotonic() + ttl, status, data)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def _get(self, url: str, params: Optional[Dict[str, Any]], cache_ttl: float, as_json: bool) -> Tuple[int, Any]:
+        key = (url, tuple(sorted((name, str(value)) for name, value in (params or {}).items())), as_json)
+        if cache_ttl > 0:
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+
+        session = await self.session()
+        async with session.get(url, params=params) as response:
+            if response.status == 200 and as_json:
+                data = await response.json(content_type=None)
+            else:
+                data = await response.text()
+            status = response.status
+
+        # Only successful responses are cached
+        if cache_ttl > 0 and status == 200:
+            self._cache_put(key, cache_ttl, status, data)
+        return status, data
+
+    async def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, cache_ttl: float = 0) -> Tuple[int, Any]:
+        """
+        GET a URL and decode the JSON body.
+
+        Args:
+            url: URL to fetch
+            params: Query parameters
+            cache_ttl: Seconds a successful response may be served from cache (0 disables)
+
+        Returns:
+            Tuple of (status code, decoded JSON on 200, response text otherwise)
+        """
+        return await self._get(url, params, cache_ttl, as_json=True)
+
+    async def get_text(self, url: str, params: Optional[Dict[str, Any]] = None, cache_ttl: float = 0) -> Tuple[int, str]:
+        """
+        GET a URL and return the body as text.
+
+        Returns:
+            Tuple of (status code, response text)
+        """
+        return await self._get(url, params, cache_ttl, as_json=False)
+
+
+# Client for geocoding and imports; the FastAPI lifespan in main.py owns it in the API
+http_client = HttpClient()
@@ -1,9 +1,134 @@
-from typing import Dict, Any, List, Optional, Tuple
-from datetime import datetime, timedelta
+from typing import Dict, Any, List, NamedTuple, Optional
+from datetime import datetime
 import logging
 
+import numpy as np
+
+from services.scoring_rules import scoring_evaluator
+
 logger = logging.getLogger("kitespot-api.kitewindow")
 
+# Stored forecasts are in km/h, the scoring below works in knots
+KMH_PER_KNOT = 1.852
+
+# Hours scoring at least this count as golden. With unknown gusts the assumed
+# 5 knot spread halves every band score, and the light-but-workable 12-15 knot
+# band (60) must still qualify at 30
+GOLDEN_SCORE_THRESHOLD = 30.0
+
+class GoldenWindows(NamedTuple):
+    """Best golden window per spot; arrays of shape (spots,), start -1 when a spot has none."""
+    start: np.ndarray
+    duration: np.ndarray
+    avg_score: np.ndarray
+    peak_score: np.ndarray
+
+
+def score_hours(
+    wind_speed: np.ndarray,
+    wind_gust: Optional[np.ndarray] = None,
+    is_day: Optional[np.ndarray] = None,
+    precipitation: Optional[np.ndarray] = None,
+    wind_direction: Optional[np.ndarray] = None,
+    sector_mask: int = 0,
+) -> np.ndarray:
+    """
+    Scores forecast hours for kitesurfing (0-100) with the default scoring
+    rules; see services.scoring_rules for per-spot rules.
+
+    All arrays share one shape, e.g. (hours,) or (spots, hours). Missing
+    values count as no wind, no precipitation and daytime.
+
+    Args:
+        wind_speed: Wind speed in knots
+        wind_gust: Gust speed in knots (default: wind speed + 5)
+        is_day: 1 for daylight hours, 0 at night (default: all day)
+        precipitation: Precipitation in mm
+        wind_direction: Wind direction in degrees
+        sector_mask: Good wind sectors of the spot (see services.wind_sectors); 0 ignores direction
+
+    Returns:
+        Float array of hour scores with the shape of wind_speed
+    """
+    return scoring_evaluator()(
+        wind_speed,
+        wind_gust=wind_gust,
+        is_day=is_day,
+        precipitation=precipitation,
+        wind_direction=wind_direction,
+        sector_mask=sector_mask,
+    )
+
+
+def best_windows(scores: np.ndarray, threshold: float = GOLDEN_SCORE_THRESHOLD) -> GoldenWindows:
+    """
+    Finds each spot's best golden window: the contiguous run of hours scoring at
+    least threshold with the highest total score (earliest wins ties).
+
+    Runs are labelled over the flattened matrix and aggregated with bincount,
+    so the cost is O(spots x hours) without a Python loop per spot or hour.
+
+    Args:
+        scores: Hour scores of shape (hours,) or (spots, hours)
+
+    Returns:
+        GoldenWindows with one entry per spot (a single entry for 1-D input)
+    """
+    scores = np.atleast_2d(np.asarray(scores, dtype=np.float64))
+    spots, hours = scores.shape
+
+    # A trailing non-golden column keeps runs from continuing into the next spot
+    padded = np.zeros((spots, hours + 1), dtype=np.float64)
+    padded[:, :hours] = scores
+    flat = padded.ravel()
+    golden = flat >= threshold
+    golden[hours::hours + 1] = False
+
+    run_starts = golden & ~np.r_[False, golden[:-1]]
+    run_ids = np.cumsum(run_starts) * golden  # 0 for hours outside any run
+    runs = int(run_ids.max()) if len(run_ids) else 0
+
+    start = np.full(spots, -1, dtype=np.int64)
+    duration = np.zeros(spots, dtype=np.int64)
+    avg_score = np.zeros(spots, dtype=np.float64)
+    peak_score = np.zeros(spots, dtype=np.float64)
+    if runs == 0:
+        return GoldenWindows(start, duration, avg_score, peak_score)
+
+    run_sums = np.bincount(run_ids, weights=flat, minlength=runs + 1)[1:]
+    run_lengths = np.bincount(run_ids, minlength=runs + 1)[1:]
+    run_peaks = np.zeros(runs, dtype=np.float64)
+    np.maximum.at(run_peaks, run_ids[golden] - 1, flat[golden])
+    run_first = np.flatnonzero(run_starts)
+    run_spot = run_first // (hours + 1)
+
+    # Best total per spot, then the earliest run reaching it
+    best_sum = np.full(spots, -np.inf)
+    np.maximum.at(best_sum, run_spot, run_sums)
+    is_best = run_sums == best_sum[run_spot]
+    best_run = np.full(spots, runs, dtype=np.int64)
+    np.minimum.at(best_run, run_spot[is_best], np.flatnonzero(is_best))
+
+    has_window = best_run < runs
+    chosen = best_run[has_window]
+    start[has_window] = run_first[chosen] % (hours + 1)
+    duration[has_window] = run_lengths[chosen]
+    avg_score[has_window] = run_sums[chosen] / run_lengths[chosen]
+    peak_score[has_window] = run_peaks[chosen]
+    return GoldenWindows(start, duration, avg_score, peak_score)
+
+
+def window_message(avg_wind: float, duration_hours: int) -> str:
+    """Describes a golden window from its average wind speed in knots."""
+    if 15 <= avg_wind <= 20:
+        return f"Perfect conditions for {duration_hours} hours!"
+    if 20 < avg_wind <= 25:
+        return f"Strong winds for {duration_hours} hours - good for experienced riders"
+    if 12 <= avg_wind < 15:
+        return f"Light but workable winds for {duration_hours} hours"
+    return f"Marginal conditions for {duration_hours} hours"
+
+
 def calculate_golden_kitewindow(forecast: List[Dict[str, Any]]) -> Dict[str, Any]:
     """
     Calculates the golden kite window based on forecast data.
@@ -25,52 +150,18 @@ def calculate_golden_kitewindow(forecast: List[Dict[str, Any]]) -> Dict[str, Any
         }
     
     try:
-        # Find all hours with good wind conditions
-        scored_hours = []
-        for i, hour in enumerate(forecast):
-            # Base score on wind speed (15-20 knots is ideal)
-            wind_score = 0
-            wind_speed = hour.get("wind_speed", 0)
-            
-            if 15 <= wind_speed <= 20:
-                wind_score = 100  # Perfect wind
-            elif 20 < wind_speed <= 25:
-                wind_score = 80   # Strong but good
-            elif 12 <= wind_speed < 15:
-                wind_score = 60   # A bit light but workable
-            elif 25 < wind_speed <= 30:
-                wind_score = 40   # Very strong, for experienced only
-            elif wind_speed < 12 or wind_speed > 30:
-                wind_score = 0    # Too light or too strong
-            
-            # Adjust score based on other factors
-            # Prefer consistent wind (smaller difference between speed and gust)
-            gust_diff = hour.get("wind_gust", wind_speed + 5) - wind_speed
-            consistency_factor = max(0, 1 - (gust_diff / 10))  # Lower difference is better
-            
-            # Prefer daytime
-            is_day = hour.get("is_day", 1)
-            time_factor = 1.0 if is_day == 1 else 0.7
-            
-            # Prefer no precipitation
-            precip = hour.get("precipitation", 0)
-            precip_factor = max(0, 1 - (precip / 100))
-            
-            # Calculate final score
-            final_score = wind_score * consistency_factor * time_factor * precip_factor
-            
-            scored_hours.append({
-                "index": i,
-                "timestamp": hour.get("timestamp", ""),
-                "score": final_score,
-                "wind_speed": wind_speed,
-                "is_golden": hour.get("is_golden_window", False)
-            })
-        
-        # Sort by score
-        scored_hours.sort(key=lambda x: x["score"], reverse=True)
-        
-        # Find the best consecutive window (at least 2 hours)
+        def column(name: str, default: float) -> np.ndarray:
+            return np.array([hour.get(name, default) for hour in forecast], dtype=np.float64)
+
+        wind_speed = column("wind_speed", 0)
+        scores = score_hours(
+            wind_speed,
+            wind_gust=column("wind_gust", np.nan),
+            is_day=column("is_day", 1),
+            precipitation=column("precipitation", 0),
+        )
+        windows = best_windows(scores)
+
         best_window = {
             "start_time": None,
             "end_time": None,
@@ -78,71 +169,36 @@ def calculate_golden_kitewindow(forecast: List[Dict[str, Any]]) -> Dict[str, Any
             "duration": 0,
             "message": "No suitable conditions found"
         }
-        
-        if scored_hours and scored_hours[0]["score"] > 0:
-            best_hour = scored_hours[0]
-            best_index = best_hour["index"]
-            
-            # Look for consecutive hours with good scores
-            start_index = best_index
-            end_index = best_index
-            
-            # Check backward
-            i = best_index - 1
-            while i >= 0 and forecast[i].get("is_golden_window", False):
-                start_index = i
-                i -= 1
-            
-            # Check forward
-            i = best_index + 1
-            while i < len(forecast) and forecast[i].get("is_golden_window", False):
-                end_index = i
-                i += 1
-            
-            # Calculate average score for the window
-            window_hours = forecast[start_index:end_index+1]
-            if window_hours:
-                avg_wind = sum(h.get("wind_speed", 0) for h in window_hours) / len(window_hours)
-                avg_score = sum(h.get("wind_speed", 0) for h in window_hours) / len(window_hours)
-                
-                # Format times for display
-                try:
-                    start_time = window_hours[0].get("timestamp", "")
-                    end_time = window_hours[-1].get("timestamp", "")
-                    
-                    # Parse timestamps
-                    start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
-                    end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-                    
-                    # Format for display
-                    start_display = start_dt.strftime("%a %H:%M")
-                    end_display = end_dt.strftime("%a %H:%M")
-                    
-                    duration_hours = end_index - start_index + 1
-                    
-                    # Create message based on conditions
-                    if avg_wind >= 15 and avg_wind <= 20:
-                        message = f"Perfect conditions for {duration_hours} hours!"
-                    elif avg_wind > 20 and avg_wind <= 25:
-                        message = f"Strong winds for {duration_hours} hours - good for experienced riders"
-                    elif avg_wind >= 12 and avg_wind < 15:
-                        message = f"Light but workable winds for {duration_hours} hours"
-                    else:
-                        message = f"Marginal conditions for {duration_hours} hours"
-                    
-                    best_window = {
-                        "start_time": start_time,
-                        "end_time": end_time,
-                        "start_display": start_display,
-                        "end_display": end_display,
-                        "score": round(avg_score, 1),
-                        "duration": duration_hours,
-                        "message": message
-                    }
-                except Exception as e:
-                    logger.error(f"Error formatting golden window times: {str(e)}")
-                    best_window["message"] = "Error calculating window times"
-        
+        if windows.start[0] < 0:
+            return best_window
+
+        start_index = int(windows.start[0])
+        duration_hours = int(windows.duration[0])
+        window_hours = forecast[start_index:start_index + duration_hours]
+        avg_wind = float(np.nanmean(wind_speed[start_index:start_index + duration_hours]))
+
+        # Format times for display
+        try:
+            start_time = window_hours[0].get("timestamp", "")
+            end_time = window_hours[-1].get("timestamp", "")
+
+            # Parse timestamps
+            start_dt = datetime.fromisoformat(start_time.replace('Z', '+00:00'))
+            end_dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
+
+            best_window = {
+                "start_time": start_time,
+                "end_time": end_time,
+                "start_display": start_dt.strftime("%a %H:%M"),
+                "end_display": end_dt.strftime("%a %H:%M"),
+                "score": round(float(windows.avg_score[0]), 1),
+                "duration": duration_hours,
+                "message": window_message(avg_wind, duration_hours)
+            }
+        except Exception as e:
+            logger.error(f"Error formatting golden window times: {str(e)}")
+            best_window["message"] = "Error calculating window times"
+
         return best_window
     
     except Exception as e:
@@ -155,6 +211,76 @@ def calculate_golden_kitewindow(forecast: List[Dict[str, Any]]) -> Dict[str, Any
             "message": f"Error: {str(e)}"
         }
 
+# Kite size bands for a 75kg rider: wind speed (knots) below each upper bound
+KITE_BAND_UPPER_KNOTS = np.array([8, 12, 16, 20, 25, 30], dtype=np.float64)
+KITE_BAND_SIZE = np.array([14, 12, 10, 9, 7, 5, 4], dtype=np.float64)
+KITE_BAND_RANGE_LOW = np.array([12, 10, 9, 7, 5, 4, 3], dtype=np.float64)
+KITE_BAND_RANGE_HIGH = np.array([17, 14, 12, 10, 9, 7, 5], dtype=np.float64)
+KITE_BAND_CONFIDENCE = ["low", "medium", "high", "high", "medium", "medium", "low"]
+KITE_BAND_MESSAGE = [
+    "Very light wind - largest kite recommended",
+    "Light wind - larger kite recommended",
+    "Medium wind - ideal conditions",
+    "Medium-strong wind - good conditions",
+    "Strong wind - smaller kite recommended",
+    "Very strong wind - small kite required",
+    "Extreme wind - for experts only",
+]
+REFERENCE_RIDER_WEIGHT = 75.0
+# Share of the gust spread added to the mean wind when sizing: gusty hours call for a smaller kite
+GUST_SIZING_FACTOR = 0.3
+
+
+def kite_size_band(wind_speed: np.ndarray) -> np.ndarray:
+    """Index into the KITE_BAND_* tables for wind speeds in knots (any shape)."""
+    return np.searchsorted(KITE_BAND_UPPER_KNOTS, np.asarray(wind_speed, dtype=np.float64), side="right")
+
+
+def kite_size_matrix(
+    wind_speed: np.ndarray,
+    rider_weights: np.ndarray,
+    wind_gust: Optional[np.ndarray] = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Kite sizes for every hour of a forecast and every rider weight at once.
+
+    Uses the same bands as get_kite_size_recommendation. Gusts shift the
+    sizing wind up by GUST_SIZING_FACTOR of the gust spread.
+
+    Args:
+        wind_speed: Wind speeds in knots, shape (hours,)
+        rider_weights: Rider weights in kg, shape (riders,)
+        wind_gust: Gust speeds in knots, shape (hours,); NaN means unknown
+
+    Returns:
+        Dictionary with "recommended", "range_low" and "range_high" matrices of
+        shape (riders, hours) in m², NaN where the wind speed is unknown, the
+        "band" index per hour and the "unknown" mask of hours without wind data
+    """
+    wind = np.asarray(wind_speed, dtype=np.float64)
+    sizing_wind = wind
+    if wind_gust is not None:
+        spread = np.nan_to_num(np.asarray(wind_gust, dtype=np.float64) - wind, nan=0.0)
+        sizing_wind = wind + GUST_SIZING_FACTOR * np.maximum(spread, 0.0)
+
+    band = kite_size_band(np.nan_to_num(sizing_wind, nan=0.0))
+    unknown = np.isnan(wind)
+    weight_factor = (np.asarray(rider_weights, dtype=np.float64) / REFERENCE_RIDER_WEIGHT)[:, None]
+
+    def sized(table: np.ndarray) -> np.ndarray:
+        matrix = weight_factor * table[band][None, :]
+        matrix[:, unknown] = np.nan
+        return np.round(matrix, 1)
+
+    return {
+        "recommended": sized(KITE_BAND_SIZE),
+        "range_low": sized(KITE_BAND_RANGE_LOW),
+        "range_high": sized(KITE_BAND_RANGE_HIGH),
+        "band": band,
+        "unknown": unknown,
+    }
+
+
 def get_kite_size_recommendation(wind_speed: float, rider_weight: float = 75.0) -> Dict[str, Any]:
     """
     Recommends kite sizes based on wind speed and rider weight.
@@ -166,60 +292,17 @@ def get_kite_size_recommendation(wind_speed: float, rider_weight: float = 75.0)
     Returns:
         Dictionary with kite size recommendations
     """
-    # Base calculation for a 75kg rider
-    if wind_speed < 8:
-        base_size = 14
-        range_low = 12
-        range_high = 17
-        confidence = "low"
-        message = "Very light wind - largest kite recommended"
-    elif wind_speed < 12:
-        base_size = 12
-        range_low = 10
-        range_high = 14
-        confidence = "medium"
-        message = "Light wind - larger kite recommended"
-    elif wind_speed < 16:
-        base_size = 10
-        range_low = 9
-        range_high = 12
-        confidence = "high"
-        message = "Medium wind - ideal conditions"
-    elif wind_speed < 20:
-        base_size = 9
-        range_low = 7
-        range_high = 10
-        confidence = "high"
-        message = "Medium-strong wind - good conditions"
-    elif wind_speed < 25:
-        base_size = 7
-        range_low = 5
-        range_high = 9
-        confidence = "medium"
-        message = "Strong wind - smaller kite recommended"
-    elif wind_speed < 30:
-        base_size = 5
-        range_low = 4
-        range_high = 7
-        confidence = "medium"
-        message = "Very strong wind - small kite required"
-    else:
-        base_size = 4
-        range_low = 3
-        range_high = 5
-        confidence = "low"
-        message = "Extreme wind - for experts only"
-    
+    band = int(kite_size_band(wind_speed))
+
     # Adjust for rider weight
-    weight_factor = rider_weight / 75.0
-    adjusted_size = base_size * weight_factor
-    adjusted_range_low = range_low * weight_factor
-    adjusted_range_high = range_high * weight_factor
+    weight_factor = rider_weight / REFERENCE_RIDER_WEIGHT
+    adjusted_size = KITE_BAND_SIZE[band] * weight_factor
+    adjusted_range_low = KITE_BAND_RANGE_LOW[band] * weight_factor
+    adjusted_range_high = KITE_BAND_RANGE_HIGH[band] * weight_factor
     
     return {
-        "recommended_size": round(adjusted_size, 1),
-        "size_range": f"{round(adjusted_range_low, 1)}-{round(adjusted_range_high, 1)}m",
-        "confidence": confidence,
-        "message": message
+        "recommended_size": round(float(adjusted_size), 1),
+        "size_range": f"{round(float(adjusted_range_low), 1)}-{round(float(adjusted_range_high), 1)}m",
+        "confidence": KITE_BAND_CONFIDENCE[band],
+        "message": KITE_BAND_MESSAGE[band]
     }
-
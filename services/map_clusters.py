@@ -0,0 +1,192 @@
+import heapq
+import logging
+import math
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger("kitespot-api.map-clusters")
+
+# Clusters are kept for zoom levels 0..MAX_CLUSTER_ZOOM; deeper zooms use the last level
+MAX_CLUSTER_ZOOM = 16
+# Cluster cells per map tile along each axis (a 256px tile gives 64px cells)
+CELLS_PER_TILE = 4
+# Spot ids returned with every cluster: the members closest to its centroid
+REPRESENTATIVE_SPOTS = 3
+# Web Mercator cannot show the poles
+MAX_LATITUDE = 85.05112878
+
+Cell = Tuple[int, int]
+
+
+def mercator(latitude: float, longitude: float) -> Tuple[float, float]:
+    """Normalized Web Mercator coordinates (0..1 from the antimeridian / north edge)."""
+    latitude = max(-MAX_LATITUDE, min(MAX_LATITUDE, latitude))
+    x = ((longitude + 180.0) % 360.0) / 360.0
+    sin_lat = math.sin(math.radians(latitude))
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return x, min(max(y, 0.0), 1.0 - 1e-12)
+
+
+class Cluster:
+    """Spots of one cluster cell at one zoom level."""
+
+    __slots__ = ("members", "latitude_sum", "x_sum", "y_sum")
+
+    def __init__(self):
+        self.members: Set[int] = set()
+        self.latitude_sum = 0.0
+        self.x_sum = 0.0
+        self.y_sum = 0.0
+
+
+class MapClusters:
+    """
+    Grid clusters of kitespots for every zoom level, kept up to date incrementally.
+
+    At zoom z the world is 2^z tiles wide; each tile is split into
+    CELLS_PER_TILE x CELLS_PER_TILE cells and the spots of a cell form one
+    cluster. Adding, moving or removing a spot touches one cluster per zoom
+    level, so nothing is recomputed from scratch when spots change.
+    """
+
+    def __init__(self, max_zoom: int = MAX_CLUSTER_ZOOM, cells_per_tile: int = CELLS_PER_TILE):
+        self.max_zoom = max_zoom
+        self.cells_per_tile = cells_per_tile
+        self._levels: List[Dict[Cell, Cluster]] = [{} for _ in range(max_zoom + 1)]
+        self._positions: Dict[int, Tuple[float, float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _grid_size(self, zoom: int) -> int:
+        return (1 << zoom) * self.cells_per_tile
+
+    def _cell(self, zoom: int, x: float, y: float) -> Cell:
+        size = self._grid_size(zoom)
+        return min(int(x * size), size - 1), min(int(y * size), size - 1)
+
+    def upsert(self, kitespot_id: int, latitude: float, longitude: float):
+        """Add a spot or move it to its new coordinates."""
+        self.remove(kitespot_id)
+        x, y = mercator(latitude, longitude)
+        self._positions[kitespot_id] = (latitude, x, y)
+        for zoom, clusters in enumerate(self._levels):
+            cell = self._cell(zoom, x, y)
+            cluster = clusters.get(cell)
+            if cluster is None:
+                cluster = clusters[cell] = Cluster()
+            cluster.members.add(kitespot_id)
+            cluster.latitude_sum += latitude
+            cluster.x_sum += x
+            cluster.y_sum += y
+
+    def remove(self, kitespot_id: int):
+        """Remove a spot from every zoom level (no-op if it is not clustered)."""
+        position = self._positions.pop(kitespot_id, None)
+        if position is None:
+            return
+        latitude, x, y = position
+        for zoom, clusters in enumerate(self._levels):
+            cell = self._cell(zoom, x, y)
+            cluster = clusters[cell]
+            cluster.members.discard(kitespot_id)
+            cluster.latitude_sum -= latitude
+            cluster.x_sum -= x
+            cluster.y_sum -= y
+            if not cluster.members:
+                del clusters[cell]
+
+    def apply(self, spots: Dict[int, Optional[Tuple[float, float]]]):
+        """Apply changed spots: id -> (latitude, longitude), or None for a removed spot."""
+        for kitespot_id, coordinates in spots.items():
+            if coordinates is None:
+                self.remove(kitespot_id)
+            else:
+                self.upsert(kitespot_id, *coordinates)
+        if spots:
+            logger.info(f"Map clusters updated for {len(spots)} kitespots ({len(self)} total)")
+
+    def build(self, spots: Iterable[Dict[str, Any]]):
+        """Rebuild all levels from spot dictionaries with id, latitude and longitude."""
+        self._levels = [{} for _ in range(self.max_zoom + 1)]
+        self._positions = {}
+        for spot in spots:
+            self.upsert(spot["id"], spot["latitude"], spot["longitude"])
+        logger.info(f"Map clusters built for {len(self)} kitespots")
+
+    def _representatives(self, cluster: Cluster) -> List[int]:
+        """Ids of the REPRESENTATIVE_SPOTS members closest to the cluster centroid (on the map plane)."""
+        count = len(cluster.members)
+        x, y = cluster.x_sum / count, cluster.y_sum / count
+
+        def centroid_distance(kitespot_id: int) -> Tuple[float, int]:
+            _, spot_x, spot_y = self._positions[kitespot_id]
+            return (spot_x - x) ** 2 + (spot_y - y) ** 2, kitespot_id
+
+        return heapq.nsmallest(REPRESENTATIVE_SPOTS, cluster.members, key=centroid_distance)
+
+    def _column_ranges(self, zoom: int, min_lon: float, max_lon: float) -> List[Tuple[int, int]]:
+        size = self._grid_size(zoom)
+        if max_lon - min_lon >= 360.0:
+            return [(0, size - 1)]
+        first = min(int((min_lon + 180.0) / 360.0 * size), size - 1)
+        last = int((max_lon + 180.0) / 360.0 * size)
+        if last < size:
+            return [(first, last)]
+        # A box crossing the antimeridian wraps around to the first columns
+        return [(first, size - 1), (0, min(last - size, first - 1))]
+
+    def query(
+        self,
+        min_lon: float,
+        min_lat: float,
+        max_lon: float,
+        max_lat: float,
+        zoom: int,
+    ) -> List[Dict[str, Any]]:
+        """
+        Clusters whose cell overlaps a bounding box at a zoom level.
+
+        min_lon > max_lon means the box crosses the antimeridian.
+
+        Returns:
+            One dictionary per cluster with its centroid, spot count and the
+            ids of the up to REPRESENTATIVE_SPOTS spots closest to the centroid
+        """
+        zoom = max(0, min(int(zoom), self.max_zoom))
+        clusters = self._levels[zoom]
+        if min_lon > max_lon:
+            max_lon += 360.0
+        columns = self._column_ranges(zoom, min_lon, max_lon)
+        first_row = self._cell(zoom, 0.0, mercator(max_lat, 0.0)[1])[1]
+        last_row = self._cell(zoom, 0.0, mercator(min_lat, 0.0)[1])[1]
+
+        cells_in_box = sum(last - first + 1 for first, last in columns) * (last_row - first_row + 1)
+        if cells_in_box <= len(clusters):
+            cells = [
+                (column, row)
+                for first, last in columns
+                for column in range(first, last + 1)
+                for row in range(first_row, last_row + 1)
+                if (column, row) in clusters
+            ]
+        else:
+            cells = [
+                cell for cell in clusters
+                if first_row <= cell[1] <= last_row and any(first <= cell[0] <= last for first, last in columns)
+            ]
+
+        results = []
+        for cell in cells:
+            cluster = clusters[cell]
+            count = len(cluster.members)
+            results.append({
+                "latitude": round(cluster.latitude_sum / count, 5),
+                "longitude": round(cluster.x_sum / count * 360.0 - 180.0, 5),
+                "count": count,
+                "kitespot_ids": self._representatives(cluster),
+            })
+        return results
+
+
+# Built from spatial_index at startup and patched with its refresh diffs
+map_clusters = MapClusters()
@@ -0,0 +1,139 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from sqlalchemy import text
+
+from database import async_session
+from services.forecast_cache import current_hour
+from services.kitewindow import best_windows
+
+logger = logging.getLogger("kitespot-api.rankings")
+
+# Forecast hours scored per rebuild; rankings can look at most this far ahead
+RANKING_HORIZON_HOURS = 48
+
+RANKING_SPOTS_SQL = """
+    SELECT k.id, k.name, k.country, k.region, k.difficulty, g.forecast_start, g.hour_scores
+    FROM kitespot_golden_windows g
+    JOIN kitespots k ON k.id = g.kitespot_id
+    ORDER BY k.id
+"""
+
+
+class GoldenWindowRanking:
+    """
+    In-memory ranking of kitespots by their best upcoming golden window.
+
+    rebuild() loads the hour scores materialized at ingest time for all spots
+    with one query and aligns them into one (spots x hours) matrix. Rankings
+    for a forecast horizon are derived from that matrix in one vectorized pass
+    on first use and kept until the next rebuild, so requests never score
+    forecasts themselves.
+    """
+
+    def __init__(self, horizon_hours: int = RANKING_HORIZON_HOURS):
+        self.horizon_hours = horizon_hours
+        self.built_for: Optional[datetime] = None
+        self._spots: List[Dict[str, Any]] = []
+        self._scores = np.zeros((0, horizon_hours))
+        self._rankings: Dict[int, List[Dict[str, Any]]] = {}
+
+    async def rebuild(self, start: Optional[datetime] = None):
+        """Align the materialized hour scores of every kitespot on the hours from start (default: the current hour)."""
+        start = start or current_hour()
+        async with async_session() as session:
+            rows = (await session.execute(text(RANKING_SPOTS_SQL))).fetchall()
+
+        # Hours before start or past the stored forecast score 0
+        scores = np.zeros((len(rows), self.horizon_hours), dtype=np.float64)
+        for index, row in enumerate(rows):
+            offset = int((start - row.forecast_start).total_seconds()) // 3600
+            hour_scores = np.asarray(row.hour_scores, dtype=np.float64)
+            first = max(offset, 0)
+            available = hour_scores[first:first + self.horizon_hours - max(-offset, 0)]
+            scores[index, max(-offset, 0):max(-offset, 0) + len(available)] = available
+
+        self._scores = scores
+        self._spots = [
+            {
+                "kitespot_id": row.id,
+                "name": row.name,
+                "country": row.country,
+                "region": row.region,
+                "difficulty": row.difficulty,
+            }
+            for row in rows
+        ]
+        self._rankings = {}
+        self.built_for = start
+        logger.info(f"Golden window ranking rebuilt for {len(rows)} kitespots from {start:%Y-%m-%d %H:00}")
+
+    async def refresh_if_stale(self):
+        """Rebuild when the current hour moved past the one the ranking was built for."""
+        if self.built_for != current_hour():
+            await self.rebuild()
+
+    def _ranking(self, hours: int) -> List[Dict[str, Any]]:
+        ranking = self._rankings.get(hours)
+        if ranking is not None:
+            return ranking
+
+        windows = best_windows(self._scores[:, :hours])
+        total = windows.avg_score * windows.duration
+        order = np.lexsort((windows.start, -total))
+        ranking = []
+        for index in order:
+            if windows.start[index] < 0:
+                break
+            start_time = self.built_for + timedelta(hours=int(windows.start[index]))
+            ranking.append({
+                **self._spots[index],
+                "start_time": start_time.isoformat(),
+                "end_time": (start_time + timedelta(hours=int(windows.duration[index]) - 1)).isoformat(),
+                "duration": int(windows.duration[index]),
+                "score": round(float(windows.avg_score[index]), 1),
+                "peak_score": round(float(windows.peak_score[index]), 1),
+            })
+        self._rankings[hours] = ranking
+        return ranking
+
+    def top(
+        self,
+        hours: int = 24,
+        region: Optional[str] = None,
+        difficulty: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """
+        Best spots by golden window within the next hours, best first.
+
+        Spots are ranked by the total score of their best window (longer good
+        windows beat short ones), earlier windows first on ties. Spots without
+        a golden window are left out.
+
+        Args:
+            hours: Forecast horizon (at most horizon_hours)
+            region: Only spots whose region or country matches (case-insensitive)
+            difficulty: Only spots with this difficulty (case-insensitive)
+            limit: Maximum number of spots returned
+        """
+        if self.built_for is None:
+            return []
+        ranking = self._ranking(max(1, min(hours, self.horizon_hours)))
+
+        results = []
+        for entry in ranking:
+            if region and region.lower() not in ((entry["region"] or "").lower(), (entry["country"] or "").lower()):
+                continue
+            if difficulty and difficulty.lower() != (entry["difficulty"] or "").lower():
+                continue
+            results.append(entry)
+            if len(results) == limit:
+                break
+        return results
+
+
+# Rebuilt by the lifespan task after each ingest; /golden-windows/ranking reads it
+golden_window_ranking = GoldenWindowRanking()
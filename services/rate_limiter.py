@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+logger = logging.getLogger("kitespot-weather-service.rate-limiter")
+
+
+class RateLimitExceeded(Exception):
+    """Raised when an upstream API answers with 429 Too Many Requests."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a Retry-After header value given in seconds.
+
+    Args:
+        value: Raw header value (may be None)
+
+    Returns:
+        Number of seconds to wait, or None if the header is missing or not numeric
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class AdaptiveTokenBucket:
+    """
+    Token bucket rate limiter that slows down when the upstream API pushes back.
+
+    Tokens refill continuously at the current rate up to ``capacity``. A 429
+    response halves the rate and pauses the bucket for the Retry-After period;
+    every successful call nudges the rate back up towards the configured maximum.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        capacity: Optional[float] = None,
+        min_rate_per_minute: Optional[float] = None,
+        default_backoff: float = 60.0,
+        recovery_factor: float = 1.05,
+    ):
+        """
+        Initialize the token bucket.
+
+        Args:
+            rate_per_minute: Maximum sustained number of tokens per minute
+            capacity: Burst size (default: 1/6 of the per-minute rate)
+            min_rate_per_minute: Floor for the rate after repeated 429s
+            default_backoff: Pause in seconds when a 429 carries no Retry-After
+            recovery_factor: Multiplier applied to the rate after each success
+        """
+        self.max_rate = rate_per_minute / 60.0
+        self.min_rate = (min_rate_per_minute or rate_per_minute / 20.0) / 60.0
+        self.rate = self.max_rate
+        self.capacity = float(capacity or max(1.0, rate_per_minute / 6.0))
+        self.default_backoff = default_backoff
+        self.recovery_factor = recovery_factor
+
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float):
+        elapsed = now - self._updated_at
+        self._updated_at = now
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+
+    async def acquire(self, cost: float = 1.0):
+        """
+        Waits until ``cost`` tokens are available and consumes them.
+
+        Waiters are served in FIFO order. Costs larger than the bucket capacity
+        are clamped so a single large request can never block forever.
+        """
+        cost = min(float(cost), self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= cost:
+                    self._tokens -= cost
+                    return
+                else:
+                    wait = (cost - self._tokens) / self.rate
+
+                await asyncio.sleep(wait)
+
+    def penalize(self, retry_after: Optional[float] = None):
+        """Halves the rate and pauses the bucket after a 429 response."""
+        now = time.monotonic()
+        pause = retry_after if retry_after is not None else self.default_backoff
+        self._refill(now)
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, now + pause)
+        self.rate = max(self.min_rate, self.rate / 2.0)
+        logger.warning(
+            f"Rate limited by upstream API, pausing {pause:.0f}s and lowering rate "
+            f"to {self.rate * 60:.0f} tokens/min"
+        )
+
+    def reward(self):
+        """Raises the rate back towards the maximum after a successful call."""
+        if self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate * self.recovery_factor)
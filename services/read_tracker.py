@@ -0,0 +1,78 @@
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict
+
+from sqlalchemy import text
+
+from database import async_session
+
+logger = logging.getLogger("kitespot-api.read-tracker")
+
+
+class ReadTracker:
+    """
+    Counts API reads per kitespot in memory and flushes them to kitespot_read_stats.
+
+    Recording a read is a dictionary update, so it can sit on hot read paths;
+    the database only sees one batched upsert per flush interval.
+    """
+
+    def __init__(self):
+        self._counts: Counter = Counter()
+        self._last_read: Dict[int, datetime] = {}
+
+    def record(self, kitespot_id: int):
+        """Record that a kitespot was served."""
+        self._counts[kitespot_id] += 1
+        self._last_read[kitespot_id] = datetime.now(timezone.utc)
+
+    async def flush(self) -> int:
+        """
+        Write the reads collected since the last flush.
+
+        Returns:
+            Number of kitespots written
+        """
+        if not self._counts:
+            return 0
+
+        counts, last_read = self._counts, self._last_read
+        self._counts, self._last_read = Counter(), {}
+        kitespot_ids = list(counts.keys())
+
+        try:
+            async with async_session() as session:
+                await session.execute(
+                    text("""
+                        INSERT INTO kitespot_read_stats (kitespot_id, read_count, last_read_at)
+                        SELECT * FROM unnest(
+                            CAST(:kitespot_ids AS integer[]),
+                            CAST(:read_counts AS integer[]),
+                            CAST(:last_read_at AS timestamptz[])
+                        )
+                        ON CONFLICT (kitespot_id) DO UPDATE SET
+                            read_count = kitespot_read_stats.read_count + EXCLUDED.read_count,
+                            last_read_at = GREATEST(kitespot_read_stats.last_read_at, EXCLUDED.last_read_at)
+                    """),
+                    {
+                        "kitespot_ids": kitespot_ids,
+                        "read_counts": [counts[kitespot_id] for kitespot_id in kitespot_ids],
+                        "last_read_at": [last_read[kitespot_id] for kitespot_id in kitespot_ids],
+                    }
+                )
+                await session.commit()
+        except Exception as e:
+            # Put the reads back so they are retried with the next flush
+            logger.error(f"Error flushing kitespot read stats: {str(e)}")
+            self._counts.update(counts)
+            for kitespot_id, read_at in last_read.items():
+                self._last_read[kitespot_id] = max(read_at, self._last_read.get(kitespot_id, read_at))
+            return 0
+
+        logger.debug(f"Flushed read stats for {len(kitespot_ids)} kitespots")
+        return len(kitespot_ids)
+
+
+# Forecast endpoints record reads here; the lifespan flushes it to kitespot_read_stats
+read_tracker = ReadTracker()
@@ -0,0 +1,186 @@
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.kitewindow import GOLDEN_SCORE_THRESHOLD
+
+logger = logging.getLogger("kitespot-weather-service.refresh-planner")
+
+# Refresh interval per tier
+REFRESH_TIERS = {
+    "hot": timedelta(minutes=15),
+    "warm": timedelta(hours=1),
+    "cold": timedelta(hours=4),
+}
+
+# Favorites needed to count as hot / warm
+HOT_FAVORITES = 5
+WARM_FAVORITES = 1
+
+# A read within this period makes a spot hot / warm
+HOT_READ_AGE = timedelta(hours=6)
+WARM_READ_AGE = timedelta(days=3)
+
+# A golden hour within this horizon makes a spot hot / warm
+HOT_WINDOW_HORIZON = timedelta(hours=6)
+WARM_WINDOW_HORIZON = timedelta(hours=24)
+
+# Materialized hour score needed within the hot / warm horizon (see services/golden_windows.py)
+HOT_WINDOW_SCORE = 60.0
+WARM_WINDOW_SCORE = GOLDEN_SCORE_THRESHOLD
+
+# Most hot spots refreshed per planner run; the stalest go first, the rest wait for the next run
+HOT_TIER_BUDGET = int(os.getenv("REFRESH_HOT_BUDGET", 200))
+
+SPOT_SIGNALS_SQL = """
+    SELECT
+        k.*,
+        COALESCE(f.favorites, 0) AS favorites,
+        r.last_read_at,
+        i.last_ingested_at,
+        w.hot_window_score,
+        w.warm_window_score
+    FROM kitespots k
+    LEFT JOIN (
+        SELECT kitespot_id, COUNT(*) AS favorites
+        FROM favorite_spots
+        GROUP BY kitespot_id
+    ) f ON f.kitespot_id = k.id
+    LEFT JOIN kitespot_read_stats r ON r.kitespot_id = k.id
+    LEFT JOIN kitespot_weather_ingest i ON i.kitespot_id = k.id
+    LEFT JOIN LATERAL (
+        SELECT
+            MAX(h.score) FILTER (WHERE h.hour_at < :hot_end) AS hot_window_score,
+            MAX(h.score) AS warm_window_score
+        FROM kitespot_golden_windows g
+        CROSS JOIN LATERAL (
+            SELECT u.score, g.forecast_start + (u.position - 1) * INTERVAL '1 hour' AS hour_at
+            FROM unnest(g.hour_scores) WITH ORDINALITY AS u(score, position)
+        ) h
+        WHERE g.kitespot_id = k.id
+        AND h.hour_at >= :hour_start
+        AND h.hour_at < :warm_end
+    ) w ON TRUE
+"""
+
+
+def assign_tier(
+    favorites: int,
+    last_read_at: Optional[datetime],
+    hot_window_score: Optional[float],
+    warm_window_score: Optional[float],
+    now: datetime,
+) -> str:
+    """
+    Places a spot in a refresh tier based on how much attention it gets.
+
+    Args:
+        favorites: Number of users who marked the spot as favorite
+        last_read_at: When the API last served the spot
+        hot_window_score: Best materialized hour score within HOT_WINDOW_HORIZON
+        warm_window_score: Best materialized hour score within WARM_WINDOW_HORIZON
+        now: Current time (timezone-aware)
+
+    Returns:
+        Tier name, one of REFRESH_TIERS
+    """
+    read_age = now - last_read_at if last_read_at else None
+
+    if (
+        favorites >= HOT_FAVORITES
+        or (read_age is not None and read_age <= HOT_READ_AGE)
+        or (hot_window_score is not None and hot_window_score >= HOT_WINDOW_SCORE)
+    ):
+        return "hot"
+    if (
+        favorites >= WARM_FAVORITES
+        or (read_age is not None and read_age <= WARM_READ_AGE)
+        or (warm_window_score is not None and warm_window_score >= WARM_WINDOW_SCORE)
+    ):
+        return "warm"
+    return "cold"
+
+
+class RefreshPlanner:
+    """
+    Decides which kitespots are due for a weather refresh.
+
+    Spots are placed in hot/warm/cold tiers from their favorites, recent API
+    reads and whether their materialized golden-window scores show a good
+    hour soon. A spot is due once its last ingest is older than its tier's
+    interval; at most hot_budget hot spots are refreshed per run.
+    """
+
+    def __init__(self, tiers: Optional[Dict[str, timedelta]] = None, hot_budget: int = HOT_TIER_BUDGET):
+        self.tiers = tiers or REFRESH_TIERS
+        self.hot_budget = hot_budget
+
+    @property
+    def tick_interval(self) -> timedelta:
+        """How often the planner should be consulted: the shortest tier interval."""
+        return min(self.tiers.values())
+
+    async def plan(self, session: AsyncSession, now: Optional[datetime] = None) -> Dict[str, List[Any]]:
+        """
+        Assign every kitespot to a tier.
+
+        Returns:
+            Mapping of tier name to kitespot rows (with last_ingested_at attached)
+        """
+        now = now or datetime.now(timezone.utc)
+        hour_start = now.replace(minute=0, second=0, microsecond=0)
+        result = await session.execute(
+            text(SPOT_SIGNALS_SQL),
+            {
+                "hour_start": hour_start,
+                "hot_end": now + HOT_WINDOW_HORIZON,
+                "warm_end": now + WARM_WINDOW_HORIZON,
+            }
+        )
+
+        plan: Dict[str, List[Any]] = {tier: [] for tier in self.tiers}
+        for spot in result.fetchall():
+            tier = assign_tier(
+                spot.favorites, spot.last_read_at, spot.hot_window_score, spot.warm_window_score, now
+            )
+            plan[tier].append(spot)
+        return plan
+
+    async def due_spots(self, session: AsyncSession, now: Optional[datetime] = None) -> List[Any]:
+        """
+        Kitespots whose last ingest is older than their tier's refresh interval.
+
+        Never-ingested spots are always due. Hot spots come first so they are
+        refreshed first when the API quota is tight.
+        """
+        now = now or datetime.now(timezone.utc)
+        plan = await self.plan(session, now)
+
+        due = []
+        for tier, spots in sorted(plan.items(), key=lambda item: self.tiers[item[0]]):
+            # Small tolerance so a spot refreshed at the previous tick is not skipped by seconds
+            interval = self.tiers[tier] - timedelta(minutes=1)
+            tier_due = [
+                spot for spot in spots
+                if spot.last_ingested_at is None or now - spot.last_ingested_at >= interval
+            ]
+            deferred = 0
+            if tier == "hot" and len(tier_due) > self.hot_budget:
+                deferred = len(tier_due) - self.hot_budget
+                tier_due = select_stalest(tier_due, self.hot_budget)
+            due.extend(tier_due)
+            logger.info(
+                f"Refresh tier {tier}: {len(tier_due)} of {len(spots)} spots due"
+                + (f", {deferred} deferred by the hot budget" if deferred else "")
+            )
+        return due
+
+
+def select_stalest(spots: List[Any], limit: int) -> List[Any]:
+    """The limit spots ingested longest ago, never-ingested spots first."""
+    oldest_first = datetime.min.replace(tzinfo=timezone.utc)
+    return sorted(spots, key=lambda spot: spot.last_ingested_at or oldest_first)[:limit]
@@ -0,0 +1,259 @@
+import json
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from services.wind_sectors import direction_sectors, sector_factors, wind_sector_mask
+
+logger = logging.getLogger("kitespot-api.scoring-rules")
+
+# Optional JSON file with rules overriding DEFAULT_SCORING_RULES (same layout)
+SCORING_RULES_FILE = os.getenv("SCORING_RULES_FILE")
+
+# Sections with rule overrides, applied in this order over "default"
+RULE_SECTIONS = ("difficulty", "water_type", "wind_direction")
+
+# Scoring rules; wind speeds in knots. "default" holds a complete rule set, the
+# sections hold partial rule sets keyed by lower-case spot attribute values.
+# "wind_direction" keys are directions like best_wind_direction ("SW", "W to N"),
+# matched by sector mask, so "SW", "south-west" and "225" name the same entry.
+DEFAULT_SCORING_RULES: Dict[str, Any] = {
+    "default": {
+        # Base score per wind band (bounds inclusive, the first matching band wins)
+        "wind_bands": [
+            {"min": 15, "max": 20, "score": 100},  # Perfect wind
+            {"min": 20, "max": 25, "score": 80},   # Strong but good
+            {"min": 12, "max": 15, "score": 60},   # A bit light but workable
+            {"min": 25, "max": 30, "score": 40},   # Very strong, for experienced only
+        ],
+        # Consistency factor: 1 - (gust - wind) / gust_spread_scale
+        "gust_spread_scale": 10.0,
+        # Gust spread assumed when gusts are unknown
+        "gust_spread_default": 5.0,
+        "night_factor": 0.7,
+        # Precipitation factor: 1 - precipitation (mm) / precipitation_scale
+        "precipitation_scale": 100.0,
+        # Wind from a sector next to the spot's best wind directions, and from any other sector
+        "direction_neighbour_factor": 0.8,
+        "direction_outside_factor": 0.5,
+    },
+    "difficulty": {
+        "beginner": {
+            "wind_bands": [
+                {"min": 12, "max": 18, "score": 100},
+                {"min": 18, "max": 22, "score": 70},
+                {"min": 10, "max": 12, "score": 60},
+                {"min": 22, "max": 25, "score": 30},
+            ],
+            "gust_spread_scale": 8.0,
+        },
+        "advanced": {
+            "wind_bands": [
+                {"min": 18, "max": 25, "score": 100},
+                {"min": 25, "max": 30, "score": 80},
+                {"min": 15, "max": 18, "score": 70},
+                {"min": 12, "max": 15, "score": 50},
+                {"min": 30, "max": 35, "score": 40},
+            ],
+        },
+    },
+    "water_type": {
+        # Riders in waves cope with gustier wind
+        "waves": {"gust_spread_scale": 12.0},
+    },
+    "wind_direction": {},
+}
+
+RULE_FIELDS = set(DEFAULT_SCORING_RULES["default"])
+
+Evaluator = Callable[..., np.ndarray]
+
+
+def _normalize(value: Optional[str]) -> Optional[str]:
+    return value.strip().lower() if value and value.strip() else None
+
+
+def load_scoring_rules(path: Optional[str] = SCORING_RULES_FILE) -> Dict[str, Any]:
+    """
+    DEFAULT_SCORING_RULES with the rules of a JSON file laid over them.
+
+    Fields of the file's "default" replace the default fields; entries of the
+    other sections replace the default entry with the same key.
+
+    The merged rules are validated as a whole, so a broken file fails here
+    (at startup) instead of in the middle of an ingest.
+
+    Raises:
+        ValueError: If a rule set has unknown, missing or invalid fields
+    """
+    rules = {"default": dict(DEFAULT_SCORING_RULES["default"])}
+    rules.update({section: dict(DEFAULT_SCORING_RULES[section]) for section in RULE_SECTIONS})
+    if path:
+        with open(path) as rules_file:
+            overrides = json.load(rules_file)
+        unknown_sections = set(overrides) - {"default", *RULE_SECTIONS}
+        if unknown_sections:
+            raise ValueError(f"Unknown scoring rule sections: {', '.join(sorted(unknown_sections))}")
+        rules["default"].update(overrides.get("default", {}))
+        for section in RULE_SECTIONS:
+            rules[section].update(overrides.get(section, {}))
+
+    for section in RULE_SECTIONS:
+        rules[section] = {_section_key(section, key): value for key, value in rules[section].items()}
+
+    _validate(rules["default"], "default", complete=True)
+    for section in RULE_SECTIONS:
+        for key, rule_set in rules[section].items():
+            _validate(rule_set, f"{section}.{key}")
+    if path:
+        logger.info(f"Scoring rules loaded from {path}")
+    return rules
+
+
+def _section_key(section: str, key: Any) -> Any:
+    """Lookup key of a section entry: the sector mask for wind_direction, else the lower-case value."""
+    if section != "wind_direction":
+        return _normalize(key)
+    mask = key if isinstance(key, int) else wind_sector_mask(key)
+    if not mask:
+        raise ValueError(f"Scoring rules wind_direction.{key} is not a wind direction")
+    return mask
+
+
+def _validate(rule_set: Dict[str, Any], name: str, complete: bool = False):
+    """Check one rule set; complete rule sets must define every field."""
+    if not isinstance(rule_set, dict):
+        raise ValueError(f"Scoring rules {name} must be an object")
+    unknown = set(rule_set) - RULE_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields in scoring rules {name}: {', '.join(sorted(unknown))}")
+    missing = RULE_FIELDS - set(rule_set) if complete else set()
+    if missing:
+        raise ValueError(f"Missing fields in scoring rules {name}: {', '.join(sorted(missing))}")
+
+    for field, value in rule_set.items():
+        if field == "wind_bands":
+            continue
+        if not _is_number(value):
+            raise ValueError(f"Scoring rule {name}.{field} must be a number")
+        if field.endswith("_scale") and value <= 0:
+            raise ValueError(f"Scoring rule {name}.{field} must be positive")
+        if field.endswith("_factor") and not 0 <= value <= 1:
+            raise ValueError(f"Scoring rule {name}.{field} must be between 0 and 1")
+        if field == "gust_spread_default" and value < 0:
+            raise ValueError(f"Scoring rule {name}.{field} must not be negative")
+
+    bands = rule_set.get("wind_bands", [])
+    if not isinstance(bands, list):
+        raise ValueError(f"Scoring rules {name}.wind_bands must be a list")
+    for band in bands:
+        if not isinstance(band, dict) or set(band) != {"min", "max", "score"}:
+            raise ValueError(f"Wind band {band} in scoring rules {name} needs exactly min, max and score")
+        if not all(_is_number(value) for value in band.values()):
+            raise ValueError(f"Wind band {band} in scoring rules {name} must have numeric min, max and score")
+        if band["min"] > band["max"]:
+            raise ValueError(f"Wind band {band} in scoring rules {name} has min above max")
+        if band["score"] < 0:
+            raise ValueError(f"Wind band {band} in scoring rules {name} has a negative score")
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+@lru_cache(maxsize=None)
+def compile_rules(canonical_rules: str) -> Evaluator:
+    """
+    Compiles a complete rule set (canonical JSON) into a NumPy evaluation function.
+
+    Rule sets that merge to the same rules share one compiled evaluator.
+    """
+    rules = json.loads(canonical_rules)
+    band_min = np.array([band["min"] for band in rules["wind_bands"]], dtype=np.float64)
+    band_max = np.array([band["max"] for band in rules["wind_bands"]], dtype=np.float64)
+    band_score = np.array([band["score"] for band in rules["wind_bands"]], dtype=np.float64)
+    gust_spread_scale = float(rules["gust_spread_scale"])
+    gust_spread_default = float(rules["gust_spread_default"])
+    night_factor = float(rules["night_factor"])
+    precipitation_scale = float(rules["precipitation_scale"])
+    direction_neighbour_factor = float(rules["direction_neighbour_factor"])
+    direction_outside_factor = float(rules["direction_outside_factor"])
+
+    def evaluate(
+        wind_speed: np.ndarray,
+        wind_gust: Optional[np.ndarray] = None,
+        is_day: Optional[np.ndarray] = None,
+        precipitation: Optional[np.ndarray] = None,
+        wind_direction: Optional[np.ndarray] = None,
+        sector_mask: int = 0,
+    ) -> np.ndarray:
+        wind = np.nan_to_num(np.asarray(wind_speed, dtype=np.float64), nan=0.0)
+
+        # Base score from the first band containing the wind speed, 0 outside all bands
+        wind_score = np.zeros_like(wind)
+        if len(band_score):
+            in_band = (wind[..., None] >= band_min) & (wind[..., None] <= band_max)
+            wind_score = np.where(in_band.any(axis=-1), band_score[np.argmax(in_band, axis=-1)], 0.0)
+
+        # Prefer consistent wind (smaller difference between speed and gust)
+        if wind_gust is None:
+            gust_diff = np.full_like(wind, gust_spread_default)
+        else:
+            gust = np.asarray(wind_gust, dtype=np.float64)
+            gust_diff = np.where(np.isnan(gust), gust_spread_default, gust - wind)
+        consistency_factor = np.maximum(0.0, 1 - gust_diff / gust_spread_scale)
+
+        # Prefer daytime
+        time_factor = 1.0
+        if is_day is not None:
+            day = np.nan_to_num(np.asarray(is_day, dtype=np.float64), nan=1.0)
+            time_factor = np.where(day == 1, 1.0, night_factor)
+
+        # Prefer no precipitation
+        precip_factor = 1.0
+        if precipitation is not None:
+            precip = np.nan_to_num(np.asarray(precipitation, dtype=np.float64), nan=0.0)
+            precip_factor = np.maximum(0.0, 1 - precip / precipitation_scale)
+
+        # Prefer the spot's best wind directions
+        direction_factor = 1.0
+        if wind_direction is not None and sector_mask:
+            factors = sector_factors(sector_mask, direction_neighbour_factor, direction_outside_factor)
+            direction_factor = factors[direction_sectors(wind_direction)]
+
+        return wind_score * consistency_factor * time_factor * precip_factor * direction_factor
+
+    return evaluate
+
+
+@lru_cache(maxsize=1)
+def scoring_rules() -> Dict[str, Any]:
+    """Active scoring rules, loaded once per process."""
+    return load_scoring_rules()
+
+
+@lru_cache(maxsize=4096)
+def scoring_evaluator(
+    difficulty: Optional[str] = None,
+    water_type: Optional[str] = None,
+    sector_mask: int = 0,
+) -> Evaluator:
+    """
+    Compiled scoring function for a spot profile.
+
+    The default rules are overlaid with the rules for the difficulty and the
+    water type (case-insensitive) and for the sector mask of the spot's best
+    wind direction (see services.wind_sectors); values without rules add
+    nothing. The evaluator takes the arguments of score_hours.
+    """
+    rules = scoring_rules()
+    rule_set = dict(rules["default"])
+    keys = (_normalize(difficulty), _normalize(water_type), sector_mask or None)
+    for section, key in zip(RULE_SECTIONS, keys):
+        override = rules[section].get(key)
+        if override:
+            rule_set.update(override)
+    return compile_rules(json.dumps(rule_set, sort_keys=True))
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+logger = logging.getLogger("kitespot-api.single-flight")
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical reads into one execution.
+
+    The first caller for a key runs the load; callers arriving while it is in
+    flight await the same result instead of issuing their own query. The load
+    runs as its own task and is shielded from the callers, so a client that
+    disconnects does not cancel the query the others are waiting for. Loads
+    must therefore open their own database session.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.executed = 0
+        self.coalesced = 0
+        self.failed = 0
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, load: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run load() for key, or join the run already in flight for it.
+
+        Args:
+            key: Identifies identical requests
+            load: Coroutine function producing the result
+
+        Returns:
+            The result of the shared run (exceptions are shared too)
+        """
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.executed += 1
+            task = asyncio.create_task(load())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Retrieve the exception so it is not reported as unhandled when every caller went away
+        if not task.cancelled() and task.exception() is not None:
+            self.failed += 1
+            logger.error(f"{self.name} load for {key} failed: {task.exception()}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters of executed versus coalesced loads."""
+        total = self.executed + self.coalesced
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+            "in_flight": len(self._in_flight),
+            "coalesced_ratio": round(self.coalesced / total, 3) if total else 0.0,
+        }
+
+
+# Shared instances in front of the forecast read paths
+forecast_reads = SingleFlight("forecast")
+golden_window_reads = SingleFlight("golden-window")
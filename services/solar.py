@@ -0,0 +1,221 @@
+import logging
+import os
+from datetime import date, datetime, timedelta, timezone
+from typing import Iterable, NamedTuple, Tuple
+
+import numpy as np
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import async_session
+
+logger = logging.getLogger("kitespot-weather-service.solar")
+
+# Days from today that kitespot_daylight covers (forecasts reach 7 days ahead)
+DAYLIGHT_DAYS_AHEAD = int(os.getenv("DAYLIGHT_DAYS_AHEAD", 10))
+# Days before today that are kept, so forecasts starting before midnight still find their day
+DAYLIGHT_DAYS_KEPT = 2
+
+SECONDS_PER_DAY = 86400
+# Sun centre below the horizon at sunrise/sunset (refraction and solar disc)
+SUNRISE_ZENITH = 90.833
+
+DAYLIGHT_SPOTS_SQL = """
+    SELECT id, latitude, longitude
+    FROM kitespots
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+"""
+
+UPSERT_DAYLIGHT_SQL = """
+    INSERT INTO kitespot_daylight (kitespot_id, day, sunrise, sunset)
+    VALUES (:kitespot_id, :day, :sunrise, :sunset)
+    ON CONFLICT (kitespot_id, day) DO UPDATE SET
+        sunrise = EXCLUDED.sunrise,
+        sunset = EXCLUDED.sunset
+"""
+
+PRUNE_DAYLIGHT_SQL = "DELETE FROM kitespot_daylight WHERE day < :cutoff"
+
+DAYLIGHT_SQL = """
+    SELECT kitespot_id, day, sunrise, sunset
+    FROM kitespot_daylight
+    WHERE kitespot_id = ANY(CAST(:kitespot_ids AS integer[]))
+    AND day BETWEEN :first_day AND :last_day
+"""
+
+
+def sun_times(latitudes: np.ndarray, longitudes: np.ndarray, days: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sunrise and sunset for many spots and days with the NOAA solar equations.
+
+    Accurate to about a minute between +/-72 degrees latitude. Under midnight
+    sun sunrise and sunset are 12 hours before and after solar noon; in polar
+    night both are solar noon.
+
+    Args:
+        latitudes: Spot latitudes in degrees, shape (spots,)
+        longitudes: Spot longitudes in degrees (east positive), shape (spots,)
+        days: UTC days as datetime64[D], shape (days,)
+
+    Returns:
+        Tuple of (sunrise, sunset) in Unix seconds, shape (spots, days)
+    """
+    latitude = np.radians(np.asarray(latitudes, dtype=np.float64))[:, None]
+    longitude = np.asarray(longitudes, dtype=np.float64)[:, None]
+    day_seconds = np.asarray(days, dtype="datetime64[D]").astype("datetime64[s]").astype(np.int64)[None, :]
+
+    # Julian century at the spot's approximate solar noon
+    julian_day = (day_seconds + 43200 - longitude / 360.0 * SECONDS_PER_DAY) / SECONDS_PER_DAY + 2440587.5
+    century = (julian_day - 2451545.0) / 36525.0
+
+    mean_longitude = np.radians((280.46646 + century * (36000.76983 + century * 0.0003032)) % 360.0)
+    mean_anomaly = np.radians(357.52911 + century * (35999.05029 - 0.0001537 * century))
+    eccentricity = 0.016708634 - century * (0.000042037 + 0.0000001267 * century)
+    centre = (
+        np.sin(mean_anomaly) * (1.914602 - century * (0.004817 + 0.000014 * century))
+        + np.sin(2 * mean_anomaly) * (0.019993 - 0.000101 * century)
+        + np.sin(3 * mean_anomaly) * 0.000289
+    )
+    omega = np.radians(125.04 - 1934.136 * century)
+    apparent_longitude = np.radians(np.degrees(mean_longitude) + centre - 0.00569 - 0.00478 * np.sin(omega))
+    mean_obliquity = 23 + (26 + (21.448 - century * (46.815 + century * (0.00059 - century * 0.001813))) / 60) / 60
+    obliquity = np.radians(mean_obliquity + 0.00256 * np.cos(omega))
+    declination = np.arcsin(np.sin(obliquity) * np.sin(apparent_longitude))
+
+    y = np.tan(obliquity / 2) ** 2
+    equation_of_time = 4 * np.degrees(
+        y * np.sin(2 * mean_longitude)
+        - 2 * eccentricity * np.sin(mean_anomaly)
+        + 4 * eccentricity * y * np.sin(mean_anomaly) * np.cos(2 * mean_longitude)
+        - 0.5 * y * y * np.sin(4 * mean_longitude)
+        - 1.25 * eccentricity * eccentricity * np.sin(2 * mean_anomaly)
+    )
+
+    # Clipping turns midnight sun into a 180 degree hour angle and polar night into 0
+    cos_hour_angle = (
+        np.cos(np.radians(SUNRISE_ZENITH)) / (np.cos(latitude) * np.cos(declination))
+        - np.tan(latitude) * np.tan(declination)
+    )
+    hour_angle = np.degrees(np.arccos(np.clip(cos_hour_angle, -1.0, 1.0)))
+
+    solar_noon = day_seconds + (720.0 - 4 * longitude - equation_of_time) * 60
+    return solar_noon - hour_angle * 240, solar_noon + hour_angle * 240
+
+
+class DaylightTable(NamedTuple):
+    """Sunrise/sunset of several spots on consecutive days; NaN where a day is missing."""
+    kitespot_ids: np.ndarray  # (spots,)
+    first_day: int            # Days since 1970-01-01 of column 0
+    sunrise: np.ndarray       # (spots, days) Unix seconds
+    sunset: np.ndarray        # (spots, days) Unix seconds
+
+
+def is_day(table: DaylightTable, kitespot_ids: np.ndarray, seconds: np.ndarray) -> np.ndarray:
+    """
+    Whether each hour is between sunrise and sunset.
+
+    A spot's daylight on UTC day d can start on d - 1 or end on d + 1 far from
+    Greenwich, so every hour is checked against three days.
+
+    Args:
+        table: Daylight of the spots, see load_daylight
+        kitespot_ids: Spot per row of seconds, shape (spots,)
+        seconds: Unix seconds of every hour, shape (spots, hours)
+
+    Returns:
+        Float matrix shaped like seconds: 1 by day, 0 at night, NaN where the
+        daylight of the spot or hour is unknown
+    """
+    seconds = np.asarray(seconds, dtype=np.float64)
+    result = np.full(seconds.shape, np.nan, dtype=np.float64)
+    rows = {int(kitespot_id): row for row, kitespot_id in enumerate(table.kitespot_ids)}
+    spot_rows = np.array([rows.get(int(kitespot_id), -1) for kitespot_id in kitespot_ids], dtype=np.int64)
+    known_spot = spot_rows >= 0
+    if not known_spot.any() or table.sunrise.shape[1] == 0:
+        return result
+
+    day_columns = np.floor_divide(seconds, SECONDS_PER_DAY).astype(np.int64) - table.first_day
+    spot_index = np.broadcast_to(np.maximum(spot_rows, 0)[:, None], seconds.shape)
+    daylight = np.zeros(seconds.shape, dtype=bool)
+    known_day = np.zeros(seconds.shape, dtype=bool)
+    for shift in (-1, 0, 1):
+        columns = day_columns + shift
+        valid = (columns >= 0) & (columns < table.sunrise.shape[1])
+        columns = np.clip(columns, 0, table.sunrise.shape[1] - 1)
+        sunrise = table.sunrise[spot_index, columns]
+        sunset = table.sunset[spot_index, columns]
+        found = valid & ~np.isnan(sunrise)
+        daylight |= found & (sunrise <= seconds) & (seconds < sunset)
+        if shift == 0:
+            known_day = found
+
+    # An hour is night only when its own day is known, since a neighbouring day may still cover it
+    known = known_day & known_spot[:, None]
+    result[known] = 0.0
+    result[daylight & known_spot[:, None]] = 1.0
+    return result
+
+
+async def load_daylight(
+    session: AsyncSession,
+    kitespot_ids: Iterable[int],
+    start: datetime,
+    end: datetime,
+) -> DaylightTable:
+    """Stored daylight of several kitespots covering start..end, in one query."""
+    kitespot_ids = sorted({int(kitespot_id) for kitespot_id in kitespot_ids})
+    first_day = start.astimezone(timezone.utc).date() - timedelta(days=1)
+    last_day = end.astimezone(timezone.utc).date() + timedelta(days=1)
+    result = await session.execute(
+        text(DAYLIGHT_SQL), {"kitespot_ids": kitespot_ids, "first_day": first_day, "last_day": last_day}
+    )
+
+    shape = (len(kitespot_ids), (last_day - first_day).days + 1)
+    sunrise = np.full(shape, np.nan, dtype=np.float64)
+    sunset = np.full(shape, np.nan, dtype=np.float64)
+    rows = {kitespot_id: row for row, kitespot_id in enumerate(kitespot_ids)}
+    for record in result.fetchall():
+        column = (record.day - first_day).days
+        sunrise[rows[record.kitespot_id], column] = record.sunrise.timestamp()
+        sunset[rows[record.kitespot_id], column] = record.sunset.timestamp()
+    return DaylightTable(
+        np.array(kitespot_ids, dtype=np.int64), (first_day - date(1970, 1, 1)).days, sunrise, sunset
+    )
+
+
+async def refresh_daylight(days_ahead: int = DAYLIGHT_DAYS_AHEAD) -> int:
+    """
+    Compute sunrise and sunset of every kitespot from yesterday to days_ahead
+    and drop days that are no longer needed.
+
+    Returns:
+        Number of spot days written
+    """
+    today = datetime.now(timezone.utc).date()
+    first_day = today - timedelta(days=1)
+    async with async_session() as session:
+        spots = (await session.execute(text(DAYLIGHT_SPOTS_SQL))).fetchall()
+        if spots:
+            days = np.arange(np.datetime64(first_day), np.datetime64(today + timedelta(days=days_ahead + 1)))
+            sunrise, sunset = sun_times(
+                np.array([spot.latitude for spot in spots], dtype=np.float64),
+                np.array([spot.longitude for spot in spots], dtype=np.float64),
+                days,
+            )
+            day_dates = [day.item() for day in days]
+            records = [
+                {
+                    "kitespot_id": spot.id,
+                    "day": day_dates[column],
+                    "sunrise": datetime.fromtimestamp(round(float(sunrise[row, column])), tz=timezone.utc),
+                    "sunset": datetime.fromtimestamp(round(float(sunset[row, column])), tz=timezone.utc),
+                }
+                for row, spot in enumerate(spots)
+                for column in range(len(day_dates))
+            ]
+            await session.execute(text(UPSERT_DAYLIGHT_SQL), records)
+        await session.execute(text(PRUNE_DAYLIGHT_SQL), {"cutoff": today - timedelta(days=DAYLIGHT_DAYS_KEPT)})
+        await session.commit()
+
+    logger.info(f"Daylight computed for {len(spots)} kitespots up to {days_ahead} days ahead")
+    return len(spots) * (days_ahead + 2)
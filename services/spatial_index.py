@@ -0,0 +1,208 @@
+import logging
+import math
+import os
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from database import async_session
+
+logger = logging.getLogger("kitespot-api.spatial-index")
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+
+# Size of the index buckets in degrees (about 111 km of latitude)
+SPATIAL_CELL_DEGREES = float(os.getenv("SPATIAL_CELL_DEGREES", 1.0))
+# Seconds between polls of kitespots for added, moved or deleted spots
+SPATIAL_INDEX_REFRESH_INTERVAL = int(os.getenv("SPATIAL_INDEX_REFRESH_INTERVAL", 300))
+# Re-read this much before the newest update seen, so late commits are not missed
+REFRESH_OVERLAP = timedelta(minutes=1)
+
+SPOTS_SQL = """
+    SELECT id, name, country, latitude, longitude, updated_at
+    FROM kitespots
+    WHERE latitude IS NOT NULL AND longitude IS NOT NULL
+"""
+
+Cell = Tuple[int, int]
+
+
+def haversine_km(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Great-circle distances in km from one point to many (longitudes in any range)."""
+    lat1 = math.radians(latitude)
+    lat2 = np.radians(latitudes)
+    dlat = lat2 - lat1
+    dlon = np.radians(longitudes - longitude)
+    a = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class SpatialIndex:
+    """
+    In-memory bucket index of kitespot coordinates for radius queries.
+
+    Spots are kept in a grid of cell_degrees x cell_degrees buckets. A radius
+    query only measures the spots in the buckets overlapping the search
+    circle; longitude buckets wrap around the antimeridian.
+    """
+
+    def __init__(self, cell_degrees: float = SPATIAL_CELL_DEGREES):
+        self.cell_degrees = cell_degrees
+        self.columns = max(1, round(360.0 / cell_degrees))
+        self._spots: Dict[int, Dict[str, Any]] = {}
+        self._cells: Dict[Cell, Set[int]] = {}
+        self._newest: Optional[datetime] = None
+        self._loaded = False
+
+    def __len__(self) -> int:
+        return len(self._spots)
+
+    def cell(self, latitude: float, longitude: float) -> Cell:
+        """Bucket of a coordinate."""
+        row = math.floor((latitude + 90.0) / self.cell_degrees)
+        column = math.floor((longitude + 180.0) / self.cell_degrees) % self.columns
+        return row, column
+
+    def upsert(self, kitespot_id: int, latitude: float, longitude: float, **attributes: Any):
+        """Add a spot or move it to its new coordinates."""
+        self.remove(kitespot_id)
+        longitude = (longitude + 180.0) % 360.0 - 180.0
+        self._spots[kitespot_id] = {"id": kitespot_id, "latitude": latitude, "longitude": longitude, **attributes}
+        self._cells.setdefault(self.cell(latitude, longitude), set()).add(kitespot_id)
+
+    def remove(self, kitespot_id: int) -> Optional[Dict[str, Any]]:
+        """Remove a spot; returns it if it was indexed."""
+        spot = self._spots.pop(kitespot_id, None)
+        if spot is not None:
+            cell = self.cell(spot["latitude"], spot["longitude"])
+            members = self._cells.get(cell)
+            if members is not None:
+                members.discard(kitespot_id)
+                if not members:
+                    del self._cells[cell]
+        return spot
+
+    def get(self, kitespot_id: int) -> Optional[Dict[str, Any]]:
+        return self._spots.get(kitespot_id)
+
+    def spots(self) -> List[Dict[str, Any]]:
+        return list(self._spots.values())
+
+    def _candidate_cells(self, latitude: float, longitude: float, radius_km: float) -> List[Cell]:
+        lat_span = radius_km / KM_PER_DEGREE
+        min_row = math.floor((max(-90.0, latitude - lat_span) + 90.0) / self.cell_degrees)
+        max_row = math.floor((min(90.0, latitude + lat_span) + 90.0) / self.cell_degrees)
+
+        # Longitude degrees shrink with latitude; near the poles every column qualifies
+        widest = max(abs(latitude - lat_span), abs(latitude + lat_span))
+        cos_lat = math.cos(math.radians(min(widest, 90.0)))
+        if cos_lat < 1e-6 or radius_km / (KM_PER_DEGREE * cos_lat) >= 180.0:
+            columns = range(self.columns)
+        else:
+            lon_span = radius_km / (KM_PER_DEGREE * cos_lat)
+            first = math.floor((longitude - lon_span + 180.0) / self.cell_degrees)
+            last = math.floor((longitude + lon_span + 180.0) / self.cell_degrees)
+            columns = sorted({column % self.columns for column in range(first, last + 1)})
+
+        return [(row, column) for row in range(min_row, max_row + 1) for column in columns]
+
+    def nearby(self, latitude: float, longitude: float, radius_km: float, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Spots within radius_km of a point, closest first.
+
+        Returns:
+            Spot dictionaries with an added distance_km
+        """
+        candidates = [
+            kitespot_id
+            for cell in self._candidate_cells(latitude, longitude, radius_km)
+            for kitespot_id in self._cells.get(cell, ())
+        ]
+        if not candidates:
+            return []
+
+        latitudes = np.fromiter((self._spots[i]["latitude"] for i in candidates), dtype=np.float64, count=len(candidates))
+        longitudes = np.fromiter((self._spots[i]["longitude"] for i in candidates), dtype=np.float64, count=len(candidates))
+        distances = haversine_km(latitude, longitude, latitudes, longitudes)
+
+        within = np.flatnonzero(distances <= radius_km)
+        closest = within[np.argsort(distances[within], kind="stable")[:limit]]
+        return [
+            {**self._spots[candidates[index]], "distance_km": round(float(distances[index]), 3)}
+            for index in closest
+        ]
+
+    async def load(self) -> Tuple[List[int], List[int]]:
+        """
+        Rebuild the index from all kitespots.
+
+        Returns:
+            Tuple of (ids added or moved, ids removed) compared to the previous contents
+        """
+        async with async_session() as session:
+            result = await session.execute(text(SPOTS_SQL))
+            rows = result.fetchall()
+
+        previous = {kitespot_id: (spot["latitude"], spot["longitude"]) for kitespot_id, spot in self._spots.items()}
+        self._spots.clear()
+        self._cells.clear()
+        self._newest = None
+        for row in rows:
+            self._add_row(row)
+        self._loaded = True
+
+        changed = [
+            kitespot_id for kitespot_id, spot in self._spots.items()
+            if previous.get(kitespot_id) != (spot["latitude"], spot["longitude"])
+        ]
+        removed = [kitespot_id for kitespot_id in previous if kitespot_id not in self._spots]
+        logger.info(f"Spatial index loaded with {len(self._spots)} kitespots")
+        return changed, removed
+
+    async def refresh(self) -> Tuple[List[int], List[int]]:
+        """
+        Apply kitespots added or updated since the last poll.
+
+        Falls back to a full reload when the number of spots no longer matches,
+        which is how deletions (and rows written without updated_at) are caught.
+
+        Returns:
+            Tuple of (ids added or moved, ids removed)
+        """
+        if not self._loaded:
+            return await self.load()
+
+        rows = []
+        async with async_session() as session:
+            total = (await session.execute(text(f"SELECT COUNT(*) FROM ({SPOTS_SQL}) spots"))).scalar()
+            if self._newest is not None:
+                result = await session.execute(
+                    text(f"{SPOTS_SQL} AND updated_at >= :since"), {"since": self._newest - REFRESH_OVERLAP}
+                )
+                rows = result.fetchall()
+
+        changed = []
+        for row in rows:
+            spot = self._spots.get(row.id)
+            if spot is None or (spot["latitude"], spot["longitude"]) != (row.latitude, (row.longitude + 180.0) % 360.0 - 180.0):
+                changed.append(row.id)
+            self._add_row(row)
+
+        if total != len(self._spots):
+            more_changed, removed = await self.load()
+            return sorted(set(changed) | set(more_changed)), removed
+        if changed:
+            logger.info(f"Spatial index updated for {len(changed)} kitespots")
+        return changed, []
+
+    def _add_row(self, row: Any):
+        self.upsert(row.id, float(row.latitude), float(row.longitude), name=row.name, country=row.country)
+        if row.updated_at is not None and (self._newest is None or row.updated_at > self._newest):
+            self._newest = row.updated_at
+
+
+# Loaded at startup and polled for spot changes by the API lifespan
+spatial_index = SpatialIndex()
@@ -0,0 +1,164 @@
+import logging
+import os
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import text
+
+from database import async_session
+
+logger = logging.getLogger("kitespot-weather-service.partitions")
+
+PARENT_TABLE = "kitespot_weather"
+PARTITION_PREFIX = f"{PARENT_TABLE}_p"
+
+# Days of hourly data kept before a partition is rolled up and dropped
+RETENTION_DAYS = int(os.getenv("WEATHER_RETENTION_DAYS", 7))
+# Days ahead of today that always have a partition ready for incoming forecasts
+PARTITIONS_AHEAD = 3
+
+LIST_PARTITIONS_SQL = """
+    SELECT child.relname
+    FROM pg_inherits
+    JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :parent
+"""
+
+# Rolls one day partition up into kitespot_weather_daily (wind direction as circular mean)
+ROLLUP_SQL = """
+    INSERT INTO kitespot_weather_daily (
+        kitespot_id, day, hours,
+        temperature_min, temperature_max, temperature_avg,
+        humidity_avg, precipitation_sum,
+        wind_speed_avg, wind_speed_max, wind_gusts_max, wind_direction_avg,
+        cloud_cover_avg, visibility_avg
+    )
+    SELECT
+        kitespot_id, CAST(:day AS date), COUNT(*),
+        MIN(temperature), MAX(temperature), AVG(temperature),
+        AVG(humidity), SUM(precipitation),
+        AVG(wind_speed_10m), MAX(wind_speed_10m), MAX(wind_gusts_10m),
+        CAST(MOD(CAST(DEGREES(ATAN2(
+            AVG(SIN(RADIANS(wind_direction_10m))),
+            AVG(COS(RADIANS(wind_direction_10m)))
+        )) + 360 AS numeric), 360) AS double precision),
+        AVG(cloud_cover), AVG(visibility)
+    FROM {partition}
+    GROUP BY kitespot_id
+    ON CONFLICT (kitespot_id, day) DO UPDATE SET
+        hours = EXCLUDED.hours,
+        temperature_min = EXCLUDED.temperature_min,
+        temperature_max = EXCLUDED.temperature_max,
+        temperature_avg = EXCLUDED.temperature_avg,
+        humidity_avg = EXCLUDED.humidity_avg,
+        precipitation_sum = EXCLUDED.precipitation_sum,
+        wind_speed_avg = EXCLUDED.wind_speed_avg,
+        wind_speed_max = EXCLUDED.wind_speed_max,
+        wind_gusts_max = EXCLUDED.wind_gusts_max,
+        wind_direction_avg = EXCLUDED.wind_direction_avg,
+        cloud_cover_avg = EXCLUDED.cloud_cover_avg,
+        visibility_avg = EXCLUDED.visibility_avg
+"""
+
+# Partitions known to exist, so the DDL runs at most once per day and process
+_known_partitions: Set[date] = set()
+
+
+def partition_name(day: date) -> str:
+    """Name of the kitespot_weather partition holding the given UTC day."""
+    return f"{PARTITION_PREFIX}{day:%Y%m%d}"
+
+
+def partition_day(name: str) -> Optional[date]:
+    """UTC day of a partition name, or None for tables that don't follow the naming scheme."""
+    if not name.startswith(PARTITION_PREFIX):
+        return None
+    try:
+        return datetime.strptime(name[len(PARTITION_PREFIX):], "%Y%m%d").date()
+    except ValueError:
+        return None
+
+
+async def list_partitions(session) -> Dict[date, str]:
+    """Existing daily partitions of kitespot_weather, keyed by UTC day."""
+    result = await session.execute(text(LIST_PARTITIONS_SQL), {"parent": PARENT_TABLE})
+    partitions = {}
+    for (name,) in result.fetchall():
+        day = partition_day(name)
+        if day is not None:
+            partitions[day] = name
+    return partitions
+
+
+async def ensure_partitions(days: Iterable[date]) -> List[date]:
+    """
+    Create the daily partitions for the given UTC days if they don't exist yet.
+
+    Returns:
+        Days for which a partition was created
+    """
+    missing = sorted(set(days) - _known_partitions)
+    if not missing:
+        return []
+
+    created = []
+    async with async_session() as session:
+        existing = await list_partitions(session)
+        for day in missing:
+            if day not in existing:
+                start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+                end = start + timedelta(days=1)
+                await session.execute(text(
+                    f"CREATE TABLE IF NOT EXISTS {partition_name(day)} PARTITION OF {PARENT_TABLE} "
+                    f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+                ))
+                created.append(day)
+        await session.commit()
+
+    _known_partitions.update(missing)
+    if created:
+        logger.info(f"Created kitespot_weather partitions for {', '.join(map(str, created))}")
+    return created
+
+
+async def ensure_upcoming_partitions(today: Optional[date] = None) -> List[date]:
+    """Make sure partitions exist from yesterday up to PARTITIONS_AHEAD days ahead."""
+    today = today or datetime.now(timezone.utc).date()
+    return await ensure_partitions(today + timedelta(days=offset) for offset in range(-1, PARTITIONS_AHEAD + 1))
+
+
+async def apply_retention(retention_days: int = RETENTION_DAYS, today: Optional[date] = None) -> List[date]:
+    """
+    Roll up and drop the partitions that fell out of the retention period.
+
+    Each expired day is summarised into kitespot_weather_daily and its partition
+    dropped in the same transaction, so no history is lost and no row-by-row
+    DELETE ever runs against kitespot_weather.
+
+    Returns:
+        Days whose partition was dropped
+    """
+    today = today or datetime.now(timezone.utc).date()
+    cutoff = today - timedelta(days=retention_days)
+
+    async with async_session() as session:
+        partitions = await list_partitions(session)
+
+    dropped = []
+    for day, name in sorted(partitions.items()):
+        if day >= cutoff:
+            continue
+        try:
+            async with async_session() as session:
+                await session.execute(text(ROLLUP_SQL.format(partition=name)), {"day": day})
+                await session.execute(text(f"DROP TABLE {name}"))
+                await session.commit()
+            _known_partitions.discard(day)
+            dropped.append(day)
+        except Exception as e:
+            logger.error(f"Error rolling up weather partition {name}: {str(e)}")
+
+    if dropped:
+        logger.info(f"Rolled up and dropped kitespot_weather partitions for {', '.join(map(str, dropped))}")
+    return dropped
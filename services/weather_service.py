@@ -1,24 +1,199 @@
 import asyncio
 import logging
+import math
 import sys
+import time
 from datetime import datetime, timedelta, timezone
+import numpy as np
 import pandas as pd
-import requests_cache
-import aiohttp
-import json
-from sqlalchemy import select, text, cast, TIMESTAMP, delete, and_
-from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.sql import functions
-from openmeteo_requests import Client
+import requests
+from sqlalchemy import text
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
 from retry_requests import retry
-from typing import List, Dict
+from typing import List, Dict, Any, Optional, Tuple
 
 # Add the parent directory to the path so we can import modules from there
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database import async_session
-from models import KiteSpot, KiteSpotWeather
+from models import KiteSpot
+from services.rate_limiter import AdaptiveTokenBucket, RateLimitExceeded, parse_retry_after
+from services.weather_partitions import ensure_partitions, ensure_upcoming_partitions
+from services.forecast_store import copy_to_staging, write_forecast_runs
+from services.golden_windows import write_golden_windows
+
+# Open-Meteo hourly variable -> kitespot_weather column
+WEATHER_COLUMNS = {
+    "temperature_2m": "temperature",
+    "relative_humidity_2m": "humidity",
+    "precipitation": "precipitation",
+    "wind_speed_10m": "wind_speed_10m",
+    "wind_direction_10m": "wind_direction_10m",
+    "wind_gusts_10m": "wind_gusts_10m",
+    "cloud_cover": "cloud_cover",
+    "visibility": "visibility",
+}
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+HOURLY_PARAMS = list(WEATHER_COLUMNS.keys())
+
+STAGING_TABLE = "kitespot_weather_staging"
+
+# rows: one kitespot_weather row per hour; packed: one kitespot_forecast_runs
+# row of float32 arrays per spot and run; both: write both
+STORAGE_MODES = ("rows", "packed", "both")
+
+# Merge staged rows; existing hours are only touched when a value differs.
+# xmax = 0 on a returned row means it was inserted rather than updated.
+_VALUE_COLUMNS = list(WEATHER_COLUMNS.values())
+UPSERT_WEATHER_SQL = f"""
+    INSERT INTO kitespot_weather (kitespot_id, timestamp, {", ".join(_VALUE_COLUMNS)}, created_at)
+    SELECT DISTINCT ON (kitespot_id, timestamp)
+        kitespot_id, timestamp, {", ".join(_VALUE_COLUMNS)}, created_at
+    FROM {STAGING_TABLE}
+    ON CONFLICT (kitespot_id, timestamp) DO UPDATE SET
+        {", ".join(f"{column} = EXCLUDED.{column}" for column in _VALUE_COLUMNS)}
+    WHERE ({", ".join(f"kitespot_weather.{column}" for column in _VALUE_COLUMNS)})
+        IS DISTINCT FROM ({", ".join(f"EXCLUDED.{column}" for column in _VALUE_COLUMNS)})
+    RETURNING kitespot_id, (xmax = 0) AS inserted
+"""
+
+# Record that every spot of the batch was refreshed, and which ones changed
+RECORD_INGEST_SQL = """
+    INSERT INTO kitespot_weather_ingest (kitespot_id, last_ingested_at, last_changed_at)
+    SELECT
+        kitespot_id,
+        CAST(:ingested_at AS timestamptz),
+        CASE WHEN kitespot_id = ANY(CAST(:changed_ids AS integer[])) THEN CAST(:ingested_at AS timestamptz) END
+    FROM unnest(CAST(:kitespot_ids AS integer[])) AS kitespot_id
+    ON CONFLICT (kitespot_id) DO UPDATE SET
+        last_ingested_at = EXCLUDED.last_ingested_at,
+        last_changed_at = COALESCE(EXCLUDED.last_changed_at, kitespot_weather_ingest.last_changed_at)
+"""
+
+GridCell = Tuple[int, int]
+
+
+def grid_cell(latitude: float, longitude: float, resolution: float) -> GridCell:
+    """
+    Maps a coordinate to the index of its forecast grid cell.
+
+    Args:
+        latitude: Latitude in degrees
+        longitude: Longitude in degrees (any range, wrapped to -180..180)
+        resolution: Cell size in degrees
+
+    Returns:
+        Tuple of (latitude index, longitude index)
+    """
+    longitude = (longitude + 180.0) % 360.0 - 180.0
+    columns = max(1, round(360.0 / resolution))
+    return round(latitude / resolution), round(longitude / resolution) % columns
+
+
+def cell_request_coordinate(spots: List[KiteSpot]) -> Tuple[float, float]:
+    """
+    Returns the (latitude, longitude) used to request the forecast of a grid cell.
+
+    This is the coordinate of the spot closest to the median of the cell's
+    spots, so the forecast is for a real kitespot rather than a cell centre
+    that may lie inland or out at sea.
+    """
+    first_longitude = float(spots[0].longitude)
+    latitudes = np.array([float(spot.latitude) for spot in spots])
+    # Longitudes relative to the first spot, so a cell on the antimeridian does not wrap
+    offsets = np.array([(float(spot.longitude) - first_longitude + 180.0) % 360.0 - 180.0 for spot in spots])
+    distances = (latitudes - np.median(latitudes)) ** 2 + (offsets - np.median(offsets)) ** 2
+    spot = spots[int(np.argmin(distances))]
+    return float(spot.latitude), float(spot.longitude)
+
+
+def has_coordinates(spot: KiteSpot) -> bool:
+    """Whether a spot has a finite latitude and longitude."""
+    try:
+        return math.isfinite(float(spot.latitude)) and math.isfinite(float(spot.longitude))
+    except (TypeError, ValueError):
+        return False
+
+
+def group_by_grid_cell(kitespots: List[KiteSpot], resolution: float) -> Dict[GridCell, List[KiteSpot]]:
+    """
+    Groups kitespots that share a forecast grid cell, preserving input order.
+
+    A resolution of 0 disables grouping: every distinct coordinate is its own cell.
+    """
+    cells: Dict[GridCell, List[KiteSpot]] = {}
+    for spot in kitespots:
+        if resolution > 0:
+            cell = grid_cell(float(spot.latitude), float(spot.longitude), resolution)
+        else:
+            cell = (float(spot.latitude), float(spot.longitude))
+        cells.setdefault(cell, []).append(spot)
+    return cells
+
+
+def build_weather_rows(
+    cells: Dict[GridCell, List[KiteSpot]],
+    lengths: np.ndarray,
+    times: np.ndarray,
+    values: Dict[str, np.ndarray],
+) -> pd.DataFrame:
+    """
+    Expands concatenated per-cell forecasts into one long table keyed by kitespot_id.
+
+    Each spot gets a copy of its cell's hours. The expansion is a single gather
+    per column, so no per-spot DataFrames are created.
+
+    Args:
+        cells: Grid cells in request order with the spots they contain
+        lengths: Number of hours returned for each cell
+        times: UTC unix times of all cells, concatenated
+        values: Open-Meteo variable -> values of all cells, concatenated
+
+    Returns:
+        DataFrame with kitespot_id, timestamp and kitespot_weather value columns
+    """
+    spot_ids = np.fromiter((spot.id for spots in cells.values() for spot in spots), dtype=np.int64)
+    spots_per_cell = np.fromiter((len(spots) for spots in cells.values()), dtype=np.int64)
+    cell_offsets = np.cumsum(lengths) - lengths
+
+    # Row i of the output reads position take[i] of the concatenated cell arrays
+    spot_cells = np.repeat(np.arange(len(lengths)), spots_per_cell)
+    spot_lengths = lengths[spot_cells]
+    spot_offsets = np.cumsum(spot_lengths) - spot_lengths
+    take = (
+        np.arange(spot_lengths.sum())
+        - np.repeat(spot_offsets, spot_lengths)
+        + np.repeat(cell_offsets[spot_cells], spot_lengths)
+    )
+
+    columns = {
+        "kitespot_id": np.repeat(spot_ids, spot_lengths),
+        "timestamp": pd.to_datetime(times[take], unit="s", utc=True),
+    }
+    for param, column in WEATHER_COLUMNS.items():
+        columns[column] = values[param][take] if param in values else np.nan
+    return pd.DataFrame(columns)
+
+
+def decode_forecast_responses(content: bytes) -> List[WeatherApiResponse]:
+    """
+    Splits a FlatBuffers forecast body into one WeatherApiResponse per location.
+
+    Every location is a little-endian uint32 length followed by its message.
+    Errors raised while streaming replace the next message with plain text.
+    """
+    messages = []
+    position = 0
+    while position < len(content):
+        length = int.from_bytes(content[position:position + 4], byteorder="little")
+        if content[position:position + 10] == b"Unexpected":
+            raise ValueError(f"Open-Meteo stream error: {content[position:].decode('utf-8', 'replace')}")
+        messages.append(WeatherApiResponse.GetRootAs(content, position + 4))
+        position += length + 4
+    return messages
+
 
 # Configure root logger
 logging.basicConfig(
@@ -27,174 +202,403 @@ logging.basicConfig(
 )
 
 class OpenMeteoWeatherService:
-    def __init__(self):
-        """Initialize the weather service."""
+    def __init__(
+        self,
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        requests_per_minute: Optional[float] = None,
+        max_attempts: int = 5,
+        grid_resolution: Optional[float] = None,
+        storage_mode: Optional[str] = None,
+    ):
+        """
+        Initialize the weather service.
+
+        Args:
+            batch_size: Number of locations sent in one multi-location request
+                (default: WEATHER_BATCH_SIZE or 50)
+            max_concurrency: Maximum number of batch requests in flight at once
+                (default: WEATHER_MAX_CONCURRENCY or 4)
+            requests_per_minute: Open-Meteo quota, counted per location
+                (default: WEATHER_REQUESTS_PER_MINUTE or 500)
+            max_attempts: How often a rate-limited batch is retried before giving up
+            grid_resolution: Size in degrees of the grid cells whose spots share one
+                forecast request, 0 to disable (default: WEATHER_GRID_RESOLUTION or 0.1)
+            storage_mode: One of STORAGE_MODES (default: WEATHER_STORAGE_MODE or "rows")
+        """
         # Get logger
         self.logger = logging.getLogger("kitespot-weather-service")
 
-        # Setup the Open-Meteo API client with cache and retry logic
-        cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-        retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-        self.client = Client(session=retry_session)
+        self.batch_size = batch_size or int(os.getenv("WEATHER_BATCH_SIZE", 50))
+        self.max_concurrency = max_concurrency or int(os.getenv("WEATHER_MAX_CONCURRENCY", 4))
+
+        # Setup the Open-Meteo HTTP session with retry logic. No response cache: the
+        # refresh tiers decide how fresh a forecast must be, so every fetch hits the API
+        retry_session = retry(requests.Session(), retries=5, backoff_factor=0.2)
+        # Keep one pooled keep-alive connection per concurrent fetch worker
+        retry_session.get_adapter(OPEN_METEO_URL).init_poolmanager(
+            connections=10, maxsize=max(10, self.max_concurrency)
+        )
+        self.session = retry_session
+        self.max_attempts = max_attempts
+        if grid_resolution is None:
+            grid_resolution = float(os.getenv("WEATHER_GRID_RESOLUTION", 0.1))
+        self.grid_resolution = grid_resolution
+        self.storage_mode = storage_mode or os.getenv("WEATHER_STORAGE_MODE", "rows")
+        if self.storage_mode not in STORAGE_MODES:
+            raise ValueError(f"Unknown weather storage mode {self.storage_mode!r}, expected one of {STORAGE_MODES}")
+        # Open-Meteo counts every location of a multi-location request as one call
+        self.rate_limiter = AdaptiveTokenBucket(
+            rate_per_minute=requests_per_minute or float(os.getenv("WEATHER_REQUESTS_PER_MINUTE", 500))
+        )
         
-    async def fetch_weather_data_batch(self, kitespots: List[KiteSpot]) -> Dict[int, pd.DataFrame]:
-        """Fetch weather data for multiple kitespots using the batch API."""
+    def _request_forecasts(self, params: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Request and decode a multi-location forecast in the FlatBuffers format.
+
+        Blocking; runs in a worker thread. Variables are read straight from the
+        binary response into NumPy arrays and concatenated across locations.
+
+        Returns:
+            Tuple of (hours per location, UTC unix times, values per variable)
+
+        Raises:
+            RateLimitExceeded: On HTTP 429, with the response's Retry-After
+        """
+        response = self.session.get(OPEN_METEO_URL, params={**params, "format": "flatbuffers"})
+        if response.status_code == 429:
+            raise RateLimitExceeded(
+                f"Open-Meteo rate limit hit: {response.text[:200]}",
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
+        if response.status_code >= 400:
+            raise requests.HTTPError(
+                f"Open-Meteo returned HTTP {response.status_code}: {response.text[:200]}", response=response
+            )
+        responses = decode_forecast_responses(response.content)
+
+        lengths = []
+        times = []
+        values = {param: [] for param in HOURLY_PARAMS}
+        for response in responses:
+            hourly = response.Hourly()
+            location_times = np.arange(hourly.Time(), hourly.TimeEnd(), hourly.Interval(), dtype=np.int64)
+            lengths.append(len(location_times))
+            times.append(location_times)
+            for index, param in enumerate(HOURLY_PARAMS):
+                values[param].append(hourly.Variables(index).ValuesAsNumpy())
+
+        if not lengths:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), {}
+        # float32 on the wire; rounding restores the API's decimal values
+        return (
+            np.asarray(lengths, dtype=np.int64),
+            np.concatenate(times),
+            {param: np.round(np.concatenate(arrays).astype(np.float64), 2) for param, arrays in values.items()},
+        )
+
+    async def fetch_weather_data_batch(self, kitespots: List[KiteSpot]) -> pd.DataFrame:
+        """
+        Fetch weather data for multiple kitespots using the batch API.
+
+        Spots that fall into the same forecast grid cell are requested once and
+        share the resulting forecast. The request and FlatBuffers decoding run in
+        a worker thread so the event loop stays responsive.
+
+        Returns:
+            Long-format DataFrame with one row per spot and hour: kitespot_id,
+            timestamp and one column per kitespot_weather value column. Empty on
+            failure.
+        """
         try:
-            # Prepare locations as arrays of coordinates
+            # Prepare one location per grid cell
+            cells = group_by_grid_cell(kitespots, self.grid_resolution)
             latitudes = []
             longitudes = []
-            for spot in kitespots:
-                latitudes.append(float(spot.latitude))
-                longitudes.append(float(spot.longitude))
-
-            # Define hourly parameters
-            hourly_params = [
-                "temperature_2m",
-                "relative_humidity_2m",
-                "wind_speed_10m",
-                "wind_direction_10m",
-                "precipitation",
-                "cloud_cover",
-                "visibility"
-            ]
+            for spots in cells.values():
+                latitude, longitude = cell_request_coordinate(spots)
+                latitudes.append(latitude)
+                longitudes.append(longitude)
 
             # Calculate dates
-            today = datetime.now().date()
+            today = datetime.now(timezone.utc).date()
             tomorrow = today + timedelta(days=1)
 
-            # Prepare the request payload
+            # Prepare the request payload; times come back as UTC unix timestamps
             params = {
                 "latitude": ",".join(map(str, latitudes)),
                 "longitude": ",".join(map(str, longitudes)),
-                "hourly": ",".join(hourly_params),
+                "hourly": ",".join(HOURLY_PARAMS),
                 "start_date": today.isoformat(),
                 "end_date": tomorrow.isoformat(),
-                "timezone": "auto"
             }
 
-            self.logger.info(f"Fetching weather data for {len(kitespots)} spots with coordinates: " + 
-                           ", ".join([f"({lat}, {lon})" for lat, lon in zip(latitudes, longitudes)]))
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    "https://api.open-meteo.com/v1/forecast",
-                    params=params
-                ) as response:
-                    if response.status != 200:
-                        error_text = await response.text()
-                        self.logger.error(f"Batch API error: {response.status} - {error_text}")
-                        return {}
-
-                    data = await response.json()
-                    if not data or not isinstance(data, list):
-                        self.logger.error("Invalid response format from batch API")
-                        self.logger.error(f"Response data: {data}")
-                        return {}
-
-                    # Process the response into DataFrames for each kitespot
-                    results = {}
-                    for i, (spot, location_data) in enumerate(zip(kitespots, data)):
-                        try:
-                            if "hourly" not in location_data:
-                                self.logger.error(f"No hourly data for spot {spot.name}")
-                                continue
-
-                            spot_data = {}
-                            timestamps = pd.to_datetime(location_data["hourly"]["time"])
-
-                            for param in hourly_params:
-                                if param in location_data["hourly"]:
-                                    spot_data[param] = location_data["hourly"][param]
-
-                            if spot_data:
-                                spot_data["timestamp"] = timestamps
-                                df = pd.DataFrame(spot_data)
-                                results[spot.id] = df
-                                self.logger.info(f"Successfully processed weather data for {spot.name}")
-                        except Exception as e:
-                            self.logger.error(f"Error processing data for kitespot {spot.name}: {str(e)}")
-                            continue
-
-                    return results
+            self.logger.info(f"Fetching weather data for {len(kitespots)} spots in {len(cells)} grid cells")
+
+            lengths, times, values = await asyncio.to_thread(self._request_forecasts, params)
+            if len(lengths) != len(cells):
+                self.logger.error(f"Expected {len(cells)} locations from batch API, got {len(lengths)}")
+                return pd.DataFrame()
 
+            return build_weather_rows(cells, lengths, times, values)
+
+        except RateLimitExceeded:
+            raise
         except Exception as e:
             self.logger.error(f"Error fetching batch weather data: {str(e)}")
-            return {}
-    
-    async def store_weather_data(self, kitespot_id: int, weather_df: pd.DataFrame):
-        """Store weather data in the database."""
+            return pd.DataFrame()
+
+    async def store_weather_batch(self, rows: pd.DataFrame) -> Dict[str, Any]:
+        """
+        Upsert a whole batch of forecasts in one transaction.
+
+        In rows mode the hours are streamed into a temporary staging table with
+        asyncpg's COPY and merged into kitespot_weather with INSERT ... ON
+        CONFLICT; existing hours are only rewritten when one of their values
+        actually changed. In packed mode every spot's forecast is written as one
+        kitespot_forecast_runs row, only when it differs from the latest run.
+        The golden windows of the spots whose forecast changed are then
+        recomputed and materialized in a savepoint of the same transaction; if
+        that fails the error is logged and the forecasts are still committed.
+
+        Args:
+            rows: Long-format forecast table as returned by fetch_weather_data_batch
+
+        Returns:
+            Dictionary with inserted/updated/unchanged row counts, the number of
+            packed runs written, the ids of the spots whose forecast changed and
+            the throughput
+        """
+        stats = {
+            "spots": 0,
+            "rows": 0,
+            "inserted": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "runs": 0,
+            "golden_windows": 0,
+            "changed_kitespot_ids": [],
+            "seconds": 0.0,
+            "rows_per_second": 0.0,
+        }
+        if rows.empty:
+            return stats
+
+        stats["spots"] = int(rows["kitespot_id"].nunique())
+        started = time.monotonic()
         try:
-            # Ensure timestamps are timezone-aware
-            if weather_df["timestamp"].dt.tz is None:
-                weather_df["timestamp"] = weather_df["timestamp"].dt.tz_localize("UTC")
+            # Ensure timestamps are timezone-aware and columns are in table order
+            if rows["timestamp"].dt.tz is None:
+                rows = rows.assign(timestamp=rows["timestamp"].dt.tz_localize("UTC"))
+            rows = rows.reindex(columns=["kitespot_id", "timestamp"] + _VALUE_COLUMNS)
+            store_rows = self.storage_mode in ("rows", "both")
+            store_packed = self.storage_mode in ("packed", "both")
+            created_at = datetime.now(timezone.utc)
+
+            records = []
+            if store_rows:
+                await ensure_partitions(rows["timestamp"].dt.date.unique())
+                columns = list(rows.columns) + ["created_at"]
+                values = rows.astype(object).where(rows.notna(), None)
+                values["timestamp"] = rows["timestamp"].dt.to_pydatetime()
+                records = [row + (created_at,) for row in values.itertuples(index=False, name=None)]
 
+            written = []
+            changed_ids = []
             async with async_session() as session:
-                # Delete existing weather data for this kitespot and time range
+                if store_rows:
+                    await copy_to_staging(session, STAGING_TABLE, "kitespot_weather", columns, records)
+                    result = await session.execute(text(UPSERT_WEATHER_SQL))
+                    written = result.fetchall()
+                    changed_ids = sorted({row.kitespot_id for row in written})
+
+                if store_packed:
+                    run_ids = await write_forecast_runs(session, rows, created_at)
+                    stats["runs"] = len(run_ids)
+                    if not store_rows:
+                        changed_ids = run_ids
+
+                if changed_ids:
+                    # In a savepoint: a scoring failure must not discard the fresh forecasts
+                    try:
+                        async with session.begin_nested():
+                            stats["golden_windows"] = await write_golden_windows(
+                                session, rows[rows["kitespot_id"].isin(changed_ids)]
+                            )
+                    except Exception as e:
+                        self.logger.error(
+                            f"Error materializing golden windows for kitespots {changed_ids}: {str(e)}", exc_info=True
+                        )
+
                 await session.execute(
-                    text("""
-                        DELETE FROM kitespot_weather 
-                        WHERE kitespot_id = :kitespot_id 
-                        AND timestamp >= :start_time 
-                        AND timestamp < :end_time
-                    """),
+                    text(RECORD_INGEST_SQL),
                     {
-                        "kitespot_id": kitespot_id,
-                        "start_time": weather_df["timestamp"].min().to_pydatetime(),
-                        "end_time": (weather_df["timestamp"].max() + pd.Timedelta(hours=1)).to_pydatetime()
+                        "ingested_at": created_at,
+                        "kitespot_ids": [int(kitespot_id) for kitespot_id in rows["kitespot_id"].unique()],
+                        "changed_ids": changed_ids,
                     }
                 )
 
-                # Insert new weather data
-                for _, row in weather_df.iterrows():
-                    weather = KiteSpotWeather(
-                        kitespot_id=kitespot_id,
-                        timestamp=row["timestamp"].to_pydatetime(),
-                        temperature=row.get("temperature_2m"),
-                        humidity=row.get("relative_humidity_2m"),
-                        precipitation=row.get("precipitation"),
-                        wind_speed_10m=row.get("wind_speed_10m"),
-                        wind_direction_10m=row.get("wind_direction_10m"),
-                        cloud_cover=row.get("cloud_cover"),
-                        visibility=row.get("visibility")
-                    )
-                    session.add(weather)
-
                 await session.commit()
 
+            stats["rows"] = len(rows)
+            stats["inserted"] = sum(1 for row in written if row.inserted)
+            stats["updated"] = len(written) - stats["inserted"]
+            stats["unchanged"] = len(records) - len(written)
+            stats["changed_kitespot_ids"] = changed_ids
+            stats["seconds"] = round(time.monotonic() - started, 3)
+            stats["rows_per_second"] = round(len(rows) / max(stats["seconds"], 1e-3), 1)
+            self.logger.info(
+                f"Stored {stats['rows']} weather rows for {stats['spots']} spots "
+                f"({stats['inserted']} inserted, {stats['updated']} updated, "
+                f"{stats['unchanged']} unchanged, {stats['runs']} packed runs, "
+                f"{stats['golden_windows']} golden windows) in {stats['seconds']}s "
+                f"({stats['rows_per_second']} rows/s)"
+            )
+
         except Exception as e:
-            self.logger.error(f"Error storing weather data for kitespot {kitespot_id}: {str(e)}")
-    
-    async def fetch_and_store_weather_data(self):
-        """Fetch and store weather data for all kitespots."""
+            self.logger.error(
+                f"Error storing weather data for kitespots {rows['kitespot_id'].unique().tolist()}: {str(e)}"
+            )
+
+        return stats
+
+    async def store_weather_data(self, kitespot_id: int, weather_df: pd.DataFrame) -> Dict[str, Any]:
+        """Store weather data for a single kitespot in the database."""
+        rows = weather_df.rename(columns=WEATHER_COLUMNS).assign(kitespot_id=kitespot_id)
+        return await self.store_weather_batch(rows)
+
+    async def _fetch_with_retry(self, batch: List[KiteSpot]) -> pd.DataFrame:
+        """Fetch one batch, waiting on the rate limiter and retrying after 429 responses."""
+        try:
+            # One token per location the batch request will contain
+            cost = len(group_by_grid_cell(batch, self.grid_resolution))
+        except (TypeError, ValueError) as e:
+            self.logger.error(f"Skipping batch of {len(batch)} spots with invalid coordinates: {str(e)}")
+            return pd.DataFrame()
+
+        for attempt in range(1, self.max_attempts + 1):
+            await self.rate_limiter.acquire(cost)
+            try:
+                weather_rows = await self.fetch_weather_data_batch(batch)
+            except RateLimitExceeded as e:
+                self.rate_limiter.penalize(e.retry_after)
+                self.logger.warning(f"{e} (attempt {attempt} of {self.max_attempts})")
+                continue
+            self.rate_limiter.reward()
+            return weather_rows
+
+        self.logger.error(f"Giving up on batch of {len(batch)} spots after {self.max_attempts} attempts")
+        return pd.DataFrame()
+
+    async def _fetch_worker(self, batches: asyncio.Queue, results: asyncio.Queue):
+        """Fetch stage: pull batches until none are left and hand the data to the store stage."""
+        while True:
+            try:
+                batch = batches.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+
+            weather_rows = await self._fetch_with_retry(batch)
+            if not weather_rows.empty:
+                await results.put(weather_rows)
+
+    async def _store_worker(self, results: asyncio.Queue, stats: Dict[str, Any]):
+        """Store stage: write fetched batches while the next ones are still being fetched."""
+        while True:
+            weather_rows = await results.get()
+            if weather_rows is None:
+                return
+
+            batch_stats = await self.store_weather_batch(weather_rows)
+            if batch_stats["rows"]:
+                stats["batches_stored"] += 1
+                stats["spots_stored"] += batch_stats["spots"]
+                for key in ("rows", "inserted", "updated", "unchanged", "runs", "golden_windows"):
+                    stats[key] += batch_stats[key]
+
+    async def fetch_and_store_weather_data(self, kitespots: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """
+        Fetch and store weather data for the given kitespots (default: all kitespots).
+
+        Batches are fetched by up to ``max_concurrency`` workers, paced by the
+        adaptive rate limiter, while a store worker writes finished batches to
+        the database concurrently.
+
+        Returns:
+            Dictionary with run statistics, including how many forecast rows
+            were inserted, updated and left unchanged
+        """
+        stats = {
+            "spots": 0,
+            "grid_cells": 0,
+            "batches": 0,
+            "batches_stored": 0,
+            "spots_stored": 0,
+            "rows": 0,
+            "inserted": 0,
+            "updated": 0,
+            "unchanged": 0,
+            "runs": 0,
+            "golden_windows": 0,
+            "seconds": 0.0,
+        }
+        started = time.monotonic()
         try:
             # Get all kitespots
-            async with async_session() as session:
-                result = await session.execute(text("SELECT * FROM kitespots"))
-                kitespots = result.fetchall()
+            if kitespots is None:
+                async with async_session() as session:
+                    result = await session.execute(text("SELECT * FROM kitespots"))
+                    kitespots = result.fetchall()
 
             self.logger.info(f"Fetching weather data for {len(kitespots)} kitespots")
+            if self.storage_mode in ("rows", "both"):
+                await ensure_upcoming_partitions()
 
-            # Process kitespots in batches of 10 to avoid rate limits
-            batch_size = 10
-            for i in range(0, len(kitespots), batch_size):
-                batch = kitespots[i:i + batch_size]
-                self.logger.info(f"Processing batch {i//batch_size + 1} of {(len(kitespots) + batch_size - 1)//batch_size}")
+            # Spots without usable coordinates would fail every batch they end up in
+            located = [spot for spot in kitespots if has_coordinates(spot)]
+            if len(located) < len(kitespots):
+                skipped = [spot.id for spot in kitespots if not has_coordinates(spot)]
+                self.logger.warning(f"Skipping {len(skipped)} kitespots without valid coordinates: {skipped}")
 
-                # Fetch weather data for the batch
-                weather_data = await self.fetch_weather_data_batch(batch)
+            # Batch by grid cell so each cell is fetched exactly once per run
+            cell_groups = list(group_by_grid_cell(located, self.grid_resolution).values())
+            batches: asyncio.Queue = asyncio.Queue()
+            for i in range(0, len(cell_groups), self.batch_size):
+                batches.put_nowait([spot for group in cell_groups[i:i + self.batch_size] for spot in group])
+            stats["spots"] = len(kitespots)
+            stats["grid_cells"] = len(cell_groups)
+            stats["batches"] = batches.qsize()
 
-                # Store the weather data
-                for kitespot_id, df in weather_data.items():
-                    await self.store_weather_data(kitespot_id, df)
+            # Bounded hand-off queue so fetching cannot run arbitrarily far ahead of storing
+            results: asyncio.Queue = asyncio.Queue(maxsize=self.max_concurrency * 2)
+            store_task = asyncio.create_task(self._store_worker(results, stats))
+            fetch_tasks = [
+                asyncio.create_task(self._fetch_worker(batches, results))
+                for _ in range(min(self.max_concurrency, stats["batches"]))
+            ]
 
-                # Wait for 1 minute between batches to respect rate limits
-                if i + batch_size < len(kitespots):
-                    self.logger.info("Waiting for 1 minute to respect API rate limits...")
-                    await asyncio.sleep(60)
+            try:
+                await asyncio.gather(*fetch_tasks)
+                await results.put(None)
+                await store_task
+            finally:
+                for task in fetch_tasks + [store_task]:
+                    task.cancel()
 
         except Exception as e:
             self.logger.error(f"Error in fetch_and_store_weather_data: {str(e)}")
 
+        stats["seconds"] = round(time.monotonic() - started, 1)
+        self.logger.info(
+            f"Weather refresh finished: {stats['spots_stored']}/{stats['spots']} spots "
+            f"({stats['grid_cells']} grid cells) stored "
+            f"in {stats['batches_stored']}/{stats['batches']} batches, {stats['inserted']} rows inserted, "
+            f"{stats['updated']} updated, {stats['unchanged']} unchanged, "
+            f"{stats['runs']} packed runs, {stats['golden_windows']} golden windows, {stats['seconds']}s"
+        )
+        return stats
+
 # For testing
 async def main():
     service = OpenMeteoWeatherService()
@@ -0,0 +1,131 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# 16 compass sectors of 22.5 degrees, bit i of a mask is the sector centred on i * 22.5 degrees
+SECTOR_COUNT = 16
+SECTOR_DEGREES = 360.0 / SECTOR_COUNT
+ALL_SECTORS = (1 << SECTOR_COUNT) - 1
+
+COMPASS_POINTS = [
+    "N", "NNE", "NE", "ENE", "E", "ESE", "SE", "SSE",
+    "S", "SSW", "SW", "WSW", "W", "WNW", "NW", "NNW",
+]
+POINT_SECTORS = {point: index for index, point in enumerate(COMPASS_POINTS)}
+WORD_POINTS = {"north": "N", "east": "E", "south": "S", "west": "W"}
+
+
+def _range_separators(part: str) -> List[Tuple[int, int]]:
+    """
+    Spans of the range separators in a part: "to", "until", "–" and "-".
+
+    A hyphen directly between two spelled-out points ("north-east") is part
+    of the point's name; any other hyphen ("W-NW", "north-west - north")
+    separates a range.
+    """
+    separators = []
+    for match in re.finditer(r"\s+(?:to|until)\s+|\s*[–-]\s*", part):
+        if match.group() == "-":
+            left = re.search(r"[a-z]+$", part[:match.start()])
+            right = re.match(r"[a-z]+", part[match.end():])
+            if left and right and left.group() in WORD_POINTS and right.group() in WORD_POINTS:
+                continue
+        separators.append(match.span())
+    return separators
+
+
+def _sector(direction: str) -> Optional[int]:
+    """Sector index of one direction: compass point, spelled-out point or degrees; None for ranges."""
+    direction = direction.strip().lower()
+    if not direction or _range_separators(direction):
+        return None
+    if re.fullmatch(r"\d{1,3}(?:\.\d+)?", direction):
+        return int(round(float(direction) / SECTOR_DEGREES)) % SECTOR_COUNT
+    for word, point in WORD_POINTS.items():
+        direction = direction.replace(word, point.lower())
+    return POINT_SECTORS.get(re.sub(r"[^a-z]", "", direction).upper())
+
+
+def _clockwise(first: int, last: int) -> int:
+    mask = 0
+    sector = first
+    while True:
+        mask |= 1 << sector
+        if sector == last:
+            return mask
+        sector = (sector + 1) % SECTOR_COUNT
+
+
+def _range(part: str) -> int:
+    """Mask of a clockwise range ("W to N", "SW-NW", "north-west - north"), 0 if it is none."""
+    separators = _range_separators(part)
+    if len(separators) != 1:
+        return 0
+    first, last = part[:separators[0][0]], part[separators[0][1]:]
+    first_sector, last_sector = _sector(first), _sector(last)
+    if first_sector is None or last_sector is None:
+        return 0
+    return _clockwise(first_sector, last_sector)
+
+
+@lru_cache(maxsize=4096)
+def wind_sector_mask(best_wind_direction: Optional[str]) -> int:
+    """
+    Parses a free-text best wind direction into a 16-bit sector mask.
+
+    Accepts comma, slash, "and" or "or" separated compass points ("SW, W"),
+    spelled-out points ("north-east"), degrees ("225") and clockwise ranges
+    ("SW-NW", "W to N"). Parts that cannot be parsed are ignored.
+
+    Returns:
+        Mask with bit i set when the sector around i * 22.5 degrees is good;
+        0 when nothing could be parsed
+    """
+    if not best_wind_direction:
+        return 0
+    mask = 0
+    for part in re.split(r"\s*(?:,|/|;|&|\band\b|\bor\b)\s*", best_wind_direction.strip().lower()):
+        if not part:
+            continue
+        sector = _sector(part)
+        if sector is not None:
+            mask |= 1 << sector
+            continue
+        mask |= _range(part)
+    return mask
+
+
+def neighbour_mask(mask: int) -> int:
+    """Sectors directly next to the sectors of a mask, excluding the mask itself."""
+    rotated_left = ((mask << 1) | (mask >> (SECTOR_COUNT - 1))) & ALL_SECTORS
+    rotated_right = ((mask >> 1) | (mask << (SECTOR_COUNT - 1))) & ALL_SECTORS
+    return (rotated_left | rotated_right) & ~mask
+
+
+def direction_sectors(wind_direction: np.ndarray) -> np.ndarray:
+    """Sector index (0-15) per wind direction in degrees; -1 where the direction is unknown."""
+    degrees = np.asarray(wind_direction, dtype=np.float64)
+    sectors = np.full(degrees.shape, -1, dtype=np.int16)
+    known = ~np.isnan(degrees)
+    sectors[known] = np.rint(degrees[known] / SECTOR_DEGREES).astype(np.int16) % SECTOR_COUNT
+    return sectors
+
+
+@lru_cache(maxsize=4096)
+def sector_factors(mask: int, neighbour_factor: float, outside_factor: float) -> np.ndarray:
+    """
+    Score factor per sector index for a spot's sector mask.
+
+    Has SECTOR_COUNT + 1 entries so that the unknown sector (-1) indexes the
+    last one, which is 1.0 like every sector of a spot without a mask.
+    """
+    factors = np.ones(SECTOR_COUNT + 1, dtype=np.float64)
+    if mask:
+        neighbours = neighbour_mask(mask)
+        for sector in range(SECTOR_COUNT):
+            if not mask >> sector & 1:
+                factors[sector] = neighbour_factor if neighbours >> sector & 1 else outside_factor
+    factors.flags.writeable = False
+    return factors
@@ -4,6 +4,10 @@ if [ -f weather_service.pid ]; then
     PID=$(cat weather_service.pid)
     echo "Stopping weather service (PID: $PID)..."
     kill $PID
+    # The scheduler lets a running update finish before exiting
+    while kill -0 $PID 2>/dev/null; do
+        sleep 1
+    done
     rm weather_service.pid
     echo "Weather service stopped"
 else
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import numpy as np
+import orjson
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from services.forecast_cache import (
+    CachedForecast,
+    columnar_columns,
+    forecast_validators,
+    forecast_variant,
+    quantize,
+    render_json,
+)
+
+START = datetime(2026, 6, 21, 12, tzinfo=timezone.utc)
+VERSION = datetime(2026, 6, 21, 11, 47, 12, 345000, tzinfo=timezone.utc)
+
+
+def test_validators_change_with_version_start_and_variant():
+    etag, last_modified = forecast_validators(7, 24, VERSION, START)
+    assert etag.startswith('W/"7-24-')
+    assert last_modified == START
+    assert forecast_validators(7, 24, VERSION, START) == (etag, last_modified)
+    assert forecast_validators(7, 24, VERSION + timedelta(minutes=15), START)[0] != etag
+    assert forecast_validators(7, 24, VERSION, START + timedelta(hours=1))[0] != etag
+    assert forecast_validators(7, 24, VERSION, START, variant="columnar")[0] != etag
+    assert forecast_validators(7, 48, VERSION, START)[0] != etag
+
+
+@pytest.mark.parametrize("if_none_match, expected", [
+    ('W/"7-24-1-2"', True),
+    ('"7-24-1-2"', True),
+    ('"other", W/"7-24-1-2"', True),
+    ("*", True),
+    ('W/"7-24-1-3"', False),
+])
+def test_if_none_match(if_none_match, expected):
+    cached = CachedForecast('W/"7-24-1-2"', START, b"[]")
+    assert cached.not_modified(if_none_match, None) is expected
+
+
+def test_if_modified_since_only_without_if_none_match():
+    cached = CachedForecast('W/"7-24-1-2"', START, b"[]")
+    assert cached.not_modified(None, format_datetime(START, usegmt=True))
+    assert not cached.not_modified(None, format_datetime(START - timedelta(seconds=1), usegmt=True))
+    assert not cached.not_modified('W/"other"', format_datetime(START, usegmt=True))
+    assert not cached.not_modified(None, "not a date")
+
+
+@pytest.fixture
+def weather_api(monkeypatch):
+    loads = []
+
+    async def load_forecast_or_none(kitespot_id, start, hours):
+        loads.append(kitespot_id)
+        return [{"timestamp": start.isoformat(), "wind_speed_10m": 30.0}]
+
+    monkeypatch.setattr(main, "load_forecast_or_none", load_forecast_or_none)
+    monkeypatch.setitem(main.ingest_versions._versions, 901, VERSION)
+    main.forecast_cache._entries.clear()
+    return TestClient(main.app), loads
+
+
+def test_matching_if_none_match_returns_304(weather_api):
+    client, loads = weather_api
+    first = client.get("/kitespots/901/weather")
+    assert first.status_code == 200
+    assert first.headers["cache-control"] == "no-cache"
+    etag = first.headers["etag"]
+
+    second = client.get("/kitespots/901/weather", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert loads == [901]
+
+
+def test_new_ingest_changes_the_etag(weather_api, monkeypatch):
+    client, loads = weather_api
+    etag = client.get("/kitespots/901/weather").headers["etag"]
+
+    monkeypatch.setitem(main.ingest_versions._versions, 901, VERSION + timedelta(minutes=15))
+    refreshed = client.get("/kitespots/901/weather", headers={"If-None-Match": etag})
+    assert refreshed.status_code == 200
+    assert refreshed.headers["etag"] != etag
+    assert loads == [901, 901]
+
+
+def round_trip(payload):
+    return orjson.loads(render_json(payload))
+
+
+def test_columnar_round_trip_rounds_per_column_and_nulls_gaps():
+    matrices = {
+        "temperature": np.array([[21.04, np.nan, 19.96]], dtype=np.float32),
+        "humidity": np.array([[54.6, 61.2, np.nan]], dtype=np.float32),
+        "cloud_cover": np.array([[0.0, 12.4, 99.5]], dtype=np.float32),
+        "unknown": np.array([[1.23456, 2.0, np.nan]], dtype=np.float32),
+    }
+
+    columns = round_trip(columnar_columns(matrices, 0, 3))
+
+    assert columns["temperature"] == [21.0, None, 20.0]
+    assert columns["humidity"] == [55, 61, None]
+    assert columns["cloud_cover"] == [0, 12, 100]
+    assert all(type(value) is int for value in columns["cloud_cover"])
+    assert columns["unknown"] == [1.23, 2.0, None]
+
+
+def test_columnar_missing_row_is_all_null():
+    matrices = {"temperature": np.zeros((1, 2)), "humidity": np.zeros((1, 2))}
+
+    assert round_trip(columnar_columns(matrices, None, 2)) == {"temperature": [None, None], "humidity": [None, None]}
+
+
+def test_quantize_whole_numbers_stay_integers():
+    assert quantize(np.array([1.4, 2.6]), 0).dtype == np.int64
+    assert quantize(np.array([1.4, np.nan]), 0) == [1, None]
+
+
+def test_forecast_variant():
+    assert forecast_variant("records") == ""
+    assert forecast_variant("columnar") == "columnar"
+    with pytest.raises(ValueError):
+        forecast_variant("csv")
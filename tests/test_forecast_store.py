@@ -0,0 +1,106 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+from services.forecast_store import PACKED_COLUMNS, RUN_COLUMNS, hour_matrices, pack_forecasts, unpack_run
+
+HOUR = 3600
+START = 1_781_000_000 // HOUR * HOUR
+
+
+def test_hour_matrices_align_on_the_first_hour_with_nan_gaps():
+    aligned = hour_matrices(
+        [7, 3, 7, 3],
+        [START + HOUR, START, START + 3 * HOUR, START + HOUR],
+        {"wind_speed_10m": [10.0, 20.0, None, 21.0]},
+        ["wind_speed_10m", "visibility"],
+    )
+    assert aligned.kitespot_ids.tolist() == [3, 7]
+    assert aligned.starts.tolist() == [START, START]
+    assert aligned.lengths.tolist() == [2, 4]
+    np.testing.assert_array_equal(
+        aligned.matrices["wind_speed_10m"],
+        [[20.0, 21.0, np.nan, np.nan], [np.nan, 10.0, np.nan, np.nan]],
+    )
+    assert np.isnan(aligned.matrices["visibility"]).all()
+
+
+def test_hour_matrices_per_spot_start():
+    aligned = hour_matrices(
+        [1, 1, 2], [START, START + HOUR, START + 5 * HOUR], {"a": [1.0, 2.0, 3.0]}, ["a"], per_spot_start=True
+    )
+    assert aligned.starts.tolist() == [START, START + 5 * HOUR]
+    assert aligned.lengths.tolist() == [2, 1]
+    np.testing.assert_array_equal(aligned.matrices["a"], [[1.0, 2.0], [3.0, np.nan]])
+
+
+def test_hour_matrices_drop_values_off_a_fixed_window():
+    aligned = hour_matrices(
+        [1, 1, 1, 1],
+        [START - HOUR, START, START + 2 * HOUR, START + 3 * HOUR],
+        {"a": np.array([0.0, 1.0, 3.0, 4.0])},
+        ["a"],
+        start=START,
+        hours=3,
+    )
+    assert aligned.lengths.tolist() == [3]
+    np.testing.assert_array_equal(aligned.matrices["a"], [[1.0, np.nan, 3.0]])
+
+
+def test_hour_matrices_of_nothing():
+    aligned = hour_matrices([], [], {"a": []}, ["a"], start=START, hours=4)
+    assert aligned.kitespot_ids.tolist() == []
+    assert aligned.matrices["a"].shape == (0, 4)
+
+
+def forecast_rows(records):
+    rows = pd.DataFrame(records, columns=["kitespot_id", "hour", "wind_speed_10m", "temperature"])
+    rows["timestamp"] = pd.to_datetime(START + rows.pop("hour") * HOUR, unit="s", utc=True)
+    return rows
+
+
+def test_pack_forecasts_lays_every_spot_on_its_own_hour_grid():
+    issued_at = datetime(2026, 6, 9, tzinfo=timezone.utc)
+    rows = forecast_rows([
+        (2, 4, 30.0, 14.0),
+        (1, 1, 10.0, np.nan),
+        (2, 2, 20.0, 12.0),
+        (1, 0, 5.0, 15.0),
+        (1, 3, 15.0, 16.0),
+    ])
+    records = pack_forecasts(rows, issued_at)
+    runs = {record[0]: dict(zip(RUN_COLUMNS, record)) for record in records}
+
+    assert sorted(runs) == [1, 2]
+    first, second = runs[1], runs[2]
+    assert first["issued_at"] == issued_at
+    assert first["start_time"] == datetime.fromtimestamp(START, tz=timezone.utc)
+    assert first["step_seconds"] == HOUR
+    assert first["hours"] == 4
+    np.testing.assert_array_equal(first["wind_speed_10m"], [5.0, 10.0, np.nan, 15.0])
+    np.testing.assert_array_equal(first["temperature"], [15.0, np.nan, np.nan, 16.0])
+
+    assert second["start_time"] == datetime.fromtimestamp(START + 2 * HOUR, tz=timezone.utc)
+    assert second["hours"] == 3
+    np.testing.assert_array_equal(second["wind_speed_10m"], [20.0, np.nan, 30.0])
+
+
+def test_pack_forecasts_fills_columns_missing_from_the_input():
+    records = pack_forecasts(forecast_rows([(1, 0, 5.0, 15.0)]), datetime.now(timezone.utc))
+    run = dict(zip(RUN_COLUMNS, records[0]))
+    assert set(PACKED_COLUMNS) <= set(run)
+    assert np.isnan(run["visibility"]).all()
+
+
+def test_packed_runs_unpack_to_the_same_hours():
+    rows = forecast_rows([(1, 0, 5.0, 15.0), (1, 2, 7.5, 13.0)])
+    run = SimpleNamespace(**dict(zip(RUN_COLUMNS, pack_forecasts(rows, datetime.now(timezone.utc))[0])))
+    arrays = unpack_run(run, since=datetime.fromtimestamp(START + HOUR, tz=timezone.utc))
+    assert arrays["timestamp"].astype(np.int64).tolist() == [START + HOUR, START + 2 * HOUR]
+    np.testing.assert_array_equal(arrays["wind_speed_10m"], [np.nan, 7.5])
+
+
+def test_pack_forecasts_of_nothing():
+    assert pack_forecasts(pd.DataFrame(), datetime.now(timezone.utc)) == []
@@ -0,0 +1,40 @@
+import numpy as np
+
+from services.kitewindow import (
+    GOLDEN_SCORE_THRESHOLD,
+    best_windows,
+    get_kite_size_recommendation,
+    kite_size_matrix,
+    score_hours,
+)
+
+
+def test_workable_band_is_golden_with_unknown_gusts():
+    # 12-15 knots scores 60, halved by the 5 knot gust spread assumed when gusts are unknown
+    scores = score_hours(np.array([5.0, 13.0, 14.0, 13.0, 5.0]))
+    assert scores[1] >= GOLDEN_SCORE_THRESHOLD
+
+    windows = best_windows(scores)
+    assert windows.start[0] == 1
+    assert windows.duration[0] == 3
+
+
+def test_very_strong_wind_with_unknown_gusts_is_not_golden():
+    windows = best_windows(score_hours(np.array([28.0, 28.0])))
+    assert windows.start[0] == -1
+
+
+def test_kite_size_matrix_marks_hours_without_wind():
+    sizes = kite_size_matrix(np.array([18.0, np.nan]), np.array([60.0, 90.0]), wind_gust=np.array([20.0, np.nan]))
+    assert sizes["recommended"].shape == (2, 2)
+    assert not np.isnan(sizes["recommended"][:, 0]).any()
+    assert np.isnan(sizes["recommended"][:, 1]).all()
+    assert sizes["unknown"].tolist() == [False, True]
+
+
+def test_kite_size_matrix_matches_single_recommendation():
+    wind = np.arange(0.0, 40.0, 0.5)
+    sizes = kite_size_matrix(wind, np.array([75.0, 90.0]))
+    for hour, speed in enumerate(wind):
+        recommendation = get_kite_size_recommendation(float(speed), 90.0)
+        assert sizes["recommended"][1, hour] == recommendation["recommended_size"]
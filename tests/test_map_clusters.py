@@ -0,0 +1,45 @@
+from services.map_clusters import MapClusters
+
+
+def test_representatives_are_the_spots_closest_to_the_centroid():
+    clusters = MapClusters(max_zoom=2)
+    # Four spots around (52.0, 5.0) and one far off in the same zoom 0 cell
+    clusters.build([
+        {"id": 1, "latitude": 60.0, "longitude": 30.0},
+        {"id": 7, "latitude": 52.0, "longitude": 5.1},
+        {"id": 8, "latitude": 52.1, "longitude": 5.0},
+        {"id": 9, "latitude": 51.9, "longitude": 4.9},
+        {"id": 10, "latitude": 52.0, "longitude": 5.0},
+    ])
+    [cluster] = clusters.query(-180.0, -85.0, 180.0, 85.0, 0)
+    assert cluster["count"] == 5
+    assert sorted(cluster["kitespot_ids"]) == [7, 8, 10]
+
+
+def test_representatives_follow_moves_and_removals():
+    clusters = MapClusters(max_zoom=0)
+    clusters.build([{"id": index, "latitude": 10.0, "longitude": 10.0 + index} for index in range(1, 6)])
+    clusters.remove(3)
+    clusters.upsert(5, 10.0, 12.0)
+    [cluster] = clusters.query(-180.0, -85.0, 180.0, 85.0, 0)
+    assert cluster["count"] == 4
+    # Centroid at longitude 12.25: spots 2 and 5 at 12, then 1 at 11 before 4 at 14
+    assert sorted(cluster["kitespot_ids"]) == [1, 2, 5]
+
+
+def test_bbox_across_the_antimeridian():
+    clusters = MapClusters(max_zoom=6)
+    clusters.build([
+        {"id": 1, "latitude": -17.0, "longitude": 179.5},
+        {"id": 2, "latitude": -17.0, "longitude": -179.5},
+        {"id": 3, "latitude": -17.0, "longitude": 170.0},
+        {"id": 4, "latitude": -17.0, "longitude": 0.0},
+    ])
+
+    found = clusters.query(178.0, -20.0, -178.0, -15.0, 6)
+    assert sorted(spot_id for cluster in found for spot_id in cluster["kitespot_ids"]) == [1, 2]
+    assert all(cluster["count"] == 1 for cluster in found)
+
+    # The same box without the wrap spans the rest of the world instead
+    found = clusters.query(-178.0, -20.0, 178.0, -15.0, 6)
+    assert sorted(spot_id for cluster in found for spot_id in cluster["kitespot_ids"]) == [3, 4]
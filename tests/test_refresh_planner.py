@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from services.refresh_planner import HOT_WINDOW_SCORE, WARM_WINDOW_SCORE, RefreshPlanner, assign_tier
+
+NOW = datetime(2026, 6, 21, 12, 30, tzinfo=timezone.utc)
+
+
+def test_good_hour_soon_makes_a_spot_hot():
+    assert assign_tier(0, None, HOT_WINDOW_SCORE, HOT_WINDOW_SCORE, NOW) == "hot"
+
+
+def test_workable_hour_today_makes_a_spot_warm():
+    assert assign_tier(0, None, WARM_WINDOW_SCORE, WARM_WINDOW_SCORE, NOW) == "warm"
+    assert assign_tier(0, None, None, HOT_WINDOW_SCORE, NOW) == "warm"
+
+
+def test_spot_without_attention_or_golden_hours_is_cold():
+    assert assign_tier(0, None, None, None, NOW) == "cold"
+    assert assign_tier(0, NOW - timedelta(days=5), 10.0, 20.0, NOW) == "cold"
+
+
+def test_favorites_and_reads_still_count():
+    assert assign_tier(5, None, None, None, NOW) == "hot"
+    assert assign_tier(0, NOW - timedelta(hours=2), None, None, NOW) == "hot"
+    assert assign_tier(1, None, None, None, NOW) == "warm"
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetchall(self):
+        return self.rows
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, statement, params=None):
+        return FakeResult(self.rows)
+
+
+def spot(kitespot_id, last_ingested_at, hot_window_score=None, warm_window_score=None, favorites=0):
+    return SimpleNamespace(
+        id=kitespot_id,
+        favorites=favorites,
+        last_read_at=None,
+        last_ingested_at=last_ingested_at,
+        hot_window_score=hot_window_score,
+        warm_window_score=warm_window_score,
+    )
+
+
+def test_hot_tier_is_capped_stalest_first():
+    spots = [
+        spot(1, NOW - timedelta(minutes=20), 80, 80),
+        spot(2, None, 80, 80),
+        spot(3, NOW - timedelta(hours=2), 80, 80),
+        spot(4, NOW - timedelta(minutes=5), 80, 80),
+        spot(5, NOW - timedelta(hours=5)),
+    ]
+    due = asyncio.run(RefreshPlanner(hot_budget=2).due_spots(FakeSession(spots), NOW))
+    assert [due_spot.id for due_spot in due] == [2, 3, 5]
+
+
+def test_tick_interval_is_the_shortest_tier():
+    assert RefreshPlanner().tick_interval == timedelta(minutes=15)
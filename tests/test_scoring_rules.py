@@ -0,0 +1,65 @@
+import json
+
+import numpy as np
+import pytest
+
+from services.scoring_rules import load_scoring_rules, scoring_evaluator
+from services.wind_sectors import wind_sector_mask
+
+
+def write_rules(tmp_path, rules):
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(rules))
+    return str(path)
+
+
+def test_default_rules_score_like_before():
+    wind = np.array([10.0, 13.0, 17.0, 22.0, 27.0, 32.0])
+    scores = scoring_evaluator()(wind, wind_gust=wind)
+    assert scores.tolist() == [0.0, 60.0, 100.0, 80.0, 40.0, 0.0]
+
+
+def test_file_overrides_are_merged(tmp_path):
+    rules = load_scoring_rules(write_rules(tmp_path, {
+        "default": {"night_factor": 0.5},
+        "difficulty": {"Expert": {"gust_spread_scale": 14}},
+    }))
+    assert rules["default"]["night_factor"] == 0.5
+    assert rules["default"]["gust_spread_scale"] == 10.0
+    assert rules["difficulty"]["expert"] == {"gust_spread_scale": 14}
+    assert "beginner" in rules["difficulty"]
+
+
+@pytest.mark.parametrize("rules", [
+    {"default": {"night_factr": 0.5}},
+    {"default": {"gust_spread_scale": 0}},
+    {"default": {"wind_bands": [{"min": 12, "max": 15}]}},
+    {"difficulty": {"expert": {"wind_bands": [{"min": 30, "max": 20, "score": 40}]}}},
+    {"water_type": {"flat": {"night_factor": "low"}}},
+    {"default": {"night_factor": -0.5}},
+    {"default": {"direction_outside_factor": 1.5}},
+    {"default": {"gust_spread_default": -1}},
+    {"default": {"wind_bands": {"min": 12, "max": 15, "score": 60}}},
+    {"default": {"wind_bands": [[12, 15, 60]]}},
+    {"default": {"wind_bands": [{"min": 12, "max": 15, "score": "high"}]}},
+    {"default": {"wind_bands": [{"min": "12", "max": 15, "score": 60}]}},
+    {"default": {"wind_bands": [{"min": 12, "max": 15, "score": True}]}},
+    {"default": {"wind_bands": [{"min": 12, "max": 15, "score": -10}]}},
+    {"rider": {}},
+])
+def test_invalid_rules_fail_on_load(tmp_path, rules):
+    with pytest.raises(ValueError):
+        load_scoring_rules(write_rules(tmp_path, rules))
+
+
+def test_wind_direction_rules_are_keyed_by_sector(tmp_path):
+    rules = load_scoring_rules(write_rules(tmp_path, {
+        "wind_direction": {"south-west": {"night_factor": 0.4}},
+    }))
+    assert list(rules["wind_direction"]) == [wind_sector_mask("SW")]
+    assert wind_sector_mask("225") in rules["wind_direction"]
+
+
+def test_unparseable_wind_direction_key_fails_on_load(tmp_path):
+    with pytest.raises(ValueError):
+        load_scoring_rules(write_rules(tmp_path, {"wind_direction": {"onshore": {"night_factor": 0.4}}}))
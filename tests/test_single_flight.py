@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_callers_share_one_load():
+    async def scenario():
+        flight = SingleFlight("test")
+        loads = []
+
+        async def load():
+            loads.append(1)
+            await asyncio.sleep(0.01)
+            return {"hours": 24}
+
+        results = await asyncio.gather(*(flight.do("spot-1", load) for _ in range(5)))
+        return flight, loads, results
+
+    flight, loads, results = asyncio.run(scenario())
+    assert len(loads) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats()["executed"] == 1
+    assert flight.stats()["coalesced"] == 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_keys_load_separately_and_finished_keys_load_again():
+    async def scenario():
+        flight = SingleFlight("test")
+        loads = []
+
+        async def load(key):
+            loads.append(key)
+            await asyncio.sleep(0.01)
+            return key
+
+        await asyncio.gather(flight.do("a", lambda: load("a")), flight.do("b", lambda: load("b")))
+        await flight.do("a", lambda: load("a"))
+        return loads
+
+    assert asyncio.run(scenario()) == ["a", "b", "a"]
+
+
+def test_failures_are_shared_and_not_cached():
+    async def scenario():
+        flight = SingleFlight("test")
+        calls = []
+
+        async def load():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            raise RuntimeError("database down")
+
+        results = await asyncio.gather(flight.do("k", load), flight.do("k", load), return_exceptions=True)
+        with pytest.raises(RuntimeError):
+            await flight.do("k", load)
+        return flight, calls, results
+
+    flight, calls, results = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(calls) == 2
+    assert flight.stats()["failed"] == 2
+
+
+def test_a_cancelled_caller_does_not_cancel_the_shared_load():
+    async def scenario():
+        flight = SingleFlight("test")
+
+        async def load():
+            await asyncio.sleep(0.02)
+            return "done"
+
+        first = asyncio.create_task(flight.do("k", load))
+        second = asyncio.create_task(flight.do("k", load))
+        await asyncio.sleep(0.005)
+        first.cancel()
+        return await second, first.cancelled()
+
+    assert asyncio.run(scenario()) == ("done", True)
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from services.solar import SECONDS_PER_DAY, DaylightTable, is_day, sun_times
+
+# Published times are rounded to the minute; the NOAA equations are within about a minute
+TOLERANCE_SECONDS = 3 * 60
+
+
+def utc_seconds(timestamp: str) -> float:
+    return float(np.datetime64(timestamp, "s").astype(np.int64))
+
+
+def spot_sun_times(latitude: float, longitude: float, day: str):
+    sunrise, sunset = sun_times(np.array([latitude]), np.array([longitude]), np.array([day], dtype="datetime64[D]"))
+    return sunrise[0, 0], sunset[0, 0]
+
+
+@pytest.mark.parametrize(
+    "latitude, longitude, day, sunrise, sunset",
+    [
+        # London, midsummer and midwinter
+        (51.5074, -0.1278, "2026-06-21", "2026-06-21T03:43", "2026-06-21T20:21"),
+        (51.5074, -0.1278, "2026-12-21", "2026-12-21T08:04", "2026-12-21T15:53"),
+        # Sydney: the sun rises on the previous UTC day
+        (-33.8688, 151.2093, "2026-06-21", "2026-06-20T21:00", "2026-06-21T06:54"),
+        (-33.8688, 151.2093, "2026-12-21", "2026-12-20T18:41", "2026-12-21T09:05"),
+        # Honolulu: the sun sets on the next UTC day
+        (21.3069, -157.8583, "2026-06-21", "2026-06-21T15:50", "2026-06-22T05:16"),
+    ],
+)
+def test_sun_times(latitude, longitude, day, sunrise, sunset):
+    computed_sunrise, computed_sunset = spot_sun_times(latitude, longitude, day)
+    assert computed_sunrise == pytest.approx(utc_seconds(sunrise), abs=TOLERANCE_SECONDS)
+    assert computed_sunset == pytest.approx(utc_seconds(sunset), abs=TOLERANCE_SECONDS)
+
+
+def test_midnight_sun_is_a_day_around_solar_noon():
+    sunrise, sunset = spot_sun_times(69.6492, 18.9553, "2026-06-21")
+    assert sunset - sunrise == SECONDS_PER_DAY
+    assert (sunrise + sunset) / 2 == pytest.approx(utc_seconds("2026-06-21T10:46"), abs=TOLERANCE_SECONDS)
+
+
+def test_polar_night_has_no_daylight():
+    sunrise, sunset = spot_sun_times(69.6492, 18.9553, "2026-12-21")
+    assert sunrise == sunset
+    assert sunrise == pytest.approx(utc_seconds("2026-12-21T10:42"), abs=TOLERANCE_SECONDS)
+
+
+def daylight_table(kitespot_ids, latitudes, longitudes, first_day: str, days: int) -> DaylightTable:
+    day_range = np.arange(np.datetime64(first_day), np.datetime64(first_day) + days)
+    sunrise, sunset = sun_times(np.array(latitudes), np.array(longitudes), day_range)
+    return DaylightTable(np.array(kitespot_ids), int(day_range[0].astype(np.int64)), sunrise, sunset)
+
+
+def test_is_day_checks_the_neighbouring_utc_days():
+    # Honolulu (1) is still light after UTC midnight, Sydney (2) is light before it
+    table = daylight_table([1, 2], [21.3069, -33.8688], [-157.8583, 151.2093], "2026-06-20", 3)
+    hours = np.array(
+        [
+            [utc_seconds("2026-06-21T04:00"), utc_seconds("2026-06-21T10:00"), utc_seconds("2026-06-21T20:00")],
+            [utc_seconds("2026-06-20T22:00"), utc_seconds("2026-06-21T04:00"), utc_seconds("2026-06-21T10:00")],
+        ]
+    )
+    expected = np.array([[1.0, 0.0, 1.0], [1.0, 1.0, 0.0]])
+    np.testing.assert_array_equal(is_day(table, np.array([1, 2]), hours), expected)
+
+
+def test_is_day_is_unknown_without_daylight():
+    table = daylight_table([1], [51.5074], [-0.1278], "2026-06-21", 1)
+    hours = np.array(
+        [
+            [utc_seconds("2026-06-21T12:00"), utc_seconds("2026-06-25T12:00")],
+            [utc_seconds("2026-06-21T12:00"), utc_seconds("2026-06-21T23:00")],
+        ]
+    )
+    result = is_day(table, np.array([1, 99]), hours)
+    assert result[0, 0] == 1.0
+    assert np.isnan(result[0, 1])
+    assert np.isnan(result[1]).all()
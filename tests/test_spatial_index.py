@@ -0,0 +1,126 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+import services.spatial_index as spatial_index_module
+from services.spatial_index import SpatialIndex
+
+UPDATED = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+
+def test_longitudes_wrap_into_range():
+    index = SpatialIndex()
+    index.upsert(1, 10.0, 190.0)
+    assert index.get(1)["longitude"] == -170.0
+    assert [spot["id"] for spot in index.nearby(10.0, -170.0, 10)] == [1]
+
+
+def test_query_across_the_antimeridian():
+    index = SpatialIndex()
+    index.upsert(1, -17.0, 179.9)   # Fiji, west of the antimeridian
+    index.upsert(2, -17.0, -179.9)  # and just east of it
+    index.upsert(3, -17.0, 170.0)
+
+    found = index.nearby(-17.0, -179.95, 50)
+    assert [spot["id"] for spot in found] == [2, 1]
+    assert found[1]["distance_km"] == pytest.approx(15.9, abs=0.2)
+
+
+def test_polar_query_scans_every_column():
+    index = SpatialIndex()
+    index.upsert(1, 89.6, 179.0)
+    index.upsert(2, 89.6, 0.0)
+    index.upsert(3, 80.0, 0.0)
+
+    assert len({column for _, column in index._candidate_cells(89.5, 0.0, 120)}) == index.columns
+    assert sorted(spot["id"] for spot in index.nearby(89.5, 0.0, 120)) == [1, 2]
+
+
+def test_nearby_is_closest_first_and_limited():
+    index = SpatialIndex()
+    for kitespot_id, longitude in enumerate([4.9, 5.0, 5.3, 6.5], start=1):
+        index.upsert(kitespot_id, 52.0, longitude)
+    assert [spot["id"] for spot in index.nearby(52.0, 4.95, 60, limit=2)] in ([1, 2], [2, 1])
+    assert [spot["id"] for spot in index.nearby(52.0, 5.35, 30)] == [3, 2]
+
+
+class FakeKitespots:
+    """kitespots table answering the index's queries."""
+
+    def __init__(self, rows):
+        self.rows = {row.id: row for row in rows}
+
+    def session(self):
+        return FakeSession(self)
+
+
+class FakeResult:
+    def __init__(self, rows=None, scalar=None):
+        self._rows = rows or []
+        self._scalar = scalar
+
+    def fetchall(self):
+        return self._rows
+
+    def scalar(self):
+        return self._scalar
+
+
+class FakeSession:
+    def __init__(self, table):
+        self.table = table
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement, params=None):
+        sql = str(statement)
+        rows = list(self.table.rows.values())
+        if "COUNT(*)" in sql:
+            return FakeResult(scalar=len(rows))
+        if params and "since" in params:
+            rows = [row for row in rows if row.updated_at >= params["since"]]
+        return FakeResult(rows)
+
+
+def row(kitespot_id, latitude, longitude, updated_at=UPDATED):
+    return SimpleNamespace(
+        id=kitespot_id, name=f"Spot {kitespot_id}", country="NL",
+        latitude=latitude, longitude=longitude, updated_at=updated_at,
+    )
+
+
+@pytest.fixture
+def kitespots(monkeypatch):
+    table = FakeKitespots([row(1, 52.0, 4.9), row(2, 52.1, 4.3)])
+    monkeypatch.setattr(spatial_index_module, "async_session", table.session)
+    return table
+
+
+def test_refresh_applies_added_and_moved_spots(kitespots):
+    index = SpatialIndex()
+    assert asyncio.run(index.refresh()) == ([1, 2], [])
+
+    later = UPDATED + timedelta(hours=1)
+    kitespots.rows[2] = row(2, 36.0, -5.6, later)
+    kitespots.rows[3] = row(3, 36.1, -5.7, later)
+    changed, removed = asyncio.run(index.refresh())
+    assert sorted(changed) == [2, 3]
+    assert removed == []
+    assert sorted(spot["id"] for spot in index.nearby(36.0, -5.6, 50)) == [2, 3]
+    assert asyncio.run(index.refresh()) == ([], [])
+
+
+def test_refresh_detects_deleted_spots(kitespots):
+    index = SpatialIndex()
+    asyncio.run(index.load())
+
+    del kitespots.rows[1]
+    assert asyncio.run(index.refresh()) == ([], [1])
+    assert index.get(1) is None
+    assert index.nearby(52.0, 4.9, 10) == []
@@ -0,0 +1,182 @@
+import asyncio
+from types import SimpleNamespace
+
+import flatbuffers
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+from services.rate_limiter import RateLimitExceeded
+from services.weather_service import (
+    HOURLY_PARAMS,
+    WEATHER_COLUMNS,
+    OpenMeteoWeatherService,
+    build_weather_rows,
+    cell_request_coordinate,
+    grid_cell,
+    group_by_grid_cell,
+)
+
+HOUR = 3600
+START = 1_781_000_000 // HOUR * HOUR
+
+
+def forecast_message(time, variables):
+    """One length-prefixed location of an Open-Meteo FlatBuffers body with hourly variables."""
+    builder = flatbuffers.Builder(1024)
+    variable_offsets = []
+    for values in variables:
+        values_offset = builder.CreateNumpyVector(np.asarray(values, dtype=np.float32))
+        builder.StartObject(14)
+        builder.PrependUOffsetTRelativeSlot(3, values_offset, 0)  # VariableWithValues.values
+        variable_offsets.append(builder.EndObject())
+    builder.StartVector(4, len(variable_offsets), 4)
+    for offset in reversed(variable_offsets):
+        builder.PrependUOffsetTRelative(offset)
+    variables_vector = builder.EndVector()
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, time, 0)  # VariablesWithTime.time
+    builder.PrependInt64Slot(1, time + HOUR * len(variables[0]), 0)  # time_end
+    builder.PrependInt32Slot(2, HOUR, 0)  # interval
+    builder.PrependUOffsetTRelativeSlot(3, variables_vector, 0)  # variables
+    hourly = builder.EndObject()
+    builder.StartObject(15)
+    builder.PrependUOffsetTRelativeSlot(11, hourly, 0)  # WeatherApiResponse.hourly
+    builder.Finish(builder.EndObject())
+    message = bytes(builder.Output())
+    return len(message).to_bytes(4, "little") + message
+
+
+class FakeResponse:
+    def __init__(self, status_code=200, content=b"", headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.text = content.decode("utf-8", "replace")
+        self.headers = headers or {}
+
+
+class FakeSession:
+    def __init__(self, response):
+        self.response = response
+        self.params = None
+
+    def get(self, url, params=None):
+        self.params = params
+        return self.response
+
+
+def service_answering(response):
+    service = OpenMeteoWeatherService()
+    service.session = FakeSession(response)
+    return service
+
+
+def test_rate_limit_reads_retry_after():
+    service = service_answering(FakeResponse(429, b'{"reason": "Too many requests"}', {"Retry-After": "30"}))
+    with pytest.raises(RateLimitExceeded) as error:
+        service._request_forecasts({})
+    assert error.value.retry_after == 30.0
+
+
+def test_rate_limit_without_retry_after():
+    service = service_answering(FakeResponse(429, b"{}"))
+    with pytest.raises(RateLimitExceeded) as error:
+        service._request_forecasts({})
+    assert error.value.retry_after is None
+
+
+def test_other_errors_mentioning_limit_are_not_rate_limits():
+    service = service_answering(FakeResponse(400, b'{"reason": "Parameter limit exceeded"}'))
+    with pytest.raises(requests.HTTPError):
+        service._request_forecasts({})
+
+
+def test_forecasts_are_decoded_per_location():
+    variables = [np.arange(3) + index for index in range(len(HOURLY_PARAMS))]
+    body = forecast_message(START, variables) + forecast_message(START + HOUR, [values * 2 for values in variables])
+    service = service_answering(FakeResponse(200, body))
+
+    lengths, times, values = service._request_forecasts({"latitude": "1,2"})
+    assert service.session.params["format"] == "flatbuffers"
+    assert lengths.tolist() == [3, 3]
+    assert times.tolist() == [START, START + HOUR, START + 2 * HOUR, START + HOUR, START + 2 * HOUR, START + 3 * HOUR]
+    assert values[HOURLY_PARAMS[1]].tolist() == [1.0, 2.0, 3.0, 2.0, 4.0, 6.0]
+
+
+def spot(kitespot_id, latitude, longitude):
+    return SimpleNamespace(id=kitespot_id, latitude=latitude, longitude=longitude)
+
+
+def test_batch_with_invalid_coordinates_fails_alone():
+    service = OpenMeteoWeatherService(grid_resolution=0.1)
+    assert asyncio.run(service._fetch_with_retry([spot(1, 36.0, -5.6), spot(2, None, None)])).empty
+
+
+def test_run_skips_spots_without_coordinates():
+    service = OpenMeteoWeatherService(batch_size=1, max_concurrency=1, grid_resolution=0.1, storage_mode="packed")
+    fetched = []
+
+    async def fetch(batch):
+        fetched.append([kitespot.id for kitespot in batch])
+        return pd.DataFrame()
+
+    service.fetch_weather_data_batch = fetch
+    spots = [spot(1, 36.0, -5.6), spot(2, None, 4.9), spot(3, "n/a", 4.9), spot(4, 52.4, 4.9)]
+    stats = asyncio.run(service.fetch_and_store_weather_data(spots))
+    assert fetched == [[1], [4]]
+    assert stats["batches"] == 2
+
+
+def test_spots_in_one_grid_cell_share_a_request():
+    spots = [spot(1, 36.01, -5.60), spot(2, 36.03, -5.62), spot(3, 36.30, -5.60)]
+    cells = group_by_grid_cell(spots, 0.1)
+    assert [[kitespot.id for kitespot in cell] for cell in cells.values()] == [[1, 2], [3]]
+    # Resolution 0: every distinct coordinate is its own cell
+    assert list(group_by_grid_cell(spots, 0)) == [(36.01, -5.6), (36.03, -5.62), (36.3, -5.6)]
+
+
+def test_grid_cells_wrap_at_the_antimeridian():
+    assert grid_cell(-17.0, 179.99, 0.1) == grid_cell(-17.0, -179.99, 0.1)
+    assert grid_cell(10.0, 190.0, 0.1) == grid_cell(10.0, -170.0, 0.1)
+
+
+def test_cell_is_requested_at_its_most_central_spot():
+    spots = [spot(1, 36.00, -5.64), spot(2, 36.02, -5.61), spot(3, 36.04, -5.56)]
+    assert cell_request_coordinate(spots) == (36.02, -5.61)
+
+    # Across the antimeridian the median must not land on the other side of the world
+    spots = [spot(1, -17.0, 179.98), spot(2, -17.01, -179.99), spot(3, -17.02, -179.97)]
+    assert cell_request_coordinate(spots) == (-17.01, -179.99)
+
+
+def test_weather_rows_fan_each_cell_out_to_its_spots():
+    cells = {(0, 0): [spot(1, 0.0, 0.0), spot(2, 0.0, 0.0)], (0, 1): [spot(3, 0.0, 0.1)]}
+    lengths = np.array([2, 3])
+    times = np.array([START, START + HOUR, START, START + HOUR, START + 2 * HOUR])
+    values = {
+        "wind_speed_10m": np.array([10.0, 11.0, 20.0, 21.0, 22.0]),
+        "temperature_2m": np.array([15.0, np.nan, 16.0, 17.0, 18.0]),
+    }
+
+    rows = build_weather_rows(cells, lengths, times, values)
+    assert list(rows.columns) == ["kitespot_id", "timestamp"] + list(WEATHER_COLUMNS.values())
+    assert rows["kitespot_id"].tolist() == [1, 1, 2, 2, 3, 3, 3]
+    assert rows["timestamp"].dt.tz_convert(None).to_numpy(dtype="datetime64[s]").astype(np.int64).tolist() == [
+        START, START + HOUR, START, START + HOUR, START, START + HOUR, START + 2 * HOUR
+    ]
+    assert str(rows["timestamp"].dt.tz) == "UTC"
+    assert rows["wind_speed_10m"].tolist() == [10.0, 11.0, 10.0, 11.0, 20.0, 21.0, 22.0]
+    np.testing.assert_array_equal(rows["temperature"], [15.0, np.nan, 15.0, np.nan, 16.0, 17.0, 18.0])
+    # Variables missing from the response become NaN columns
+    assert rows["visibility"].isna().all()
+
+
+def test_forecast_response_to_rows():
+    variables = [np.array([1.0, 2.0]) + index for index in range(len(HOURLY_PARAMS))]
+    service = service_answering(FakeResponse(200, forecast_message(START, variables)))
+    cells = {(0, 0): [spot(5, 0.0, 0.0), spot(6, 0.0, 0.0)]}
+
+    rows = build_weather_rows(cells, *service._request_forecasts({}))
+    assert rows["kitespot_id"].tolist() == [5, 5, 6, 6]
+    assert rows[WEATHER_COLUMNS[HOURLY_PARAMS[2]]].tolist() == [3.0, 4.0, 3.0, 4.0]
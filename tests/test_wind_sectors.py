@@ -0,0 +1,61 @@
+import pytest
+
+from services.wind_sectors import POINT_SECTORS, wind_sector_mask
+
+
+def sectors(*points):
+    mask = 0
+    for point in points:
+        mask |= 1 << POINT_SECTORS[point]
+    return mask
+
+
+@pytest.mark.parametrize(
+    "direction, points",
+    [
+        ("SW", ["SW"]),
+        ("nnw", ["NNW"]),
+        ("SW, W", ["SW", "W"]),
+        ("NE/E", ["NE", "E"]),
+        ("North West and West", ["NW", "W"]),
+        ("north-east", ["NE"]),
+        ("north-north-east", ["NNE"]),
+        ("225", ["SW"]),
+        ("0", ["N"]),
+        ("350", ["N"]),
+    ],
+)
+def test_single_directions(direction, points):
+    assert wind_sector_mask(direction) == sectors(*points)
+
+
+@pytest.mark.parametrize(
+    "direction, points",
+    [
+        ("W to N", ["W", "WNW", "NW", "NNW", "N"]),
+        ("SW-NW", ["SW", "WSW", "W", "WNW", "NW"]),
+        ("NW until NE", ["NW", "NNW", "N", "NNE", "NE"]),
+        ("north-west - north", ["NW", "NNW", "N"]),
+        ("W–NW", ["W", "WNW", "NW"]),
+    ],
+)
+def test_ranges(direction, points):
+    assert wind_sector_mask(direction) == sectors(*points)
+
+
+@pytest.mark.parametrize(
+    "direction, points",
+    [
+        ("W-NW", ["W", "WNW", "NW"]),
+        ("N-NE", ["N", "NNE", "NE"]),
+        ("S-SW", ["S", "SSW", "SW"]),
+        ("E - SE", ["E", "ESE", "SE"]),
+    ],
+)
+def test_hyphen_ranges_spelling_a_point_stay_ranges(direction, points):
+    assert wind_sector_mask(direction) == sectors(*points)
+
+
+@pytest.mark.parametrize("direction", [None, "", "onshore", "NW-N-NE"])
+def test_unparseable_directions(direction):
+    assert wind_sector_mask(direction) == 0
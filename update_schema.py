@@ -25,6 +25,17 @@ def update_schema():
     # Create all tables
     Base.metadata.create_all(bind=engine)
 
+    # Columns added to tables that are kept across schema updates
+    with engine.connect() as conn:
+        conn.execute(text("ALTER TABLE kitespot_weather_daily ADD COLUMN IF NOT EXISTS wind_gusts_max DOUBLE PRECISION"))
+        conn.execute(text("ALTER TABLE kitespot_forecast_runs ADD COLUMN IF NOT EXISTS wind_gusts_10m REAL[]"))
+        conn.commit()
+
+    # create_all skips indexes of tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+
 if __name__ == "__main__":
     update_schema()
     print("Schema updated successfully")